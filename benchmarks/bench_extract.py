@@ -0,0 +1,84 @@
+"""Benchmark bite page extraction against a whole-page BeautifulSoup parse.
+
+Run from the repository root:
+
+    uv run python benchmarks/bench_extract.py [PAGE ...]
+
+Without arguments the saved pages in tests/testing_content are used, along
+with copies of them whose description is repeated to make it long.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from eatlocal.extract import BitePage, extract_bite_page
+
+CORPUS = Path(__file__).parent.parent / "tests" / "testing_content"
+DESCRIPTION_END = '<p class="hidden" id="filename">'
+LONG_DESCRIPTION_REPEATS = (10, 100)
+
+
+def whole_page_extract(html: str) -> BitePage:
+    """Extract a bite the way eatlocal did before the extraction engine."""
+    soup = BeautifulSoup(html, "html.parser")
+    description = ""
+    write = False
+    for line in str(soup.find(id="bite-description")).splitlines():
+        if 'id="filename"' in line:
+            continue
+        if write:
+            description += line + "\n"
+        if "end author and learning paths" in line:
+            write = True
+    return BitePage(
+        description=description,
+        code=soup.find(id="python-editor").text,
+        tests=soup.find(id="test-python-editor").text,
+        file_name=soup.find(id="filename").text.strip(".py"),
+    )
+
+
+def lengthen_description(html: str, repeats: int) -> str:
+    """Repeat the paragraph before the file name to make a long description."""
+    end = html.index(DESCRIPTION_END)
+    start = html.rindex("<p", 0, html.rindex("<p", 0, end))
+    return html[:start] + html[start:end] * repeats + html[end:]
+
+
+def corpus(paths: list[Path], lengthen: bool) -> dict[str, str]:
+    pages = {}
+    for path in paths:
+        html = path.read_text(encoding="utf-8")
+        pages[path.name] = html
+        if lengthen:
+            for repeats in LONG_DESCRIPTION_REPEATS:
+                pages[f"{path.name} x{repeats}"] = lengthen_description(html, repeats)
+    return pages
+
+
+def best_time(function, html: str) -> float:
+    timer = timeit.Timer(lambda: function(html))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+if __name__ == "__main__":
+    paths = [Path(arg) for arg in sys.argv[1:]]
+    pages = (
+        corpus(paths, False)
+        if paths
+        else corpus(sorted(CORPUS.glob("*_content.txt")), True)
+    )
+    print(f"{'page':<32} {'whole page':>12} {'extract':>12} {'speedup':>8}")
+    for name, html in pages.items():
+        if extract_bite_page(html) != whole_page_extract(html):
+            sys.exit(f"{name}: extracted content differs from the whole page parse")
+        before = best_time(whole_page_extract, html)
+        after = best_time(extract_bite_page, html)
+        print(
+            f"{name:<32} {before * 1000:>10.2f}ms {after * 1000:>10.2f}ms"
+            f" {before / after:>7.1f}x"
+        )
@@ -0,0 +1,323 @@
+"""Benchmark eatlocal's hot paths and compare them with a stored baseline.
+
+Run from the repository root:
+
+    uv run python benchmarks/suite.py              # compare with the baseline
+    uv run python benchmarks/suite.py --save       # store a new baseline
+    uv run python benchmarks/suite.py -k local --threshold 0.5
+
+Everything runs offline: the catalog and the local bites database are
+generated with SIZE bites in a temporary directory, the bite page is the one
+saved in tests/testing_content, and the picker and console are replaced so
+nothing waits on the terminal. The command exits with status 1 when a
+benchmark is slower than its baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from bench_extract import lengthen_description
+from rich.console import Console
+
+from eatlocal.catalog import save_catalog
+from eatlocal.eatlocal import (
+    Bite,
+    _format_bite_key,
+    choose_bite,
+    choose_local_bite,
+    create_bite_dir,
+    display_bite,
+    print_workspace_status,
+    track_local_bites,
+)
+from eatlocal.picker import TrigramIndex, pick
+from eatlocal.store import LocalBites, code_digest
+
+BASELINE = Path(__file__).parent / "baseline.json"
+SUMMING_PAGE = (
+    Path(__file__).parent.parent / "tests" / "testing_content" / "summing_content.txt"
+)
+DEFAULT_SIZE = 10_000
+DEFAULT_THRESHOLD = 0.25
+LEVELS = ("intro", "beginner", "intermediate", "advanced")
+
+Benchmark = Callable[[ExitStack, Path, int], Callable[[], object]]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(function: Benchmark) -> Benchmark:
+    """Register a benchmark.
+
+    A benchmark sets up its data in the temporary directory, enters its
+    patches on the stack and returns the function to time.
+    """
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def catalog_bites(size: int) -> list[dict]:
+    return [
+        {
+            "title": f"Bite number {number} of the catalog",
+            "slug": f"bite-number-{number}",
+            "level": LEVELS[number % len(LEVELS)],
+        }
+        for number in range(size)
+    ]
+
+
+def formatted_keys(bites: list[dict]) -> list[str]:
+    padding = max(len(bite["title"]) for bite in bites) + 10
+    return [_format_bite_key(bite["title"], bite["level"], padding) for bite in bites]
+
+
+def pick_last(choices, **kwargs) -> str:
+    """Stand in for iterfzf, the user picks the last entry."""
+    return list(choices)[-1]
+
+
+def bites_config(stack: ExitStack, tmp: Path, size: int) -> dict:
+    """Point eatlocal at a local bites database holding size bites."""
+    db = tmp / ".local_bites.sqlite"
+    with LocalBites(db) as bites:
+        bites.update_many(
+            [
+                (bite["slug"], bite["title"], {"level": bite["level"]})
+                for bite in catalog_bites(size)
+            ]
+        )
+    stack.enter_context(patch("eatlocal.eatlocal.LOCAL_BITES_DB", db))
+    stack.enter_context(
+        patch("eatlocal.eatlocal.LEGACY_LOCAL_BITES_DB", tmp / ".local_bites.json")
+    )
+    return {"PYBITES_REPO": tmp}
+
+
+@benchmark
+def format_bite_keys(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    bites = catalog_bites(size)
+    return lambda: formatted_keys(bites)
+
+
+def patch_picker(stack: ExitStack) -> None:
+    stack.enter_context(patch("eatlocal.picker.fzf_executable", lambda: Path("fzf")))
+    stack.enter_context(patch("eatlocal.picker.iterfzf", pick_last))
+
+
+@benchmark
+def pick_bite_key(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    keys = formatted_keys(catalog_bites(size))
+    patch_picker(stack)
+    return lambda: pick(keys, ansi=True)
+
+
+@benchmark
+def trigram_search(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    keys = formatted_keys(catalog_bites(size))
+    last = f"number {size - 1} {LEVELS[(size - 1) % len(LEVELS)]}"
+    return lambda: TrigramIndex(keys).search(last)
+
+
+@benchmark
+def choose_bite_catalog(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    catalog = tmp / ".bites_catalog.json"
+    save_catalog(catalog, {"bites": catalog_bites(size)})
+    stack.enter_context(patch("eatlocal.eatlocal.BITES_CATALOG", catalog))
+    stack.enter_context(patch("eatlocal.catalog.refresh_catalog_in_background"))
+    patch_picker(stack)
+    return choose_bite
+
+
+def create_bite_dir_benchmark(tmp: Path, page: str) -> Callable:
+    bite = Bite("Sum n numbers", "sum-n-numbers", platform_content=page)
+    config = {"PYBITES_REPO": tmp}
+    return lambda: create_bite_dir(bite, config, force=True)
+
+
+@benchmark
+def create_bite_dir_page(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    return create_bite_dir_benchmark(tmp, SUMMING_PAGE.read_text(encoding="utf-8"))
+
+
+@benchmark
+def create_bite_dir_long_page(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    page = lengthen_description(SUMMING_PAGE.read_text(encoding="utf-8"), 100)
+    return create_bite_dir_benchmark(tmp, page)
+
+
+@benchmark
+def track_local_bites_db(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    config = bites_config(stack, tmp, size)
+    bite = Bite("Sum n numbers", "sum-n-numbers", level="intro")
+    (tmp / bite.slug).mkdir()
+    (tmp / bite.slug / "summing.py").write_text("def sum_numbers(): ...\n")
+    return lambda: track_local_bites(bite, config)
+
+
+@benchmark
+def choose_local_bite_db(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    config = bites_config(stack, tmp, size)
+    patch_picker(stack)
+    return lambda: choose_local_bite(config)
+
+
+@benchmark
+def display_bite_render(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    bite = Bite("Sum n numbers", "sum-n-numbers")
+    config = {"PYBITES_REPO": tmp}
+    create_bite_dir_benchmark(tmp, SUMMING_PAGE.read_text(encoding="utf-8"))()
+    return lambda: display_bite(bite, config, "monokai")
+
+
+@benchmark
+def workspace_status(stack: ExitStack, tmp: Path, size: int) -> Callable:
+    config = bites_config(stack, tmp, size)
+    code = "def sum_numbers(): ...\n"
+    with LocalBites(tmp / ".local_bites.sqlite") as bites:
+        bites.update_many(
+            [
+                (bite["slug"], None, {"downloaded_hash": code_digest(code)})
+                for bite in catalog_bites(size)
+            ]
+        )
+    for bite in catalog_bites(size):
+        (tmp / bite["slug"]).mkdir()
+        (tmp / bite["slug"] / "summing.py").write_text(code)
+    stack.enter_context(
+        patch("eatlocal.eatlocal.WORKSPACE_CACHE", tmp / "workspace.json")
+    )
+    # the first scan fills the cache, the timed ones only stat
+    print_workspace_status(config)
+    return lambda: print_workspace_status(config)
+
+
+def best_time(function: Callable, repeat: int) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(names: list[str], size: int, repeat: int) -> dict[str, float]:
+    """Time the benchmarks, each in a fresh temporary directory.
+
+    eatlocal's console renders to a terminal of fixed size whose output is
+    discarded.
+
+    Args:
+        names: Names of the benchmarks to run.
+        size: Number of bites in the catalog and the local bites database.
+        repeat: Number of timing rounds, the fastest one is kept.
+
+    Returns:
+        Seconds per call of each benchmark.
+
+    """
+    results = {}
+    for name in names:
+        with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            console = Console(
+                file=devnull,
+                width=160,
+                height=50,
+                force_terminal=True,
+                color_system="truecolor",
+            )
+            stack.enter_context(patch("eatlocal.eatlocal.console", console))
+            stack.enter_context(
+                patch("eatlocal.eatlocal.DISPLAY_CACHE", Path(tmp) / "display")
+            )
+            function = BENCHMARKS[name](stack, Path(tmp), size)
+            results[name] = best_time(function, repeat)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """Print the results next to the baseline.
+
+    Args:
+        results: Seconds per call of each benchmark.
+        baseline: Seconds per call stored in the baseline.
+        threshold: Slowdown relative to the baseline that is a regression.
+
+    Returns:
+        The names of the benchmarks that regressed.
+
+    """
+    regressions = []
+    print(f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28} {'-':>12} {seconds * 1000:>10.3f}ms {'new':>8}")
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<28} {before * 1000:>10.3f}ms {seconds * 1000:>10.3f}ms"
+            f" {change:>+8.0%}{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="pattern", default="", help="run matching names")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.pattern in name]
+    if not names:
+        parser.error(f"no benchmark matches {args.pattern!r}")
+    results = run(names, args.size, args.repeat)
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.is_file() else {}
+    if stored and stored["size"] != args.size:
+        sys.exit(f"The baseline was taken with --size {stored['size']}.")
+    regressions = compare(results, stored.get("results", {}), args.threshold)
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "size": args.size,
+                    "results": {**stored.get("results", {}), **results},
+                },
+                indent=4,
+            )
+            + "\n"
+        )
+        return 0
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) more than {args.threshold:.0%}"
+            " slower than the baseline."
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
 """A package to solve PyBites locally"""
 
-import importlib.metadata
 
-__version__ = importlib.metadata.version("eatlocal")
+def __getattr__(name: str) -> str:
+    # reading the installed metadata is slow, only do it when asked
+    if name == "__version__":
+        import importlib.metadata
+
+        return importlib.metadata.version("eatlocal")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
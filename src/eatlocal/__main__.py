@@ -1,33 +1,30 @@
 """command-line interface for eatlocal"""
 
+import os
 import sys
 from pathlib import Path
 
 import typer
-from rich import print
-from rich.status import Status
-
-from . import __version__
-from .constants import EATLOCAL_HOME
-from .eatlocal import (
-    choose_bite,
-    choose_local_bite,
-    create_bite_dir,
-    display_bite,
-    download_bite,
-    initialize_eatlocal,
-    load_config,
-    submit_bite,
-    track_local_bites,
+
+from .constants import (
+    BROWSER_PAGES,
+    EATLOCAL_HOME,
+    SEARCH_RESULTS,
+    TEST_TIMEOUT,
+    TRACE_FILE,
 )
 
 cli = typer.Typer(add_completion=False)
+daemon_cli = typer.Typer(help="Keep a logged in browser warm between commands.")
+cli.add_typer(daemon_cli, name="daemon")
 
 
 def report_version(display: bool) -> None:
     """Print version and exit."""
     if display:
-        print(f"{Path(sys.argv[0]).name} {__version__}")
+        from . import __version__
+
+        typer.echo(f"{Path(sys.argv[0]).name} {__version__}")
         raise typer.Exit()
 
 
@@ -42,8 +39,38 @@ def global_options(
         is_eager=True,
         callback=report_version,
     ),
+    trace: bool = typer.Option(
+        False,
+        "--trace",
+        is_flag=True,
+        help=f"Record how long each phase takes to {TRACE_FILE}.",
+    ),
+    trace_memory: bool = typer.Option(
+        False,
+        "--trace-memory",
+        is_flag=True,
+        help="Also record memory use while tracing, slows eatlocal down.",
+    ),
+    lean: bool = typer.Option(
+        False,
+        "--lean",
+        is_flag=True,
+        help="Skip images, fonts and third-party requests in the browser.",
+    ),
 ):
     """Download, extract, display, and submit PyBites code challenges."""
+    from .browser import lean_setting, use_lean_mode
+    from .tracing import start_tracing, stop_tracing, trace_settings
+
+    if lean or lean_setting(os.environ):
+        use_lean_mode()
+
+    path, memory = trace_settings(os.environ)
+    if trace or trace_memory or path is not None:
+        start_tracing(
+            path or TRACE_FILE, ctx.invoked_subcommand, memory or trace_memory
+        )
+        ctx.call_on_close(stop_tracing)
 
 
 @cli.command()
@@ -51,18 +78,25 @@ def init(
     ctx: typer.Context,
 ) -> None:
     """Configure PyBites credentials and directory."""
+    from .eatlocal import initialize_eatlocal
+
     initialize_eatlocal()
 
 
 @cli.command()
 def download(
     ctx: typer.Context,
+    slugs: list[str] | None = typer.Argument(
+        None,
+        help="Slugs of the bites to download.",
+        show_default=False,
+    ),
     clear: bool = typer.Option(
         False,
         "--clear-cache",
         "-C",
         is_flag=True,
-        help="Clear the bites cache to fetch fresh bites.",
+        help="Fetch a fresh bites list instead of using the local catalog.",
     ),
     force: bool = typer.Option(
         False,
@@ -77,24 +111,168 @@ def download(
         "-l",
         help="Filter bites by difficulty level.",
     ),
+    multi: bool = typer.Option(
+        False,
+        "--multi",
+        "-m",
+        is_flag=True,
+        help="Select several bites to download.",
+    ),
+    all_bites: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        is_flag=True,
+        help="Download all bites, combine with --level to download a single level.",
+    ),
+    pages: int = typer.Option(
+        BROWSER_PAGES,
+        "--pages",
+        "-p",
+        min=1,
+        help="Number of browser pages downloading bites at the same time.",
+    ),
 ) -> None:
     """Download and extract bite code from pybitesplatform.com."""
+    from .eatlocal import choose_bite, choose_bites, download_bites, load_config
+
     config = load_config(EATLOCAL_HOME / ".env")
-    bite = choose_bite(clear, level=level)
-    with Status("Downloading bite..."):
-        bite.platform_content = download_bite(bite, config)
-        if bite.platform_content is None:
-            return
-    create_bite_dir(bite, config, force)
-    track_local_bites(bite, config)
+    if slugs or multi or all_bites:
+        bites = choose_bites(slugs, clear, level=level, all_bites=all_bites)
+    else:
+        bites = [choose_bite(clear, level=level)]
+    download_bites(bites, config, force, pages)
+
+
+@cli.command()
+def sync(
+    ctx: typer.Context,
+    slugs: list[str] | None = typer.Argument(
+        None,
+        help="Slugs of the bites to store, all local bites by default.",
+        show_default=False,
+    ),
+    clear: bool = typer.Option(
+        False,
+        "--clear-cache",
+        "-C",
+        is_flag=True,
+        help="Fetch a fresh bites list instead of using the local catalog.",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-F",
+        is_flag=True,
+        help="Fetch the pages that are already stored again.",
+    ),
+    level: str | None = typer.Option(
+        None,
+        "--level",
+        "-l",
+        help="Filter bites by difficulty level, combine with --all.",
+    ),
+    all_bites: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        is_flag=True,
+        help="Store every bite on the platform instead of the local bites.",
+    ),
+    pages: int = typer.Option(
+        BROWSER_PAGES,
+        "--pages",
+        "-p",
+        min=1,
+        help="Number of browser pages loading bites at the same time.",
+    ),
+) -> None:
+    """Store the platform pages of bites to extract them offline."""
+    from .eatlocal import choose_bites, choose_local_bites, load_config, sync_bites
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    if slugs or all_bites:
+        bites = choose_bites(slugs, clear, level=level, all_bites=all_bites)
+    else:
+        bites = choose_local_bites(config)
+    sync_bites(bites, config, force, pages)
+
+
+@cli.command()
+def reextract(
+    ctx: typer.Context,
+    slugs: list[str] | None = typer.Argument(
+        None,
+        help="Slugs of the bites to rebuild, all stored bites by default.",
+        show_default=False,
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-F",
+        is_flag=True,
+        help="Overwrite bite directories with a fresh version.",
+    ),
+    processes: int | None = typer.Option(
+        None,
+        "--processes",
+        "-j",
+        min=1,
+        help="Number of processes extracting bites, defaults to the number of CPUs.",
+        show_default=False,
+    ),
+) -> None:
+    """Rebuild bite directories from the stored pages, without the network."""
+    from .eatlocal import load_config, reextract_bites
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    reextract_bites(config, slugs, force, processes)
 
 
 @cli.command()
 def submit(
     ctx: typer.Context,
+    slugs: list[str] | None = typer.Argument(
+        None,
+        help="Slugs of the bites to submit.",
+        show_default=False,
+    ),
+    all_bites: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        is_flag=True,
+        help="Submit all local bites.",
+    ),
+    changed: bool = typer.Option(
+        False,
+        "--changed",
+        "-c",
+        is_flag=True,
+        help="Submit the local bites edited since their last submission or download.",
+    ),
+    pages: int = typer.Option(
+        BROWSER_PAGES,
+        "--pages",
+        "-p",
+        min=1,
+        help="Number of bites validated at the same time.",
+    ),
 ) -> None:
     """Submit a bite back to the PyBites Platform."""
+    from .eatlocal import (
+        choose_local_bite,
+        choose_local_bites,
+        load_config,
+        submit_bite,
+        submit_bites,
+    )
+
     config = load_config(EATLOCAL_HOME / ".env")
+    if slugs or all_bites or changed:
+        bites = choose_local_bites(config, slugs, changed=changed)
+        submit_bites(bites, config, pages)
+        return
     bite = choose_local_bite(config)
     submit_bite(
         bite,
@@ -102,6 +280,187 @@ def submit(
     )
 
 
+@cli.command(name="test")
+def run_tests(
+    ctx: typer.Context,
+    slugs: list[str] | None = typer.Argument(
+        None,
+        help="Slugs of the bites to test.",
+        show_default=False,
+    ),
+    all_bites: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        is_flag=True,
+        help="Test all local bites.",
+    ),
+    changed: bool = typer.Option(
+        False,
+        "--changed",
+        "-c",
+        is_flag=True,
+        help="Test the local bites edited since their last submission or download.",
+    ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of bites tested at the same time, defaults to the number of CPUs.",
+        show_default=False,
+    ),
+    timeout: float = typer.Option(
+        TEST_TIMEOUT,
+        "--timeout",
+        "-t",
+        min=1,
+        help="Seconds after which the tests of a bite are stopped.",
+    ),
+) -> None:
+    """Run the tests of bites locally, without the PyBites Platform."""
+    from .eatlocal import (
+        choose_local_bite,
+        choose_local_bites,
+        load_config,
+        run_local_tests,
+    )
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    if slugs or all_bites or changed:
+        bites = choose_local_bites(config, slugs, changed=changed)
+    else:
+        bites = [choose_local_bite(config)]
+    run_local_tests(bites, config, jobs, timeout)
+
+
+@cli.command()
+def status(
+    ctx: typer.Context,
+    only: list[str] | None = typer.Option(
+        None,
+        "--only",
+        "-o",
+        help="List the bites with this status: modified, failed, unreadable, passed, untouched or missing.",
+        show_default=False,
+    ),
+    all_bites: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        is_flag=True,
+        help="List every bite, not only the modified and failed ones.",
+    ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of bite directories scanned at the same time.",
+        show_default=False,
+    ),
+) -> None:
+    """Show which local bites are modified, failed, passed or untouched."""
+    from .eatlocal import load_config, print_workspace_status
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    print_workspace_status(config, only, jobs, all_bites=all_bites)
+
+
+@cli.command()
+def doctor(
+    ctx: typer.Context,
+    trace_file: Path | None = typer.Option(
+        None,
+        "--trace-file",
+        help="Trace file to read, defaults to EATLOCAL_TRACE or the default file.",
+        show_default=False,
+    ),
+    browser: bool = typer.Option(
+        False,
+        "--browser",
+        is_flag=True,
+        help="Compare the page load time and memory of the lean browser mode.",
+    ),
+) -> None:
+    """Show how long the phases of traced runs took, or compare browser modes."""
+    from .eatlocal import print_browser_report, print_trace_report
+    from .tracing import trace_settings
+
+    if browser:
+        print_browser_report()
+        return
+    if trace_file is None:
+        trace_file = trace_settings(os.environ)[0] or TRACE_FILE
+    print_trace_report(trace_file)
+
+
+@daemon_cli.command(name="start")
+def daemon_start(
+    ctx: typer.Context,
+    foreground: bool = typer.Option(
+        False,
+        "--foreground",
+        is_flag=True,
+        help="Run the daemon in this terminal instead of the background.",
+    ),
+) -> None:
+    """Start the daemon, download and submit then skip the browser start."""
+    from .eatlocal import load_config, start_daemon
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    start_daemon(config, foreground)
+
+
+@daemon_cli.command(name="stop")
+def daemon_stop(
+    ctx: typer.Context,
+) -> None:
+    """Stop the daemon and its browser."""
+    from .eatlocal import stop_daemon
+
+    stop_daemon()
+
+
+@daemon_cli.command(name="status")
+def daemon_status(
+    ctx: typer.Context,
+) -> None:
+    """Show whether the daemon is running."""
+    from .eatlocal import print_daemon_status
+
+    print_daemon_status()
+
+
+@cli.command()
+def search(
+    ctx: typer.Context,
+    query: list[str] = typer.Argument(
+        ...,
+        help="Words that must all appear in a bite, end a word with * to match its prefix.",
+        show_default=False,
+    ),
+    limit: int = typer.Option(
+        SEARCH_RESULTS,
+        "--limit",
+        "-n",
+        min=1,
+        help="Maximum number of bites shown.",
+    ),
+    rebuild: bool = typer.Option(
+        False,
+        "--rebuild",
+        is_flag=True,
+        help="Index every file again instead of only the changed ones.",
+    ),
+) -> None:
+    """Search the instructions, code and tests of the local bites."""
+    from .eatlocal import load_config, search_bites
+
+    config = load_config(EATLOCAL_HOME / ".env")
+    search_bites(config, " ".join(query), limit, rebuild)
+
+
 @cli.command()
 def display(
     ctx: typer.Context,
@@ -111,11 +470,20 @@ def display(
         "-t",
         help="Choose syntax highlighting for code.",
     ),
+    pager: bool = typer.Option(
+        False,
+        "--pager",
+        "-p",
+        is_flag=True,
+        help="Scroll through the whole bite instead of printing one screen.",
+    ),
 ) -> None:
     """Read a bite directly in the terminal."""
+    from .eatlocal import choose_local_bite, display_bite, load_config
+
     config = load_config(EATLOCAL_HOME / ".env")
     bite = choose_local_bite(config)
-    display_bite(bite, config, theme=theme)
+    display_bite(bite, config, theme=theme, pager=pager)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""launch settings of the headless browser"""
+
+import os
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .constants import BITE_URL, env_flag
+
+PLATFORM_HOST = urlsplit(BITE_URL).hostname
+
+# Resources the eatlocal flow never looks at.
+BLOCKED_RESOURCE_TYPES = frozenset(["image", "media", "font", "texttrack", "manifest"])
+# Requests that other sites' scripts make, such as analytics beacons. Scripts
+# and stylesheets from other sites are kept, the editor may depend on them.
+BLOCKED_THIRD_PARTY_TYPES = frozenset(
+    ["xhr", "fetch", "eventsource", "websocket", "other"]
+)
+LEAN_BROWSER_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+    "--renderer-process-limit=2",
+]
+
+LEAN_ENV = "EATLOCAL_LEAN"
+
+_lean = False
+
+
+def lean_setting(environ: dict) -> bool:
+    """Read from the environment whether EATLOCAL_LEAN turns lean mode on.
+
+    Args:
+        environ: The environment variables.
+
+    Returns:
+        Whether lean mode is on.
+
+    """
+    return env_flag(environ, LEAN_ENV)
+
+
+def use_lean_mode(enabled: bool = True) -> None:
+    """Launch lean browsers from now on.
+
+    Args:
+        enabled: Whether lean mode is on.
+
+    """
+    global _lean
+    _lean = enabled
+
+
+def lean_mode() -> bool:
+    """Whether browsers are launched in lean mode."""
+    return _lean
+
+
+def launch_options(lean: bool | None = None) -> dict:
+    """Keyword arguments for chromium.launch.
+
+    Args:
+        lean: Whether to launch a lean browser, defaults to the current mode.
+
+    Returns:
+        The launch options.
+
+    """
+    if lean is None:
+        lean = _lean
+    return {"args": LEAN_BROWSER_ARGS} if lean else {}
+
+
+def should_block(resource_type: str, url: str) -> bool:
+    """Decide whether a lean browser skips a request.
+
+    Args:
+        resource_type: Playwright's resource type of the request.
+        url: URL of the request.
+
+    Returns:
+        True if the page works without the resource.
+
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlsplit(url).hostname or ""
+    third_party = host != PLATFORM_HOST and not host.endswith(f".{PLATFORM_HOST}")
+    return third_party and resource_type in BLOCKED_THIRD_PARTY_TYPES
+
+
+class RequestBlocker:
+    """Route handlers aborting the requests a lean browser skips.
+
+    Routing requests turns off the browser's HTTP cache for the context, so
+    this is only installed in lean mode.
+
+    Attributes:
+        blocked: Number of requests aborted.
+
+    """
+
+    def __init__(self) -> None:
+        self.blocked = 0
+
+    def _block(self, route) -> bool:
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            self.blocked += 1
+            return True
+        return False
+
+    def handle(self, route) -> None:
+        """Abort or continue a request of a synchronous browser context."""
+        if self._block(route):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route) -> None:
+        """Abort or continue a request of an asynchronous browser context."""
+        if self._block(route):
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+def process_tree_rss(pid: int | None = None) -> int | None:
+    """Measure the memory of the processes started by a process.
+
+    This is the browser and the Playwright driver when called from eatlocal.
+
+    Args:
+        pid: The parent process, defaults to this one.
+
+    Returns:
+        The resident set size of all its descendants in bytes, or None where
+        /proc is not available.
+
+    """
+    proc = Path("/proc")
+    if not (proc / "self").is_dir():
+        return None
+    root = os.getpid() if pid is None else pid
+    parents = {}
+    rss = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+        parents[int(entry.name)] = int(fields.get("PPid", "0").strip())
+        # kernel threads have no VmRSS
+        rss[int(entry.name)] = int(fields.get("VmRSS", "0 kB").split()[0]) * 1024
+    total = 0
+    descendants = [root]
+    while descendants:
+        parent = descendants.pop()
+        for child, child_parent in parents.items():
+            if child_parent == parent:
+                total += rss[child]
+                descendants.append(child)
+    return total
@@ -0,0 +1,177 @@
+"""local catalog of the bites on the PyBites platform"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from .constants import BITES_API, HTTP_TIMEOUT
+from .resilience import http_request
+from .tracing import span
+
+CATALOG_FIELDS = ("title", "slug", "level")
+
+
+class CatalogError(Exception):
+    """The bites list could not be retrieved from the platform."""
+
+
+def load_catalog(path: Path) -> dict | None:
+    """Load the catalog stored on disk.
+
+    Args:
+        path: Location of the catalog file.
+
+    Returns:
+        The catalog, or None if there is no readable catalog.
+
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            catalog = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(catalog, dict) or "bites" not in catalog:
+        return None
+    return catalog
+
+
+def save_catalog(path: Path, catalog: dict) -> None:
+    """Write the catalog to disk atomically.
+
+    Args:
+        path: Location of the catalog file.
+        catalog: The catalog to store.
+
+    Returns:
+        None
+
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(catalog, fh)
+    os.replace(tmp_path, path)
+
+
+def merge_bites(
+    old: list[dict], new: list[dict]
+) -> tuple[list[dict], list[str], list[str]]:
+    """Apply the difference between two bite lists.
+
+    Args:
+        old: Bites in the stored catalog.
+        new: Bites returned by the platform.
+
+    Returns:
+        The merged bites in the platform's order, the slugs of the added
+        bites and the slugs of the removed bites.
+
+    """
+    bites = {bite["slug"]: bite for bite in old}
+    incoming = {
+        bite["slug"]: {field: bite.get(field) for field in CATALOG_FIELDS}
+        for bite in new
+    }
+    added = [slug for slug in incoming if slug not in bites]
+    removed = [slug for slug in bites if slug not in incoming]
+    for slug in removed:
+        del bites[slug]
+    bites.update(incoming)
+    return [bites[slug] for slug in incoming], added, removed
+
+
+def fetch_catalog(catalog: dict | None = None) -> dict:
+    """Refresh a catalog from the platform with a conditional request.
+
+    Args:
+        catalog: The stored catalog, if any.
+
+    Returns:
+        The refreshed catalog. It holds the bites added and removed since
+        the stored catalog under "added" and "removed".
+
+    Raises:
+        CatalogError: If the platform does not return the bites list.
+
+    """
+    headers = {}
+    if catalog is not None:
+        if catalog.get("etag"):
+            headers["If-None-Match"] = catalog["etag"]
+        if catalog.get("last_modified"):
+            headers["If-Modified-Since"] = catalog["last_modified"]
+    try:
+        with span("catalog.fetch"):
+            r = http_request(
+                lambda: requests.get(BITES_API, headers=headers, timeout=HTTP_TIMEOUT),
+                "catalog.fetch",
+            )
+    except requests.RequestException as error:
+        raise CatalogError(str(error)) from error
+
+    if r.status_code == 304 and catalog is not None:
+        return {**catalog, "fetched_at": time.time(), "added": [], "removed": []}
+    if r.status_code != 200:
+        raise CatalogError(f"Unexpected status {r.status_code} for {BITES_API}.")
+
+    try:
+        data = r.json()
+    except ValueError as error:
+        raise CatalogError(f"Invalid bites list from {BITES_API}.") from error
+    bites, added, removed = merge_bites(
+        [] if catalog is None else catalog["bites"], data
+    )
+    return {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "bites": bites,
+        "added": added,
+        "removed": removed,
+    }
+
+
+def refresh_catalog(path: Path) -> dict:
+    """Refresh the catalog stored on disk.
+
+    Args:
+        path: Location of the catalog file.
+
+    Returns:
+        The refreshed catalog.
+
+    Raises:
+        CatalogError: If the platform does not return the bites list.
+
+    """
+    catalog = fetch_catalog(load_catalog(path))
+    save_catalog(path, catalog)
+    return catalog
+
+
+def refresh_catalog_in_background(path: Path) -> threading.Thread:
+    """Refresh the catalog stored on disk without blocking the caller.
+
+    Failures are ignored, the next run tries again.
+
+    Args:
+        path: Location of the catalog file.
+
+    Returns:
+        The thread doing the refresh.
+
+    """
+
+    def refresh() -> None:
+        try:
+            refresh_catalog(path)
+        except (CatalogError, OSError):
+            pass
+
+    thread = threading.Thread(target=refresh, name="catalog-refresh", daemon=True)
+    thread.start()
+    return thread
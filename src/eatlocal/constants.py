@@ -10,10 +10,56 @@ class ConsoleStyle(Enum):
 
 BITE_URL = "https://pybitesplatform.com/bites/{bite_slug}/"
 EATLOCAL_HOME = Path().home() / ".eatlocal"
-CACHE_DB_LOCATION = EATLOCAL_HOME / ".bites_list_cache.sqlite"
-LOCAL_BITES_DB = EATLOCAL_HOME / ".local_bites.json"
+BITES_CATALOG = EATLOCAL_HOME / ".bites_catalog.json"
+LOCAL_BITES_DB = EATLOCAL_HOME / ".local_bites.sqlite"
+LEGACY_LOCAL_BITES_DB = EATLOCAL_HOME / ".local_bites.json"
+LEGACY_BITES_CACHE = EATLOCAL_HOME / ".bites_list_cache.sqlite"
+SESSION_STATE = EATLOCAL_HOME / ".session_state.json"
+TRACE_FILE = EATLOCAL_HOME / "trace.jsonl"
+PAGE_CACHE = EATLOCAL_HOME / "pages"
+SEARCH_INDEX = EATLOCAL_HOME / "search.sqlite"
+DISPLAY_CACHE = EATLOCAL_HOME / "display"
+WORKSPACE_CACHE = EATLOCAL_HOME / "workspace.json"
+SEARCH_RESULTS = 10
 BITES_API = "https://pybitesplatform.com/api/bites/"
 FZF_DEFAULT_OPTS = "--height 13 --layout=reverse --border rounded --margin=2%,5%,10%,2%"
 LOGIN_URL = "https://pybitesplatform.com/accounts/auth/login/"
 PROFILE_URL = "https://pybitesplatform.com/accounts/profile/"
+LOGGED_IN_SELECTOR = 'a[href="/auth/logout/"]'
+SESSION_COOKIE = "sessionid"
 TIMEOUT_LENGTH = 30000
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, TIMEOUT_LENGTH / 1000)
+NAVIGATION_TIMEOUT = 20000
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+RETRY_AFTER_LIMIT = 60
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+HTTP_POOL_SIZE = 10
+BROWSER_PAGES = 4
+TEST_TIMEOUT = 60
+PASSED_MESSAGE = "Congrats, you passed this Bite"
+FEEDBACK_POLL_INTERVAL = 100
+FEEDBACK_SETTLE = 2000
+DAEMON_SOCKET = EATLOCAL_HOME / "daemon.sock"
+DAEMON_LOG = EATLOCAL_HOME / "daemon.log"
+DAEMON_IDLE_TIMEOUT = 30 * 60
+DAEMON_START_TIMEOUT = 15
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def env_flag(environ: dict, name: str) -> bool:
+    """Whether a boolean environment variable is set to a true value.
+
+    Args:
+        environ: The environment variables.
+        name: Name of the variable.
+
+    Returns:
+        Whether the variable is one of TRUE_VALUES, ignoring case.
+
+    """
+    return environ.get(name, "").strip().lower() in TRUE_VALUES
@@ -0,0 +1,479 @@
+"""background process keeping a logged in browser warm between commands"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .constants import (
+    BITE_URL,
+    BROWSER_PAGES,
+    DAEMON_IDLE_TIMEOUT,
+    DAEMON_LOG,
+    DAEMON_SOCKET,
+    DAEMON_START_TIMEOUT,
+    LOGGED_IN_SELECTOR,
+    TIMEOUT_LENGTH,
+)
+from .resilience import goto_async
+from .tracing import span
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from playwright.async_api import Page as AsyncPage
+
+    from .web import PlatformSession
+
+# Seconds a job may go without sending anything, a browser launch and a login
+# come on top of the platform's own timeout.
+JOB_TIMEOUT = 4 * TIMEOUT_LENGTH / 1000
+STATUS_TIMEOUT = 2
+IDLE_CHECK_INTERVAL = 30
+
+
+class DaemonError(Exception):
+    """The daemon could not run a job."""
+
+
+class DaemonJobError(DaemonError):
+    """The daemon took a job but did not finish it, it may have run."""
+
+
+def daemon_supported() -> bool:
+    """Whether this platform has the Unix sockets the daemon listens on."""
+    return hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+
+
+class DaemonClient:
+    """Sends jobs to a running daemon, one connection per job.
+
+    Attributes:
+        path: Location of the daemon's socket.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def call(
+        self,
+        op: str,
+        on_output: Callable[[str], None] | None = None,
+        timeout: float = JOB_TIMEOUT,
+        **args,
+    ) -> dict:
+        """Run a job in the daemon.
+
+        Args:
+            op: The job, one of status, stop, fetch and validate.
+            on_output: Called with each line of output the job streams.
+            timeout: Seconds to wait for each message of the daemon.
+            **args: Arguments of the job.
+
+        Returns:
+            The final reply of the daemon.
+
+        Raises:
+            DaemonError: If the daemon cannot be reached.
+            DaemonJobError: If the job was sent but failed, timed out or lost
+                its connection.
+
+        """
+        sent = False
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(str(self.path))
+                sock.sendall(json.dumps({"op": op, **args}).encode() + b"\n")
+                sent = True
+                with sock.makefile("r", encoding="utf-8") as replies:
+                    for line in replies:
+                        reply = json.loads(line)
+                        if "line" in reply:
+                            if on_output is not None:
+                                on_output(reply["line"])
+                        elif "error" in reply:
+                            raise DaemonJobError(reply["error"])
+                        else:
+                            return reply
+        except (OSError, ValueError) as error:
+            if sent:
+                raise DaemonJobError(f"Lost the daemon's job: {error}") from error
+            raise DaemonError(f"Unable to reach the daemon: {error}") from error
+        raise DaemonJobError("The daemon closed the connection.")
+
+    def status(self) -> dict:
+        """Ask the daemon who it is logged in as and what it has done."""
+        return self.call("status", timeout=STATUS_TIMEOUT)
+
+
+def connect_daemon(
+    username: str | None = None, path: Path | None = None
+) -> DaemonClient | None:
+    """Find the running daemon.
+
+    Args:
+        username: PyBites user the daemon must be logged in as, any user
+            if None.
+        path: Location of the daemon's socket, defaults to DAEMON_SOCKET.
+
+    Returns:
+        A client for the daemon, or None if no daemon is running for the
+        user.
+
+    """
+    path = path or DAEMON_SOCKET
+    if not daemon_supported() or not path.exists():
+        return None
+    client = DaemonClient(path)
+    try:
+        status = client.status()
+    except DaemonError:
+        return None
+    if username is not None and status.get("username") != username:
+        return None
+    return client
+
+
+def spawn_daemon(lean: bool = False) -> subprocess.Popen:
+    """Start the daemon in a detached process logging to DAEMON_LOG.
+
+    Args:
+        lean: Whether the daemon's browser runs in lean mode.
+
+    Returns:
+        The daemon process.
+
+    """
+    DAEMON_LOG.parent.mkdir(parents=True, exist_ok=True)
+    options = ["--lean"] if lean else []
+    with open(DAEMON_LOG, "ab") as log:
+        return subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "eatlocal",
+                *options,
+                "daemon",
+                "start",
+                "--foreground",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+def wait_for_daemon(
+    process: subprocess.Popen, timeout: float = DAEMON_START_TIMEOUT
+) -> DaemonClient | None:
+    """Wait until a spawned daemon accepts jobs.
+
+    Args:
+        process: The daemon process.
+        timeout: Seconds to wait.
+
+    Returns:
+        A client for the daemon, or None if it exited or did not come up in
+        time.
+
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        client = connect_daemon()
+        if client is not None:
+            return client
+        time.sleep(0.1)
+    return None
+
+
+class Daemon:
+    """Runs platform jobs for the CLI over a warm HTTP session and browser.
+
+    The HTTP session is tried first, like in the CLI. The browser is only
+    launched for the first job that needs it and then stays open, logged
+    in, until the daemon stops.
+
+    Attributes:
+        config: Dictionary containing the user's PyBites credentials.
+        idle_timeout: Seconds without jobs after which the daemon stops.
+        jobs: Number of jobs run.
+
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        http: PlatformSession | None = None,
+        idle_timeout: float = DAEMON_IDLE_TIMEOUT,
+    ) -> None:
+        self.config = config
+        self.http = http
+        self.idle_timeout = idle_timeout
+        self.jobs = 0
+        self.started = time.time()
+        self.last_job = time.monotonic()
+        self.context = None
+        self.logins = 0
+
+    async def serve(self, path: Path | None = None) -> None:
+        """Accept jobs on the socket until stopped or idle for too long.
+
+        Args:
+            path: Location of the socket, defaults to DAEMON_SOCKET.
+
+        """
+        import asyncio
+        from contextlib import AsyncExitStack
+
+        from .eatlocal import load_session_state
+        from .web import PlatformSession
+
+        path = path or DAEMON_SOCKET
+        self.stopping = asyncio.Event()
+        self.context_lock = asyncio.Lock()
+        self.login_lock = asyncio.Lock()
+        self.pages = asyncio.Semaphore(BROWSER_PAGES)
+        async with AsyncExitStack() as stack:
+            self.stack = stack
+            if self.http is None:
+                username = self.config["PYBITES_USERNAME"]
+                self.http = stack.enter_context(
+                    PlatformSession(
+                        username,
+                        self.config["PYBITES_PASSWORD"],
+                        load_session_state(username),
+                    )
+                )
+            path.unlink(missing_ok=True)
+            # the socket accepts jobs as the user, nobody else may connect
+            umask = os.umask(0o077)
+            try:
+                server = await asyncio.start_unix_server(self.handle, path=str(path))
+            finally:
+                os.umask(umask)
+            try:
+                async with server:
+                    await self.wait_until_done()
+            finally:
+                path.unlink(missing_ok=True)
+
+    async def wait_until_done(self) -> None:
+        import asyncio
+
+        while not self.stopping.is_set():
+            try:
+                await asyncio.wait_for(self.stopping.wait(), IDLE_CHECK_INTERVAL)
+            except TimeoutError:
+                if time.monotonic() - self.last_job > self.idle_timeout:
+                    return
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Run one job sent by the CLI and reply with JSON lines."""
+        import requests
+        from playwright.async_api import Error as PlaywrightError
+
+        from .web import PlatformError, SubmissionError
+
+        def emit(message: dict) -> None:
+            writer.write(json.dumps(message).encode() + b"\n")
+
+        try:
+            request = json.loads(await reader.readline())
+            op = request["op"]
+            jobs = {
+                "fetch": lambda: self.fetch(request["slug"]),
+                "validate": lambda: self.validate(
+                    request["slug"], request["code"], emit
+                ),
+            }
+            if op == "status":
+                reply = self.status()
+            elif op == "stop":
+                self.stopping.set()
+                reply = {"stopping": True}
+            elif op in jobs:
+                reply = await self.run_job(jobs[op]())
+            else:
+                reply = {"error": f"Unknown job {op}."}
+        except (ValueError, KeyError, TypeError) as error:
+            reply = {"error": f"Invalid job: {error!r}"}
+        except (
+            PlatformError,
+            PlaywrightError,
+            requests.RequestException,
+            SubmissionError,
+            OSError,
+        ) as error:
+            reply = {"error": f"{type(error).__name__}: {error}"}
+        try:
+            emit(reply)
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def run_job(self, job) -> dict:
+        self.jobs += 1
+        self.last_job = time.monotonic()
+        try:
+            return await job
+        finally:
+            self.last_job = time.monotonic()
+
+    def status(self) -> dict:
+        from .browser import lean_mode
+
+        return {
+            "pid": os.getpid(),
+            "username": self.config["PYBITES_USERNAME"],
+            "started": self.started,
+            "jobs": self.jobs,
+            "browser": self.context is not None,
+            "lean": lean_mode(),
+        }
+
+    def save_session(self) -> None:
+        from .eatlocal import save_session_state
+
+        if self.http.logged_in:
+            save_session_state(
+                self.http.storage_state(), self.config["PYBITES_USERNAME"]
+            )
+
+    async def fetch(self, slug: str) -> dict:
+        """Fetch a bite page, over HTTP or else read in the browser.
+
+        Returns:
+            The page's html, or the bite's elements as read by the browser.
+
+        """
+        import asyncio
+
+        import requests
+
+        from .extract import BITE_PAGE_SCRIPT
+        from .web import PlatformError
+
+        url = BITE_URL.format(bite_slug=slug)
+        try:
+            html = await asyncio.to_thread(self.http.fetch_bite, url)
+        except (PlatformError, requests.RequestException):
+            pass
+        else:
+            self.save_session()
+            return {"html": html}
+        async with self.pages:
+            page = await self.open_bite(url, slug)
+            try:
+                with span("extract.browser", bite=slug):
+                    return {"record": await page.evaluate(BITE_PAGE_SCRIPT)}
+            finally:
+                await page.close()
+
+    async def validate(
+        self, slug: str, code: str, emit: Callable[[dict], None]
+    ) -> dict:
+        """Validate code against a bite, streaming the feedback lines.
+
+        Returns:
+            The text of the validation feedback.
+
+        """
+        import asyncio
+
+        import requests
+
+        from .eatlocal import watch_feedback_async
+        from .web import PlatformError
+
+        loop = asyncio.get_running_loop()
+        url = BITE_URL.format(bite_slug=slug)
+
+        def on_output(line: str) -> None:
+            # called from the HTTP worker thread
+            loop.call_soon_threadsafe(emit, {"line": line})
+
+        try:
+            feedback = await asyncio.to_thread(self.http.validate, url, code, on_output)
+        except (PlatformError, requests.RequestException):
+            # the code did not reach the platform, the browser can send it
+            pass
+        else:
+            self.save_session()
+            return {"feedback": feedback}
+        async with self.pages:
+            page = await self.open_bite(url, slug)
+            try:
+                await page.evaluate(
+                    "code => document.querySelector('.CodeMirror').CodeMirror.setValue(code)",
+                    code,
+                )
+                await page.click("#validate-button")
+                await page.wait_for_selector("#feedback", state="visible")
+                feedback = await watch_feedback_async(
+                    page, lambda line: emit({"line": line})
+                )
+            finally:
+                await page.close()
+        return {"feedback": feedback}
+
+    async def browser_context(self):
+        """The logged in browser context, launched on first use."""
+        from .eatlocal import platform_context
+
+        async with self.context_lock:
+            if self.context is None:
+                self.context = await self.stack.enter_async_context(
+                    platform_context(self.config)
+                )
+        return self.context
+
+    async def open_bite(self, url: str, slug: str) -> AsyncPage:
+        """Open a bite in a new page, logging in again if the session expired."""
+        from .eatlocal import login_context_async
+
+        context = await self.browser_context()
+        page = await context.new_page()
+        try:
+            seen = self.logins
+            with span("page.goto", bite=slug):
+                await goto_async(page, url)
+            if await page.locator(LOGGED_IN_SELECTOR).count():
+                return page
+            async with self.login_lock:
+                # another job may have logged in while this one was waiting
+                if self.logins == seen:
+                    await login_context_async(context, self.config)
+                    self.logins += 1
+            with span("page.goto", bite=slug):
+                await goto_async(page, url)
+        except BaseException:
+            await page.close()
+            raise
+        return page
+
+
+def run_daemon(config: dict, path: Path | None = None) -> None:
+    """Run the daemon in this process until it stops.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+        path: Location of the socket, defaults to DAEMON_SOCKET.
+
+    """
+    import asyncio
+
+    asyncio.run(Daemon(config).serve(path))
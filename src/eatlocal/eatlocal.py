@@ -1,47 +1,68 @@
 """download and submit bites"""
 
+from __future__ import annotations
+
 import json
+import os
 import sys
+import time
 import webbrowser
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
-from datetime import timedelta
 from os import environ, makedirs
 from pathlib import Path
-from typing import FrozenSet
+from typing import TYPE_CHECKING, FrozenSet
 
-import install_playwright
-import requests
-import requests_cache
-from bs4 import BeautifulSoup
 from dotenv import dotenv_values
-from iterfzf import iterfzf
-from playwright.sync_api import Page, sync_playwright
-from rich.layout import Layout
-from rich.panel import Panel
 from rich.prompt import Confirm, Prompt
-from rich.status import Status
-from rich.syntax import Syntax
-from rich.traceback import install
 
 from .console import console
 from .constants import (
     BITE_URL,
-    CACHE_DB_LOCATION,
-    BITES_API,
+    BITES_CATALOG,
+    BROWSER_PAGES,
+    DAEMON_LOG,
+    DISPLAY_CACHE,
     EATLOCAL_HOME,
     FZF_DEFAULT_OPTS,
+    LEGACY_BITES_CACHE,
+    LEGACY_LOCAL_BITES_DB,
     LOCAL_BITES_DB,
+    LOGGED_IN_SELECTOR,
+    FEEDBACK_POLL_INTERVAL,
     LOGIN_URL,
+    PAGE_CACHE,
+    PASSED_MESSAGE,
     PROFILE_URL,
+    SEARCH_INDEX,
+    SEARCH_RESULTS,
+    SESSION_COOKIE,
+    SESSION_STATE,
+    TEST_TIMEOUT,
     TIMEOUT_LENGTH,
+    WORKSPACE_CACHE,
     ConsoleStyle,
 )
+from .picker import pick
+from .resilience import goto, goto_async
+from .store import LocalBites, code_digest
+from .workspace import find_code_file
+from .tracing import span
+
+# playwright, requests, bs4 and the rich renderables take longer to import
+# than most commands take to run, so they are imported where they are used.
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext as AsyncBrowserContext
+    from playwright.async_api import Page as AsyncPage
+    from playwright.sync_api import BrowserContext, Page
+    from rich.status import Status
+
+    from .extract import BitePage
+    from .mirror import PageCache
+    from .runner import BiteTestResult
 
-install(show_locals=True)
 environ["FZF_DEFAULT_OPTS"] = FZF_DEFAULT_OPTS
-requests_cache.install_cache(
-    CACHE_DB_LOCATION, backend="sqlite", expire_after=timedelta(days=30)
-)
 
 VALID_LEVELS: FrozenSet[str] = frozenset(
     ["newbie", "intro", "beginner", "intermediate", "advanced"]
@@ -61,12 +82,16 @@ class Bite:
         title: The title of the bite.
         slug: The slug of the bite.
         platform_content: The content of the bite downloaded from the platform.
+        level: The difficulty level of the bite.
+        extracted: The content of the bite read from the page in the browser.
 
     """
 
     title: str = None
     slug: str = None
     platform_content: str = None
+    level: str = None
+    extracted: BitePage | None = None
 
     @property
     def url(self) -> str:
@@ -88,12 +113,10 @@ class Bite:
             )
             self.local_code = None
         else:
-            python_file = [
-                file
-                for file in list(bite_dir.glob("*.py"))
-                if not file.name.startswith("test_")
-            ][0]
-
+            python_file = find_code_file(bite_dir)
+            if python_file is None:
+                self.local_code = None
+                return
             with open(python_file, encoding="utf-8") as file:
                 self.local_code = file.read()
 
@@ -165,6 +188,9 @@ def install_browser() -> None:
         None
 
     """
+    import install_playwright
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         install_playwright.install([p.chromium])
 
@@ -197,7 +223,7 @@ def initialize_eatlocal():
             ):
                 break
 
-    with Status("Initializing eatlocal..."):
+    with console.status("Initializing eatlocal..."):
         if not EATLOCAL_HOME.is_dir():
             EATLOCAL_HOME.mkdir()
 
@@ -205,10 +231,11 @@ def initialize_eatlocal():
             fh.write(f"PYBITES_USERNAME={username}\n")
             fh.write(f"PYBITES_PASSWORD={password}\n")
             fh.write(f"PYBITES_REPO={local_dir}\n")
+        SESSION_STATE.unlink(missing_ok=True)
 
     create_local_bites_db(local_dir)
 
-    with Status("Installing browser..."):
+    with console.status("Installing browser..."):
         install_browser()
     console.print(":tada: Initialization complete.", style=ConsoleStyle.SUCCESS.value)
 
@@ -217,7 +244,7 @@ def login(browser, username: str, password: str) -> Page:
     """Login to the PyBites platform.
 
     Args:
-        browser: Playwright browser object.
+        browser: Playwright browser or browser context object.
         username: PyBites username.
         password: PyBites password.
 
@@ -225,18 +252,150 @@ def login(browser, username: str, password: str) -> Page:
         An authenticated page object for the PyBites platform.
 
     """
-    page: Page = browser.new_page()
-    # only shorten for debugging, some bites need in e2e test need longer
-    page.set_default_timeout(TIMEOUT_LENGTH)
-    page.goto(LOGIN_URL)
+    with span("login"):
+        page: Page = browser.new_page()
+        # only shorten for debugging, some bites need in e2e test need longer
+        page.set_default_timeout(TIMEOUT_LENGTH)
+        goto(page, LOGIN_URL)
+
+        page.click("#login-link")
+        page.fill('input[name="login"]', username)
+        page.fill('input[name="password"]', password)
+        page.click('button[type="submit"]')
+    return page
+
+
+def load_session_state(username: str) -> dict | None:
+    """Load the saved platform session of a user if it has not expired.
+
+    Args:
+        username: PyBites username the session must belong to.
+
+    Returns:
+        The Playwright storage state, or None if there is no usable session.
+
+    """
+    try:
+        with open(SESSION_STATE, "r", encoding="utf-8") as fh:
+            saved = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if saved.get("username") != username:
+        return None
+    state = saved.get("storage_state", {})
+    for cookie in state.get("cookies", []):
+        if cookie["name"] != SESSION_COOKIE:
+            continue
+        expires = cookie.get("expires", -1)
+        if expires == -1 or expires > time.time():
+            return state
+    return None
+
+
+def save_session_state(state: dict, username: str) -> None:
+    """Store a logged in session for later runs.
+
+    The file is only readable by the current user as it holds the
+    session cookie.
+
+    Args:
+        state: Playwright storage state of the logged in session.
+        username: PyBites username the session belongs to.
+
+    Returns:
+        None
+
+    """
+    import threading
+
+    EATLOCAL_HOME.mkdir(exist_ok=True)
+    # replaced in one step, so other processes never read a partial file
+    tmp_path = SESSION_STATE.with_name(
+        f"{SESSION_STATE.name}.{os.getpid()}.{threading.get_ident()}"
+    )
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump({"username": username, "storage_state": state}, fh)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, SESSION_STATE)
+
+
+def login_context(context: BrowserContext, config: dict) -> Page:
+    """Login a browser context and save its session.
+
+    Args:
+        context: Playwright browser context.
+        config: Dictionary containing the user's PyBites credentials.
 
-    page.click("#login-link")
-    page.fill('input[name="login"]', username)
-    page.fill('input[name="password"]', password)
-    page.click('button[type="submit"]')
+    Returns:
+        An authenticated page object for the PyBites platform.
+
+    """
+    page = login(
+        context,
+        config["PYBITES_USERNAME"],
+        config["PYBITES_PASSWORD"],
+    )
+    if page.url != PROFILE_URL:
+        _exit_login_failed()
+    save_session_state(context.storage_state(), config["PYBITES_USERNAME"])
     return page
 
 
+async def login_context_async(context: AsyncBrowserContext, config: dict) -> None:
+    """Login an asynchronous browser context and save its session.
+
+    Args:
+        context: Playwright asynchronous browser context.
+        config: Dictionary containing the user's PyBites credentials.
+
+    Raises:
+        LoginError: If the credentials are not accepted.
+
+    """
+    from .web import LoginError
+
+    with span("login"):
+        page = await context.new_page()
+        await goto_async(page, LOGIN_URL)
+        await page.click("#login-link")
+        await page.fill('input[name="login"]', config["PYBITES_USERNAME"])
+        await page.fill('input[name="password"]', config["PYBITES_PASSWORD"])
+        await page.click('button[type="submit"]')
+    if page.url != PROFILE_URL:
+        raise LoginError("Unable to login to PyBites.")
+    save_session_state(await context.storage_state(), config["PYBITES_USERNAME"])
+    await page.close()
+
+
+def _exit_login_failed() -> None:
+    """Tell the user the login failed and exit."""
+    console.print(
+        ":warning: Unable to login to PyBites.",
+        style=ConsoleStyle.WARNING.value,
+    )
+    console.print(
+        "Ensure your credentials are valid.",
+        style=ConsoleStyle.SUGGESTION.value,
+    )
+    sys.exit()
+
+
+def open_local_bites() -> LocalBites:
+    """Open the local bites database.
+
+    The JSON file used by earlier versions is imported on first use.
+
+    Returns:
+        The local bites database.
+
+    """
+    db = LocalBites(LOCAL_BITES_DB)
+    if LEGACY_LOCAL_BITES_DB.is_file():
+        db.import_json(LEGACY_LOCAL_BITES_DB)
+    return db
+
+
 def create_local_bites_db(local_dir: Path) -> None:
     """Create the local bites database.
 
@@ -247,17 +406,9 @@ def create_local_bites_db(local_dir: Path) -> None:
         None
 
     """
-    with Status("Creating local bites database..."):
-        if (local_dir / ".local_bites.json").is_file():
-            with open(local_dir / ".local_bites.json", "r", encoding="utf-8") as db:
-                local_bites = json.load(db)
-            with open(LOCAL_BITES_DB, "w", encoding="utf-8") as db:
-                json.dump(local_bites, db)
-            (local_dir / ".local_bites.json").unlink()
-
-        if not LOCAL_BITES_DB.is_file():
-            with open(LOCAL_BITES_DB, "w", encoding="utf-8") as fh:
-                fh.write("{}")
+    with console.status("Creating local bites database..."):
+        with open_local_bites() as db:
+            db.import_json(local_dir / ".local_bites.json")
 
 
 def track_local_bites(bite: Bite, config: dict) -> None:
@@ -271,11 +422,16 @@ def track_local_bites(bite: Bite, config: dict) -> None:
         None
 
     """
-    with open(LOCAL_BITES_DB, "r") as local_bites:
-        bites = json.load(local_bites)
-    bites[bite.title] = bite.slug
-    with open(LOCAL_BITES_DB, "w") as local_bites:
-        json.dump(bites, local_bites)
+    columns = {}
+    if bite.level is not None:
+        columns["level"] = bite.level
+    bite_dir = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+    code_file = find_code_file(bite_dir) if bite_dir.is_dir() else None
+    if code_file is not None:
+        columns["code_file"] = code_file.name
+        columns["test_file"] = f"test_{code_file.name}"
+    with open_local_bites() as db:
+        db.track(bite.slug, bite.title, **columns)
 
 
 def choose_local_bite(config: dict) -> Bite:
@@ -288,339 +444,1983 @@ def choose_local_bite(config: dict) -> Bite:
         A Bite object.
 
     """
-    with open(LOCAL_BITES_DB, "r") as local_bites:
-        bites = json.load(local_bites)
-    if Path.cwd().name in bites.values():
-        for title, slug in bites.items():
-            if Path.cwd().name == slug:
-                return Bite(title, slug)
-    bite = iterfzf(bites, multi=False)
-    if bite is None:
-        sys.exit()
-    return Bite(bite, bites[bite])
+    with open_local_bites() as db:
+        row = db.get(Path.cwd().name)
+        if row is not None:
+            return Bite(row["title"], row["slug"])
+        choices = db.choices()
+        chosen = pick([title for _, title in choices])
+        if not chosen:
+            sys.exit()
+        slug, title = choices[chosen[0]]
+        return Bite(title, slug)
 
 
-def _format_bite_key(title: str, level: str, padding: int) -> str:
-    """Format the bite key with for display.
+def local_code_digest(bite: Bite, config: dict) -> str | None:
+    """Hash the code currently in a bite directory.
+
+    Args:
+        bite: Bite object.
+        config: Dictionary containing the user's PyBites credentials.
+
     Returns:
-        A formatted string with the bite title and level.
+        The digest of the bite's code, or None if it has no code file.
+
     """
-    return f"{title:<{padding}}{GREEN}{level.capitalize():>40}{RESET}"
+    bite_dir = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+    code_file = find_code_file(bite_dir) if bite_dir.is_dir() else None
+    if code_file is None:
+        return None
+    with open(code_file, encoding="utf-8") as code:
+        return code_digest(code.read())
 
 
-def _unformat_bite_key(formatted_key: str) -> str:
-    """Unformat a bite key to get the original title.
+def track_downloaded_code(bite: Bite, config: dict) -> None:
+    """Store the hash of a freshly downloaded bite's code.
 
     Args:
-        formatted_key: The formatted string containing title and level.
+        bite: Bite object.
+        config: Dictionary containing the user's PyBites credentials.
 
     Returns:
-        The original title string.
+        None
+
     """
-    uncolored = formatted_key.replace(GREEN, "").replace(RESET, "")
-    title = uncolored.rstrip()
-    parts = title.split()
-    return " ".join(parts[:-1])
+    digest = local_code_digest(bite, config)
+    if digest is not None:
+        with open_local_bites() as db:
+            db.update(
+                bite.slug,
+                downloaded_hash=digest,
+                downloaded_at=time.time(),
+                submitted_hash=None,
+                passed=None,
+            )
 
 
-def choose_bite(clear: bool = False, *, level: str | None = None) -> Bite:
-    """Choose which level of bite will be downloaded.
+def track_submitted_code(bite: Bite, feedback: str) -> None:
+    """Store the hash of code that was validated on the platform.
+
+    Args:
+        bite: Bite object with the submitted local code.
+        feedback: The validation feedback.
 
     Returns:
-        A Bite object.
+        None
 
     """
-    if clear:
-        requests_cache.clear()
-    with Status("Retrieving bites..."):
-        r = requests.get(BITES_API)
-        if r.status_code != 200:
-            console.print(
-                ":warning: Unable to reach Pybites Platform.",
-                style=ConsoleStyle.WARNING.value,
-            )
-            console.print(
-                "Ensure internet connect is good and platform is avaiable.",
-                style=ConsoleStyle.SUGGESTION.value,
-            )
-            sys.exit()
-        bites_data = r.json()
-        if level is not None:
-            if level.lower() not in VALID_LEVELS:
-                console.print(
-                    f":warning: Invalid level: {level}.",
-                    style=ConsoleStyle.WARNING.value,
-                )
-                console.print(
-                    f"Valid levels are: {', '.join(VALID_LEVELS)}.",
-                    style=ConsoleStyle.SUGGESTION.value,
-                )
-                sys.exit()
-            bites = {
-                bite["title"]: bite["slug"]
-                for bite in bites_data
-                if bite["level"].lower() == level.lower()
-            }
-        else:
-            bites = {}
-            max_title_length = 0
-            bite_mapping = {}
-
-            for bite in bites_data:
-                title_length = len(bite["title"])
-                max_title_length = max(max_title_length, title_length)
-
-                bites[bite["title"]] = (bite["level"], bite["slug"])
-                bite_mapping[bite["title"]] = bite["slug"]
-            padding = max_title_length + 10
-            formatted_bites = {
-                _format_bite_key(title, level, padding): slug
-                for title, (level, slug) in bites.items()
-            }
+    with open_local_bites() as db:
+        db.update(
+            bite.slug,
+            submitted_hash=code_digest(bite.local_code),
+            passed=PASSED_MESSAGE in feedback,
+        )
 
-    choices = bites if level is not None else formatted_bites
-    bite_to_download = iterfzf(choices, multi=False, ansi=True)
 
-    if bite_to_download is None:
-        sys.exit()
+def local_code_changed(bite: Bite, config: dict) -> bool:
+    """Check whether the code of a bite was edited since it was last seen.
 
-    slug = (
-        bites[bite_to_download]
-        if level is not None
-        else bite_mapping[_unformat_bite_key(bite_to_download)]
-    )
+    The code is compared with the hash stored at its last submission, or
+    at its download if it was never submitted. Bites downloaded before
+    hashes were stored compare the modification times of the code and of
+    the bite's directions instead.
 
-    return Bite(bite_to_download, slug)
+    Args:
+        bite: Bite object.
+        config: Dictionary containing the user's PyBites credentials.
 
+    Returns:
+        True if the code differs from the last submitted or downloaded code.
 
-def download_bite(
-    bite: Bite,
+    """
+    digest = local_code_digest(bite, config)
+    if digest is None:
+        return False
+    with open_local_bites() as db:
+        row = db.get(bite.slug)
+    if row is not None and (row["submitted_hash"] or row["downloaded_hash"]):
+        return digest != (row["submitted_hash"] or row["downloaded_hash"])
+
+    bite_dir = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+    try:
+        downloaded = (bite_dir / "bite.html").stat().st_mtime
+        python_files = [
+            file for file in bite_dir.glob("*.py") if not file.name.startswith("test_")
+        ]
+        return any(file.stat().st_mtime > downloaded for file in python_files)
+    except OSError:
+        return False
+
+
+def choose_local_bites(
     config: dict,
-) -> str | None:
-    """Download the bite content from the PyBites platform.
+    slugs: list[str] | None = None,
+    *,
+    changed: bool = False,
+) -> list[Bite]:
+    """Choose several local bites to submit.
 
     Args:
         config: Dictionary containing the user's PyBites credentials.
-        bite: Bite object containing the title and url of the bite.
+        slugs: Slugs of the bites to submit, all local bites when empty.
+        changed: Only keep bites whose code was edited since the download.
 
     Returns:
-        The content of the bite from the platform.
+        A list of Bite objects.
 
     """
-    with sync_playwright() as p:
-        with p.chromium.launch() as browser:
-            page = login(
-                browser,
-                config["PYBITES_USERNAME"],
-                config["PYBITES_PASSWORD"],
-            )
-            if page.url != PROFILE_URL:
+    with open_local_bites() as db:
+        bites = {
+            row["slug"]: Bite(row["title"], row["slug"], level=row["level"])
+            for row in db.all()
+        }
+    if slugs:
+        for slug in slugs:
+            if slug not in bites:
                 console.print(
-                    ":warning: Unable to login to PyBites.",
+                    f":warning: {slug} has not been downloaded.",
                     style=ConsoleStyle.WARNING.value,
                 )
-                console.print(
-                    "Ensure your credentials are valid.",
-                    style=ConsoleStyle.SUGGESTION.value,
-                )
-                sys.exit()
-            page.goto(bite.url)
-            return page.content()
-
-
-def parse_bite_description(soup: BeautifulSoup) -> str:
-    """Parse the bite description from the soup object.
+        chosen = [bites[slug] for slug in slugs if slug in bites]
+    else:
+        chosen = list(bites.values())
+    if changed:
+        chosen = [bite for bite in chosen if local_code_changed(bite, config)]
+    return chosen
 
-    Args:
-        soup: BeautifulSoup object containing the bite content.
 
+def _format_bite_key(title: str, level: str, padding: int) -> str:
+    """Format the bite key with for display.
     Returns:
-        The bite description html as a string.
-
+        A formatted string with the bite title and level.
     """
-    bite_description = soup.find(id="bite-description")
-    write = False
-    bite_description_str = ""
-    for line in str(bite_description).splitlines():
-        if 'id="filename"' in line:
-            continue
-        if write:
-            bite_description_str += line + "\n"
-        if """end author and learning paths""" in line:
-            write = True
-    return bite_description_str
+    return f"{title:<{padding}}{GREEN}{level.capitalize():>40}{RESET}"
 
 
-def create_bite_dir(
-    bite: Bite,
-    config: dict,
-    force: bool = False,
-) -> None:
-    """Create a directory for the bite and write the bite content to it.
+def fetch_bites(clear: bool = False) -> list[dict]:
+    """Get the list of bites on the PyBites platform.
+
+    The catalog stored on disk is returned right away and refreshed in the
+    background for the next run. The user only waits for the platform when
+    there is no catalog yet or clear is set.
 
     Args:
-        bite: Bite object.
-        config: Dictionary containing the user's PyBites credentials.
-        force: Whether to overwrite the directory if it already exists.
+        clear: Whether to discard the stored catalog and fetch a fresh one.
 
     Returns:
-        None
+        A list of dictionaries with the title, slug and level of each bite.
 
     """
-    dest_path = bite.bite_slug_to_dir(config["PYBITES_REPO"])
-    if dest_path.is_dir() and not force:
+    from .catalog import (
+        CatalogError,
+        fetch_catalog,
+        load_catalog,
+        refresh_catalog_in_background,
+        save_catalog,
+    )
+
+    catalog = None if clear else load_catalog(BITES_CATALOG)
+    if catalog is not None:
+        refresh_catalog_in_background(BITES_CATALOG)
+        return catalog["bites"]
+
+    # the requests-cache database used by earlier versions is never read again
+    LEGACY_BITES_CACHE.unlink(missing_ok=True)
+    with console.status("Retrieving bites..."):
+        try:
+            catalog = fetch_catalog()
+        except CatalogError:
+            catalog = None
+    if catalog is None:
         console.print(
-            f":warning: There already exists a directory for {
-                bite.title}.",
+            ":warning: Unable to reach Pybites Platform.",
             style=ConsoleStyle.WARNING.value,
         )
         console.print(
-            "Use the --force option to overwite.", style=ConsoleStyle.SUGGESTION.value
+            "Ensure internet connect is good and platform is avaiable.",
+            style=ConsoleStyle.SUGGESTION.value,
         )
-        return
+        sys.exit()
+    save_catalog(BITES_CATALOG, catalog)
+    return catalog["bites"]
 
-    soup = BeautifulSoup(bite.platform_content, "html.parser")
 
-    bite_description = parse_bite_description(soup)
-    try:
-        code = soup.find(id="python-editor").text
-        tests = soup.find(id="test-python-editor").text
-        file_name = soup.find(id="filename").text.strip(".py")
-    except AttributeError:
+def _validate_level(level: str) -> None:
+    """Exit if the level is not a valid bite level."""
+    if level.lower() not in VALID_LEVELS:
         console.print(
-            f":warning: Unable to access {bite.title} content on the platform.",
+            f":warning: Invalid level: {level}.",
             style=ConsoleStyle.WARNING.value,
         )
         console.print(
-            "Please make sure that your credentials are valid and you have access to this bite.",
+            f"Valid levels are: {', '.join(VALID_LEVELS)}.",
             style=ConsoleStyle.SUGGESTION.value,
         )
         sys.exit()
 
-    try:
-        makedirs(dest_path)
-    except FileExistsError:
-        pass
-    with open(dest_path / "bite.html", "w", encoding="utf-8") as bite_html:
-        bite_html.write(bite_description)
 
-    with open(dest_path / f"{file_name}.py", "w", encoding="utf-8") as py_file:
-        py_file.write(code)
+def choose_bite(clear: bool = False, *, level: str | None = None) -> Bite:
+    """Choose which level of bite will be downloaded.
 
-    with open(dest_path / f"test_{file_name}.py", "w", encoding="utf-8") as test_file:
-        test_file.write(tests)
-    console.print(
-        f"Wrote {bite.title} to: {dest_path}", style=ConsoleStyle.SUCCESS.value
-    )
+    Returns:
+        A Bite object.
 
+    """
+    bites_data = fetch_bites(clear)
+    if level is not None:
+        _validate_level(level)
+        bites_data = [
+            bite for bite in bites_data if bite["level"].lower() == level.lower()
+        ]
+        choices = [bite["title"] for bite in bites_data]
+    else:
+        padding = max((len(bite["title"]) for bite in bites_data), default=0) + 10
+        choices = [
+            _format_bite_key(bite["title"], bite["level"], padding)
+            for bite in bites_data
+        ]
+
+    chosen = pick(choices, ansi=level is None)
+    if not chosen:
+        sys.exit()
+    bite = bites_data[chosen[0]]
+    return Bite(bite["title"], bite["slug"], level=bite["level"])
 
-def submit_bite(
-    bite: str,
-    config: dict,
-) -> None:
-    """Submit the bite to the PyBites platform.
+
+def choose_bites(
+    slugs: list[str] | None = None,
+    clear: bool = False,
+    *,
+    level: str | None = None,
+    all_bites: bool = False,
+) -> list[Bite]:
+    """Choose several bites to download in one go.
+
+    Bites are picked by slug when slugs are given, otherwise every bite (of
+    the given level) is taken with all_bites, otherwise the user selects
+    them with a multi-select picker.
 
     Args:
-        bite: The name of the bite to submit.
+        slugs: Slugs of the bites to download.
+        clear: Whether to fetch a fresh bites list instead of using the catalog.
+        level: Only consider bites of this difficulty level.
+        all_bites: Whether to take every bite instead of prompting.
+
+    Returns:
+        A list of Bite objects.
+
+    """
+    bites_data = fetch_bites(clear)
+    if level is not None:
+        _validate_level(level)
+        bites_data = [
+            bite for bite in bites_data if bite["level"].lower() == level.lower()
+        ]
+    bites = {
+        bite["slug"]: Bite(bite["title"], bite["slug"], level=bite["level"])
+        for bite in bites_data
+    }
+
+    if slugs:
+        for slug in slugs:
+            if slug not in bites:
+                console.print(
+                    f":warning: Unknown bite: {slug}.",
+                    style=ConsoleStyle.WARNING.value,
+                )
+        return [bites[slug] for slug in slugs if slug in bites]
+    if all_bites:
+        return list(bites.values())
+
+    choices = list(bites.values())
+    chosen = pick([bite.title for bite in choices], multi=True)
+    if not chosen:
+        sys.exit()
+    return [choices[index] for index in chosen]
+
+
+@contextmanager
+def platform_page(config: dict) -> Iterator[Page]:
+    """Open a browser page logged in to the PyBites platform.
+
+    A session saved by a previous run is reused, so the login form is only
+    filled in when there is no valid session.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+
+    Yields:
+        An authenticated page object for the PyBites platform.
+
+    """
+    from playwright.sync_api import sync_playwright
+
+    from .browser import RequestBlocker, launch_options, lean_mode
+
+    with sync_playwright() as p:
+        with span("browser.launch", lean=lean_mode()):
+            browser = p.chromium.launch(**launch_options())
+        with browser:
+            state = load_session_state(config["PYBITES_USERNAME"])
+            context = browser.new_context(storage_state=state)
+            if lean_mode():
+                context.route("**/*", RequestBlocker().handle)
+            if state is None:
+                page = login_context(context, config)
+            else:
+                page = context.new_page()
+                page.set_default_timeout(TIMEOUT_LENGTH)
+            yield page
+
+
+def goto_bite(page: Page, bite: Bite, config: dict) -> None:
+    """Navigate to a bite, logging in again if the session has expired.
+
+    Args:
+        page: Page object for the PyBites platform.
+        bite: Bite object to navigate to.
         config: Dictionary containing the user's PyBites credentials.
 
     Returns:
         None
 
     """
-    with Status("Submitting bite..."):
-        bite.fetch_local_code(config)
-        if bite.local_code is None:
-            return
+    with span("page.goto", bite=bite.slug):
+        goto(page, bite.url)
+    if page.locator(LOGGED_IN_SELECTOR).count():
+        return
+    login_context(page.context, config).close()
+    with span("page.goto", bite=bite.slug):
+        goto(page, bite.url)
 
-        with sync_playwright() as p:
-            with p.chromium.launch() as browser:
-                page = login(
-                    browser,
-                    config["PYBITES_USERNAME"],
-                    config["PYBITES_PASSWORD"],
-                )
-                if page.url != PROFILE_URL:
-                    console.print(
-                        ":warning: Unable to login to PyBites.",
-                        style=ConsoleStyle.WARNING.value,
-                    )
-                    console.print(
-                        "Ensure your credentials are valid.",
-                        style=ConsoleStyle.SUGGESTION.value,
-                    )
-                    return
-                page.goto(bite.url)
-                page.wait_for_url(bite.url)
-                page.evaluate(
-                    f"""document.querySelector('.CodeMirror').CodeMirror.setValue({
-                        repr(bite.local_code)})"""
-                )
-                page.click("#validate-button")
-                page.wait_for_selector("#feedback", state="visible")
-                page.wait_for_function(
-                    "document.querySelector('#feedback').innerText.includes('test session starts')"
-                )
 
-                validate_result = page.text_content("#feedback")
-    if "Congrats, you passed this Bite" in validate_result:
-        console.print(
-            "Congrats, you passed this Bite!", style=ConsoleStyle.SUCCESS.value
-        )
-    else:
+def _extract_bite(bite: Bite, config: dict, force: bool) -> None:
+    """Write a downloaded bite to disk and track it."""
+    fresh = force or not bite.bite_slug_to_dir(config["PYBITES_REPO"]).is_dir()
+    if create_bite_dir(bite, config, force):
+        track_local_bites(bite, config)
+        if fresh:
+            track_downloaded_code(bite, config)
+
+
+def fetch_bites_over_http(
+    bites: list[Bite],
+    config: dict,
+    handle: Callable[[Bite], None],
+    status: Status | None = None,
+    action: str = "Downloading",
+) -> list[Bite]:
+    """Fetch the platform pages of bites without a browser.
+
+    Args:
+        bites: Bite objects to fetch.
+        config: Dictionary containing the user's PyBites credentials.
+        handle: Called with each bite once its page is in platform_content.
+        status: Status spinner to report progress on.
+        action: Progress message shown for each bite.
+
+    Returns:
+        The bites that could not be fetched over HTTP.
+
+    """
+    import requests
+
+    from .web import LoginError, PlatformError, PlatformSession
+
+    missing = []
+    username = config["PYBITES_USERNAME"]
+    with PlatformSession(
+        username, config["PYBITES_PASSWORD"], load_session_state(username)
+    ) as http:
+        for index, bite in enumerate(bites):
+            if status is not None:
+                status.update(f"{action} {bite.title}...")
+            try:
+                bite.platform_content = http.fetch_bite(bite.url)
+            except LoginError:
+                return missing + bites[index:]
+            except (PlatformError, requests.RequestException):
+                missing.append(bite)
+                continue
+            handle(bite)
+        if http.logged_in:
+            save_session_state(http.storage_state(), username)
+    return missing
+
+
+def store_page(cache: PageCache, bite: Bite) -> None:
+    """Keep the platform page of a bite in the page cache."""
+    try:
+        cache.put(bite.slug, bite.title, bite.level, bite.platform_content)
+    except OSError:
         console.print(
-            ":warning: Code did not pass the tests.", style=ConsoleStyle.WARNING.value
+            f":warning: Unable to store the page of {bite.title} in {cache.root}.",
+            style=ConsoleStyle.WARNING.value,
         )
 
-    if Confirm.ask(f"Would you like to open {bite.title} in your browser?"):
-        webbrowser.open(bite.url)
 
+def download_bites_over_http(
+    bites: list[Bite],
+    config: dict,
+    force: bool = False,
+    status: Status | None = None,
+) -> list[Bite]:
+    """Download, extract and track bites without a browser.
 
-def display_bite(
-    bite: Bite,
+    The downloaded pages are kept in the page cache, so the bites can be
+    extracted again without the network.
+
+    Args:
+        bites: Bite objects to download.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite existing bite directories.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The bites that could not be downloaded over HTTP.
+
+    """
+    from .mirror import PageCache
+
+    cache = PageCache(PAGE_CACHE)
+
+    def extract(bite: Bite) -> None:
+        store_page(cache, bite)
+        _extract_bite(bite, config, force)
+
+    return fetch_bites_over_http(bites, config, extract, status)
+
+
+def download_bites_with_daemon(
+    bites: list[Bite],
     config: dict,
-    theme: str,
+    force: bool = False,
+    workers: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> list[Bite]:
+    """Download, extract and track bites through a running daemon.
+
+    Args:
+        bites: Bite objects to download.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite existing bite directories.
+        workers: Number of bites downloaded at the same time.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The bites the daemon did not download, all of them when no daemon
+        is running.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .daemon import DaemonError, connect_daemon
+    from .extract import ExtractError, bite_page_from_record
+    from .mirror import PageCache
+
+    daemon = connect_daemon(config["PYBITES_USERNAME"])
+    if daemon is None or not bites:
+        return list(bites)
+    cache = PageCache(PAGE_CACHE)
+
+    def fetch(bite: Bite) -> dict | None:
+        try:
+            return daemon.call("fetch", slug=bite.slug)
+        except DaemonError:
+            return None
+
+    missing = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for bite, reply in zip(bites, pool.map(fetch, bites)):
+            if status is not None:
+                status.update(f"Downloaded {bite.title}...")
+            if reply is None:
+                missing.append(bite)
+                continue
+            if "html" in reply:
+                bite.platform_content = reply["html"]
+                store_page(cache, bite)
+            else:
+                try:
+                    bite.extracted = bite_page_from_record(reply["record"])
+                except ExtractError:
+                    bite.extracted = None
+            _extract_bite(bite, config, force)
+    return missing
+
+
+async def run_page_pool(
+    context: AsyncBrowserContext,
+    bites: list[Bite],
+    config: dict,
+    handle: Callable[[AsyncPage, Bite], Awaitable[None]],
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+    action: str = "Loading",
 ) -> None:
-    """Display the instructions and source code for a bite.
+    """Open bites in a pool of browser pages and hand each one to a handler.
+
+    Every page takes the next bite from a shared queue, so at most `pages`
+    bites are worked on at the same time. When the session has expired, a
+    single page logs in again for all of them.
 
     Args:
-        bite: The name of the bite to display.
+        context: Logged in Playwright asynchronous browser context.
+        bites: Bite objects to open.
         config: Dictionary containing the user's PyBites credentials.
-        theme: The color theme for the code.
+        handle: Coroutine function called with the page showing a bite.
+        pages: Number of pages working concurrently.
+        status: Status spinner to report progress on.
+        action: Progress message shown for each bite.
 
     Returns:
         None
 
     """
-    path = bite.bite_slug_to_dir(config["PYBITES_REPO"])
-    if not path.is_dir():
-        console.print(
-            f":warning: Unable to display bite {
-                bite.title}.",
-            style=ConsoleStyle.WARNING.value,
-        )
-        console.print(
-            "Please make sure that path is correct and the bite has been downloaded.",
-            style=ConsoleStyle.SUGGESTION.value,
-        )
-        return
+    import asyncio
+
+    from playwright.async_api import Error as PlaywrightError
+
+    queue: asyncio.Queue[Bite] = asyncio.Queue()
+    for bite in bites:
+        queue.put_nowait(bite)
+    login_lock = asyncio.Lock()
+    logins = 0
+
+    async def relogin(seen: int) -> None:
+        nonlocal logins
+        async with login_lock:
+            # another page may have logged in while this one was waiting
+            if logins == seen:
+                await login_context_async(context, config)
+                logins += 1
+
+    async def worker() -> None:
+        page = await context.new_page()
+        while not queue.empty():
+            bite = queue.get_nowait()
+            if status is not None:
+                status.update(f"{action} {bite.title}...")
+            seen = logins
+            try:
+                with span("page.goto", bite=bite.slug):
+                    await goto_async(page, bite.url)
+                if not await page.locator(LOGGED_IN_SELECTOR).count():
+                    await relogin(seen)
+                    with span("page.goto", bite=bite.slug):
+                        await goto_async(page, bite.url)
+                await handle(page, bite)
+            except PlaywrightError:
+                console.print(
+                    f":warning: Unable to load {bite.title} on the platform.",
+                    style=ConsoleStyle.WARNING.value,
+                )
+        await page.close()
 
-    html_file = path / list(path.glob("*.html"))[0]
-    python_file = [
-        file for file in list(path.glob("*.py")) if not file.name.startswith("test_")
-    ][0]
+    await asyncio.gather(*(worker() for _ in range(min(pages, len(bites)))))
 
-    with open(html_file, "r") as bite_html:
-        soup = BeautifulSoup(bite_html, "html.parser")
-        instructions = soup.text
 
-    with open(python_file, "r") as code_file:
-        code = Syntax(
-            code_file.read(),
-            "python",
-            theme=theme,
-            background_color="default",
-        )
+@asynccontextmanager
+async def platform_context(config: dict) -> AsyncIterator[AsyncBrowserContext]:
+    """Open a headless browser context logged in to the PyBites platform.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+
+    Yields:
+        A logged in Playwright asynchronous browser context.
+
+    Raises:
+        LoginError: If the credentials are not accepted.
+
+    """
+    from playwright.async_api import async_playwright
+
+    from .browser import RequestBlocker, launch_options, lean_mode
+
+    async with async_playwright() as p:
+        with span("browser.launch", lean=lean_mode()):
+            browser = await p.chromium.launch(**launch_options())
+        state = load_session_state(config["PYBITES_USERNAME"])
+        context = await browser.new_context(storage_state=state)
+        if lean_mode():
+            await context.route("**/*", RequestBlocker().handle_async)
+        context.set_default_timeout(TIMEOUT_LENGTH)
+        if state is None:
+            await login_context_async(context, config)
+        yield context
+        await browser.close()
+
+
+async def download_pages(
+    context: AsyncBrowserContext,
+    bites: list[Bite],
+    config: dict,
+    force: bool = False,
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> None:
+    """Download, extract and track bites with a pool of browser pages.
+
+    The bite's elements are read inside each page, and written to disk in
+    worker threads to keep the event loop free for the pages.
+
+    Args:
+        context: Logged in Playwright asynchronous browser context.
+        bites: Bite objects to download.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite existing bite directories.
+        pages: Number of pages loading bites concurrently.
+        status: Status spinner to report progress on.
+
+    Returns:
+        None
+
+    """
+    import asyncio
+
+    from .extract import BITE_PAGE_SCRIPT, ExtractError, bite_page_from_record
+
+    async def extract(page: AsyncPage, bite: Bite) -> None:
+        try:
+            with span("extract.browser", bite=bite.slug):
+                bite.extracted = bite_page_from_record(
+                    await page.evaluate(BITE_PAGE_SCRIPT)
+                )
+        except ExtractError:
+            bite.extracted = None
+        await asyncio.to_thread(_extract_bite, bite, config, force)
+
+    await run_page_pool(
+        context, bites, config, extract, pages, status, action="Downloading"
+    )
+
+
+async def download_bites_in_browser(
+    bites: list[Bite],
+    config: dict,
+    force: bool = False,
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> None:
+    """Download, extract and track bites with one headless browser.
+
+    Args:
+        bites: Bite objects to download.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite existing bite directories.
+        pages: Number of pages loading bites concurrently.
+        status: Status spinner to report progress on.
+
+    Returns:
+        None
+
+    """
+    async with platform_context(config) as context:
+        await download_pages(context, bites, config, force, pages, status)
+
+
+def download_bites(
+    bites: list[Bite],
+    config: dict,
+    force: bool = False,
+    pages: int = BROWSER_PAGES,
+) -> None:
+    """Download, extract and track several bites over one session.
+
+    A running daemon downloads the bites over its warm session. Otherwise
+    bites are fetched over plain HTTP first, the ones that fail are
+    downloaded concurrently with a single headless browser.
+
+    Args:
+        bites: Bite objects to download.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite existing bite directories.
+        pages: Number of browser pages loading bites concurrently.
+
+    Returns:
+        None
+
+    """
+    import asyncio
+
+    from .web import LoginError
+
+    with console.status("Downloading bites...") as status:
+        bites = download_bites_with_daemon(bites, config, force, pages, status)
+        bites = download_bites_over_http(bites, config, force, status)
+        if not bites:
+            return
+        status.update("Logging in to PyBites...")
+        try:
+            asyncio.run(download_bites_in_browser(bites, config, force, pages, status))
+        except LoginError:
+            status.stop()
+            _exit_login_failed()
+
+
+async def store_pages_in_browser(
+    bites: list[Bite],
+    config: dict,
+    cache: PageCache,
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> list[str]:
+    """Store the platform pages of bites with a pool of browser pages.
+
+    Args:
+        bites: Bite objects whose pages to store.
+        config: Dictionary containing the user's PyBites credentials.
+        cache: The page cache to store the pages in.
+        pages: Number of pages loading bites concurrently.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The slugs of the bites whose page was stored.
+
+    """
+    import asyncio
+
+    stored = []
+
+    async def store(page: AsyncPage, bite: Bite) -> None:
+        html = await page.content()
+        await asyncio.to_thread(cache.put, bite.slug, bite.title, bite.level, html)
+        stored.append(bite.slug)
+
+    async with platform_context(config) as context:
+        await run_page_pool(
+            context, bites, config, store, pages, status, action="Storing"
+        )
+    return stored
+
+
+def sync_bites(
+    bites: list[Bite],
+    config: dict,
+    force: bool = False,
+    pages: int = BROWSER_PAGES,
+) -> None:
+    """Store the platform pages of bites in the page cache.
+
+    Pages are fetched over plain HTTP first, the ones that fail are loaded
+    with a single headless browser. Bites whose page is already stored are
+    skipped unless force is set.
+
+    Args:
+        bites: Bite objects whose pages to store.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to fetch pages that are already stored again.
+        pages: Number of browser pages loading bites concurrently.
+
+    Returns:
+        None
+
+    """
+    import asyncio
+
+    from .mirror import PageCache
+    from .web import LoginError
+
+    cache = PageCache(PAGE_CACHE)
+    if not force:
+        bites = [bite for bite in bites if cache.ref(bite.slug) is None]
+    if not bites:
+        console.print(
+            "The pages of these bites are already stored.",
+            style=ConsoleStyle.SUCCESS.value,
+        )
+        console.print(
+            "Use the --force option to fetch them again.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+
+    stored = []
+
+    def store(bite: Bite) -> None:
+        store_page(cache, bite)
+        # the page is on disk now, only keep one page in memory at a time
+        bite.platform_content = None
+        stored.append(bite.slug)
+
+    with console.status("Storing bite pages...") as status:
+        missing = fetch_bites_over_http(bites, config, store, status, "Storing")
+        if missing:
+            status.update("Logging in to PyBites...")
+            try:
+                stored += asyncio.run(
+                    store_pages_in_browser(missing, config, cache, pages, status)
+                )
+            except LoginError:
+                status.stop()
+                _exit_login_failed()
+        # pages replaced by newer ones are only removed once everything is
+        # stored
+        cache.prune()
+    console.print(
+        f"Stored {len(stored)} of {len(bites)} bite pages in {cache.root}",
+        style=ConsoleStyle.SUCCESS.value,
+    )
+
+
+def reextract_bites(
+    config: dict,
+    slugs: list[str] | None = None,
+    force: bool = False,
+    processes: int | None = None,
+) -> None:
+    """Rebuild bite directories from the pages in the page cache.
+
+    The stored pages are extracted in a pool of processes, the bite
+    directories are written and tracked as the results come in.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+        slugs: Slugs of the bites to rebuild, all stored bites when empty.
+        force: Whether to overwrite existing bite directories.
+        processes: Number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+        None
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .mirror import PageCache, extract_stored_page
+
+    cache = PageCache(PAGE_CACHE)
+    refs = {ref["slug"]: ref for ref in cache.refs()}
+    if slugs:
+        for slug in slugs:
+            if slug not in refs:
+                console.print(
+                    f":warning: The page of {slug} has not been stored.",
+                    style=ConsoleStyle.WARNING.value,
+                )
+        refs = {slug: refs[slug] for slug in slugs if slug in refs}
+    elif not refs:
+        console.print(
+            ":warning: There are no stored bite pages.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            "Run eatlocal sync to store the pages of your bites.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+
+    bites = [
+        Bite(ref["title"], ref["slug"], level=ref["level"]) for ref in refs.values()
+    ]
+    if not force:
+        existing = {
+            bite.slug
+            for bite in bites
+            if bite.bite_slug_to_dir(config["PYBITES_REPO"]).is_dir()
+        }
+        if existing:
+            console.print(
+                f"Skipped {len(existing)} bites that already have a directory.",
+                style=ConsoleStyle.SUGGESTION.value,
+            )
+            console.print(
+                "Use the --force option to overwite.",
+                style=ConsoleStyle.SUGGESTION.value,
+            )
+            bites = [bite for bite in bites if bite.slug not in existing]
+    paths = [cache.object_path(refs[bite.slug]["digest"]) for bite in bites]
+
+    def write(extracted: Iterator[BitePage | None]) -> None:
+        for bite, page in zip(bites, extracted):
+            if page is None:
+                console.print(
+                    f":warning: Unable to extract {bite.title} from its stored page.",
+                    style=ConsoleStyle.WARNING.value,
+                )
+                continue
+            bite.extracted = page
+            _extract_bite(bite, config, force)
+
+    if len(bites) < 2 or processes == 1:
+        write(map(extract_stored_page, paths))
+        return
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        write(executor.map(extract_stored_page, paths, chunksize=chunksize))
+
+
+def create_bite_dir(
+    bite: Bite,
+    config: dict,
+    force: bool = False,
+) -> bool:
+    """Create a directory for the bite and write the bite content to it.
+
+    Args:
+        bite: Bite object.
+        config: Dictionary containing the user's PyBites credentials.
+        force: Whether to overwrite the directory if it already exists.
+
+    Returns:
+        True if the bite directory is in place, False if the bite content
+        could not be extracted.
+
+    """
+    from .extract import ExtractError, extract_bite_page
+    from .render import RenderCache, instructions_text
+
+    dest_path = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+    if dest_path.is_dir() and not force:
+        console.print(
+            f":warning: There already exists a directory for {bite.title}.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            "Use the --force option to overwite.", style=ConsoleStyle.SUGGESTION.value
+        )
+        return True
+
+    try:
+        with span("extract", bite=bite.slug):
+            page = bite.extracted or extract_bite_page(bite.platform_content or "")
+    except ExtractError:
+        console.print(
+            f":warning: Unable to access {bite.title} content on the platform.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            "Please make sure that your credentials are valid and you have access to this bite.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return False
+
+    with span("write", bite=bite.slug):
+        try:
+            makedirs(dest_path)
+        except FileExistsError:
+            pass
+        with open(dest_path / "bite.html", "w", encoding="utf-8") as bite_html:
+            bite_html.write(page.description)
+        # the display reads the plain text instead of parsing the html again
+        RenderCache(DISPLAY_CACHE).save(
+            dest_path / "bite.html", "text", instructions_text(page.description)
+        )
+
+        with open(dest_path / f"{page.file_name}.py", "w", encoding="utf-8") as py_file:
+            py_file.write(page.code)
+
+        with open(
+            dest_path / f"test_{page.file_name}.py", "w", encoding="utf-8"
+        ) as test_file:
+            test_file.write(page.tests)
+    console.print(
+        f"Wrote {bite.title} to: {dest_path}", style=ConsoleStyle.SUCCESS.value
+    )
+    return True
+
+
+def watch_feedback(page: Page, on_output: Callable[[str], None] | None = None) -> str:
+    """Read the validation feedback of a page as it arrives.
+
+    Args:
+        page: Page object on which the bite is being validated.
+        on_output: Called with each line of feedback as it arrives.
+
+    Returns:
+        The text of the validation feedback, as soon as it holds the final
+        result.
+
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    from .feedback import FEEDBACK_CHANGED_SCRIPT, FeedbackStream
+
+    stream = FeedbackStream(on_output)
+    with span("validate.wait"):
+        while not stream.complete:
+            try:
+                changed = page.wait_for_function(
+                    FEEDBACK_CHANGED_SCRIPT,
+                    arg=stream.text,
+                    polling=FEEDBACK_POLL_INTERVAL,
+                    timeout=stream.wait_timeout,
+                )
+            except PlaywrightTimeoutError:
+                if stream.summary is None:
+                    raise
+                break
+            stream.update(changed.json_value())
+    stream.close()
+    return stream.text
+
+
+async def watch_feedback_async(
+    page: AsyncPage, on_output: Callable[[str], None] | None = None
+) -> str:
+    """Read the validation feedback of an asynchronous page as it arrives.
+
+    Args:
+        page: Page object on which the bite is being validated.
+        on_output: Called with each line of feedback as it arrives.
+
+    Returns:
+        The text of the validation feedback, as soon as it holds the final
+        result.
+
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    from .feedback import FEEDBACK_CHANGED_SCRIPT, FeedbackStream
+
+    stream = FeedbackStream(on_output)
+    with span("validate.wait"):
+        while not stream.complete:
+            try:
+                changed = await page.wait_for_function(
+                    FEEDBACK_CHANGED_SCRIPT,
+                    arg=stream.text,
+                    polling=FEEDBACK_POLL_INTERVAL,
+                    timeout=stream.wait_timeout,
+                )
+            except PlaywrightTimeoutError:
+                if stream.summary is None:
+                    raise
+                break
+            stream.update(await changed.json_value())
+    stream.close()
+    return stream.text
+
+
+def validate_bite_in_browser(
+    bite: Bite, config: dict, on_output: Callable[[str], None] | None = None
+) -> str:
+    """Validate the local code of a bite through the platform's editor.
+
+    Args:
+        bite: Bite object with its local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        on_output: Called with each line of feedback as it arrives.
+
+    Returns:
+        The text of the validation feedback.
+
+    """
+    with platform_page(config) as page:
+        goto_bite(page, bite, config)
+        page.wait_for_url(bite.url)
+        page.evaluate(
+            "code => document.querySelector('.CodeMirror').CodeMirror.setValue(code)",
+            bite.local_code,
+        )
+        page.click("#validate-button")
+        page.wait_for_selector("#feedback", state="visible")
+        return watch_feedback(page, on_output)
+
+
+def validate_bite(
+    bite: Bite, config: dict, on_output: Callable[[str], None] | None = None
+) -> str:
+    """Validate the local code of a bite on the PyBites platform.
+
+    A running daemon validates the bite over its warm session. Otherwise
+    the code is posted to the validation endpoint over plain HTTP, the
+    browser is only used when the code could not be sent that way.
+
+    Args:
+        bite: Bite object with its local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        on_output: Called with each line of feedback as it arrives.
+
+    Returns:
+        The text of the validation feedback.
+
+    Raises:
+        SubmissionError: If the code was sent but its feedback not read.
+
+    """
+    import requests
+
+    from .daemon import DaemonError, DaemonJobError, connect_daemon
+    from .web import PlatformError, PlatformSession, SubmissionError
+
+    username = config["PYBITES_USERNAME"]
+    daemon = connect_daemon(username)
+    if daemon is not None:
+        try:
+            return daemon.call(
+                "validate", on_output, slug=bite.slug, code=bite.local_code
+            )["feedback"]
+        except DaemonJobError as error:
+            # the daemon may still be submitting the code
+            raise SubmissionError(f"{bite.title}: {error}") from error
+        except DaemonError:
+            pass
+    with PlatformSession(
+        username, config["PYBITES_PASSWORD"], load_session_state(username)
+    ) as http:
+        try:
+            feedback = http.validate(bite.url, bite.local_code, on_output)
+        except (PlatformError, requests.RequestException):
+            # the code did not reach the platform, the browser can send it
+            feedback = None
+        finally:
+            if http.logged_in:
+                save_session_state(http.storage_state(), username)
+    if feedback is not None:
+        return feedback
+    return validate_bite_in_browser(bite, config, on_output)
+
+
+def validate_bites_with_daemon(
+    bites: list[Bite],
+    config: dict,
+    workers: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> tuple[dict[str, str], list[Bite]]:
+    """Validate several bites concurrently through a running daemon.
+
+    Args:
+        bites: Bite objects with their local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        workers: Number of bites validated at the same time.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The validation feedback by bite slug, and the bites the daemon did
+        not take, all of them when no daemon is running. Bites whose job
+        was taken but not finished are in neither.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .daemon import DaemonError, DaemonJobError, connect_daemon
+
+    daemon = connect_daemon(config["PYBITES_USERNAME"])
+    if daemon is None or not bites:
+        return {}, list(bites)
+    sent = set()
+
+    def validate(bite: Bite) -> str | None:
+        try:
+            reply = daemon.call("validate", slug=bite.slug, code=bite.local_code)
+        except DaemonJobError as error:
+            # the daemon may still be submitting the code
+            sent.add(bite.slug)
+            console.print(
+                f":warning: {bite.title}: {error}", style=ConsoleStyle.WARNING.value
+            )
+            return None
+        except DaemonError:
+            return None
+        return reply["feedback"]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for bite, feedback in zip(bites, pool.map(validate, bites)):
+            if status is not None:
+                status.update(f"Validated {bite.title}...")
+            if feedback is not None:
+                results[bite.slug] = feedback
+    return results, [
+        bite for bite in bites if bite.slug not in results and bite.slug not in sent
+    ]
+
+
+def validate_bites_over_http(
+    bites: list[Bite],
+    config: dict,
+    workers: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> tuple[dict[str, str], list[Bite]]:
+    """Validate several bites concurrently over one HTTP session.
+
+    Args:
+        bites: Bite objects with their local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        workers: Number of bites validated at the same time.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The validation feedback by bite slug, and the bites whose code could
+        not be sent over HTTP. Bites that were sent but got no feedback are
+        in neither, they must not be submitted again.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    from .web import PlatformError, PlatformSession, SubmissionError
+
+    username = config["PYBITES_USERNAME"]
+    results = {}
+    sent = set()
+
+    def validate(bite: Bite) -> str | None:
+        try:
+            return http.validate(bite.url, bite.local_code)
+        except SubmissionError as error:
+            # submitting again would cost the user another attempt
+            sent.add(bite.slug)
+            console.print(f":warning: {error}", style=ConsoleStyle.WARNING.value)
+        except (PlatformError, requests.RequestException):
+            pass
+        return None
+
+    with PlatformSession(
+        username, config["PYBITES_PASSWORD"], load_session_state(username)
+    ) as http:
+        try:
+            # log in once up front instead of in every worker
+            http.fetch(PROFILE_URL)
+        except (PlatformError, requests.RequestException):
+            return results, list(bites)
+        if http.logged_in:
+            save_session_state(http.storage_state(), username)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for bite, feedback in zip(bites, pool.map(validate, bites)):
+                if status is not None:
+                    status.update(f"Validated {bite.title}...")
+                if feedback is not None:
+                    results[bite.slug] = feedback
+    return results, [
+        bite for bite in bites if bite.slug not in results and bite.slug not in sent
+    ]
+
+
+async def validate_pages(
+    context: AsyncBrowserContext,
+    bites: list[Bite],
+    config: dict,
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> dict[str, str]:
+    """Validate bites in a pool of browser tabs.
+
+    Args:
+        context: Logged in Playwright asynchronous browser context.
+        bites: Bite objects with their local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        pages: Number of tabs validating bites concurrently.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The validation feedback by bite slug.
+
+    """
+    results = {}
+
+    async def validate(page: AsyncPage, bite: Bite) -> None:
+        await page.evaluate(
+            "code => document.querySelector('.CodeMirror').CodeMirror.setValue(code)",
+            bite.local_code,
+        )
+        await page.click("#validate-button")
+        await page.wait_for_selector("#feedback", state="visible")
+        results[bite.slug] = await watch_feedback_async(page)
+
+    await run_page_pool(
+        context, bites, config, validate, pages, status, action="Validating"
+    )
+    return results
+
+
+async def validate_bites_in_browser_pool(
+    bites: list[Bite],
+    config: dict,
+    pages: int = BROWSER_PAGES,
+    status: Status | None = None,
+) -> dict[str, str]:
+    """Validate bites in the tabs of one headless browser.
+
+    Args:
+        bites: Bite objects with their local code loaded.
+        config: Dictionary containing the user's PyBites credentials.
+        pages: Number of tabs validating bites concurrently.
+        status: Status spinner to report progress on.
+
+    Returns:
+        The validation feedback by bite slug.
+
+    """
+    async with platform_context(config) as context:
+        return await validate_pages(context, bites, config, pages, status)
+
+
+def print_submission_summary(bites: list[Bite], results: dict[str, str]) -> None:
+    """Print one table with the outcome of every submitted bite.
+
+    Args:
+        bites: Bite objects that were submitted.
+        results: The validation feedback by bite slug.
+
+    Returns:
+        None
+
+    """
+    from rich.table import Table
+
+    table = Table(title="Submission results")
+    table.add_column("Bite")
+    table.add_column("Result")
+    for bite in bites:
+        feedback = results.get(bite.slug)
+        if feedback is None:
+            result = f"[{ConsoleStyle.SUGGESTION.value}]Not validated"
+        elif PASSED_MESSAGE in feedback:
+            result = f"[{ConsoleStyle.SUCCESS.value}]Passed"
+        else:
+            result = f"[{ConsoleStyle.WARNING.value}]Failed"
+        table.add_row(bite.title, result)
+    console.print(table)
+    passed = sum(PASSED_MESSAGE in feedback for feedback in results.values())
+    console.print(f"{passed} of {len(bites)} bites passed.")
+
+
+def submit_bites(
+    bites: list[Bite],
+    config: dict,
+    pages: int = BROWSER_PAGES,
+) -> dict[str, str]:
+    """Submit several bites to the PyBites platform at once.
+
+    A running daemon validates the bites over its warm session. Otherwise
+    bites are validated concurrently over HTTP, the ones that fail are
+    validated in the tabs of a single headless browser.
+
+    Args:
+        bites: Bite objects to submit.
+        config: Dictionary containing the user's PyBites credentials.
+        pages: Number of bites validated at the same time.
+
+    Returns:
+        The validation feedback by bite slug.
+
+    """
+    import asyncio
+
+    from .web import LoginError
+
+    with console.status("Submitting bites...") as status:
+        for bite in bites:
+            bite.fetch_local_code(config)
+        ready = [bite for bite in bites if bite.local_code is not None]
+        results, remaining = validate_bites_with_daemon(ready, config, pages, status)
+        if remaining:
+            more, remaining = validate_bites_over_http(remaining, config, pages, status)
+            results |= more
+        if remaining:
+            status.update("Logging in to PyBites...")
+            try:
+                results |= asyncio.run(
+                    validate_bites_in_browser_pool(remaining, config, pages, status)
+                )
+            except LoginError:
+                status.stop()
+                _exit_login_failed()
+    for bite in ready:
+        if bite.slug in results:
+            track_submitted_code(bite, results[bite.slug])
+    print_submission_summary(bites, results)
+    return results
+
+
+def submit_bite(
+    bite: str,
+    config: dict,
+) -> None:
+    """Submit the bite to the PyBites platform.
+
+    The validation feedback is printed as it arrives.
+
+    Args:
+        bite: The name of the bite to submit.
+        config: Dictionary containing the user's PyBites credentials.
+
+    Returns:
+        None
+
+    """
+
+    from .web import SubmissionError
+
+    def show(line: str) -> None:
+        console.print(line, markup=False, highlight=False)
+
+    with console.status("Submitting bite..."):
+        bite.fetch_local_code(config)
+        if bite.local_code is None:
+            return
+        try:
+            validate_result = validate_bite(bite, config, show)
+        except SubmissionError as error:
+            console.print(
+                f":warning: {error} Check the bite on the platform before "
+                "submitting it again.",
+                style=ConsoleStyle.WARNING.value,
+            )
+            return
+    track_submitted_code(bite, validate_result)
+    if PASSED_MESSAGE in validate_result:
+        console.print(
+            "Congrats, you passed this Bite!", style=ConsoleStyle.SUCCESS.value
+        )
+    else:
+        console.print(
+            ":warning: Code did not pass the tests.", style=ConsoleStyle.WARNING.value
+        )
+
+    if Confirm.ask(f"Would you like to open {bite.title} in your browser?"):
+        webbrowser.open(bite.url)
+
+
+def run_local_tests(
+    bites: list[Bite],
+    config: dict,
+    jobs: int | None = None,
+    timeout: float = TEST_TIMEOUT,
+) -> dict[str, BiteTestResult]:
+    """Run the tests of local bites in parallel and print the results.
+
+    Every bite is tested by its own pytest process, in a copy of its
+    directory.
+
+    Args:
+        bites: Bite objects to test.
+        config: Dictionary containing the user's PyBites credentials.
+        jobs: Number of bites tested at the same time, defaults to the
+            number of CPUs.
+        timeout: Seconds after which the tests of a bite are stopped.
+
+    Returns:
+        The test results by bite slug.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from .runner import run_bite_tests
+
+    bite_dirs = {}
+    for bite in bites:
+        bite_dir = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+        if bite_dir.is_dir():
+            bite_dirs[bite.slug] = bite_dir
+        else:
+            console.print(
+                f":warning: Unable to find bite {bite.title} locally.",
+                style=ConsoleStyle.WARNING.value,
+            )
+
+    results = {}
+    titles = {bite.slug: bite.title for bite in bites}
+    # each bite runs in its own process, the threads only wait on them
+    with (
+        console.status("Testing bites...") as status,
+        ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool,
+    ):
+        futures = [
+            pool.submit(run_bite_tests, slug, bite_dir, timeout)
+            for slug, bite_dir in bite_dirs.items()
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.slug] = result
+            status.update(f"Tested {titles[result.slug]}...")
+    print_test_summary(bites, results)
+    return results
+
+
+def print_workspace_status(
+    config: dict,
+    only: list[str] | None = None,
+    workers: int | None = None,
+    *,
+    all_bites: bool = False,
+) -> None:
+    """Print the status of the local bites in one table.
+
+    The bites to work on, modified, failed or unreadable, are listed by
+    default, and how many bites have each status.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+        only: Statuses of the bites to list.
+        workers: Number of bite directories scanned at the same time.
+        all_bites: Whether to list every bite.
+
+    Returns:
+        None
+
+    """
+    from collections import Counter
+
+    from rich.table import Table
+
+    from .workspace import SCAN_WORKERS, STATUSES, WorkspaceScanner
+
+    unknown = set(only or ()) - set(STATUSES)
+    if unknown:
+        console.print(
+            f":warning: Unknown status {', '.join(sorted(unknown))}.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            f"Choose from {', '.join(STATUSES)}.", style=ConsoleStyle.SUGGESTION.value
+        )
+        sys.exit()
+
+    with open_local_bites() as db:
+        bites = db.all()
+    with span("status.scan", bites=len(bites)):
+        statuses = WorkspaceScanner(WORKSPACE_CACHE).scan(
+            config["PYBITES_REPO"], bites, workers or SCAN_WORKERS
+        )
+
+    styles = {
+        "modified": ConsoleStyle.SUGGESTION.value,
+        "failed": ConsoleStyle.WARNING.value,
+        "passed": ConsoleStyle.SUCCESS.value,
+        "unreadable": ConsoleStyle.WARNING.value,
+        "untouched": "default",
+        "missing": "dim",
+    }
+    table = Table(title="Local bites")
+    table.add_column("Bite")
+    table.add_column("Level")
+    table.add_column("Status")
+    listed = set(
+        STATUSES if all_bites else only or ("modified", "failed", "unreadable")
+    )
+    for bite in sorted(bites, key=lambda bite: STATUSES.index(statuses[bite["slug"]])):
+        status = statuses[bite["slug"]]
+        if status not in listed:
+            continue
+        table.add_row(
+            bite["title"],
+            bite["level"] or "",
+            f"[{styles[status]}]{status.capitalize()}",
+        )
+    if table.rows:
+        console.print(table)
+    counts = Counter(statuses.values())
+    console.print(
+        ", ".join(f"{counts[status]} {status}" for status in STATUSES if counts[status])
+        or "No bites downloaded yet."
+    )
+
+
+def print_test_summary(bites: list[Bite], results: dict[str, BiteTestResult]) -> None:
+    """Print one table with the local test results of every bite.
+
+    Args:
+        bites: Bite objects that were tested.
+        results: The test results by bite slug.
+
+    Returns:
+        None
+
+    """
+    from rich.table import Table
+
+    styles = {
+        "passed": ConsoleStyle.SUCCESS.value,
+        "no tests": ConsoleStyle.SUGGESTION.value,
+    }
+    table = Table(title="Test results")
+    table.add_column("Bite")
+    table.add_column("Result")
+    table.add_column("Tests", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Failed tests")
+    for bite in bites:
+        result = results.get(bite.slug)
+        if result is None:
+            table.add_row(bite.title, f"[{ConsoleStyle.SUGGESTION.value}]Not tested")
+            continue
+        style = styles.get(result.outcome, ConsoleStyle.WARNING.value)
+        total = result.passed + len(result.failures) + result.skipped
+        table.add_row(
+            bite.title,
+            f"[{style}]{result.outcome.capitalize()}",
+            f"{result.passed}/{total}",
+            f"{result.duration:.1f}s",
+            ", ".join(result.failures),
+        )
+    console.print(table)
+    passed = sum(result.outcome == "passed" for result in results.values())
+    console.print(f"{passed} of {len(bites)} bites passed their tests.")
+
+
+def print_trace_report(trace_file: Path) -> None:
+    """Print the latency percentiles of each phase across traced runs.
+
+    Args:
+        trace_file: Location of the trace file.
+
+    Returns:
+        None
+
+    """
+    from rich.table import Table
+
+    from .tracing import read_spans, summarize_spans
+
+    spans = read_spans(trace_file)
+    if not spans:
+        console.print(
+            f":warning: No traced runs in {trace_file}.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            "Run eatlocal with --trace or EATLOCAL_TRACE=1 to record them.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+
+    summaries = summarize_spans(spans)
+    memory = any(summary["memory_peak"] is not None for summary in summaries)
+    runs = len({span["run"] for span in spans if "run" in span})
+    table = Table(title=f"Phase latency over {runs} runs")
+    table.add_column("Command")
+    table.add_column("Phase")
+    table.add_column("Count", justify="right")
+    for column in ("p50", "p90", "p99", "Max"):
+        table.add_column(column, justify="right")
+    if memory:
+        table.add_column("Peak memory", justify="right")
+    for summary in summaries:
+        row = [
+            summary["command"],
+            summary["span"],
+            str(summary["count"]),
+            *(f"{summary[key] * 1000:.0f}ms" for key in ("p50", "p90", "p99", "max")),
+        ]
+        if memory:
+            peak = summary["memory_peak"]
+            row.append("" if peak is None else f"{peak / 2**20:.1f}MiB")
+        table.add_row(*row)
+    console.print(table)
+    console.print(f"Traces are read from {trace_file}")
+
+
+def measure_page_load(url: str, lean: bool) -> dict:
+    """Load a page in a fresh headless browser and measure the cost.
+
+    Args:
+        url: The page to load.
+        lean: Whether to launch the browser in lean mode.
+
+    Returns:
+        The seconds until the page's load event, the memory of the browser
+        processes in bytes, None where it cannot be measured, and the number
+        of requests blocked.
+
+    """
+    from playwright.sync_api import sync_playwright
+
+    from .browser import RequestBlocker, launch_options, process_tree_rss
+
+    blocker = RequestBlocker()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(**launch_options(lean))
+        with browser:
+            context = browser.new_context()
+            if lean:
+                context.route("**/*", blocker.handle)
+            page = context.new_page()
+            page.set_default_timeout(TIMEOUT_LENGTH)
+            start = time.perf_counter()
+            page.goto(url, wait_until="load")
+            load_time = time.perf_counter() - start
+            rss = process_tree_rss()
+    return {"load_time": load_time, "rss": rss, "blocked": blocker.blocked}
+
+
+def print_browser_report(url: str = LOGIN_URL, rounds: int = 3) -> None:
+    """Compare loading a platform page with and without lean mode.
+
+    Args:
+        url: The page to load.
+        rounds: Number of times the page is loaded in each mode, the median
+            of the rounds is reported.
+
+    Returns:
+        None
+
+    """
+    from statistics import median
+
+    from rich.table import Table
+
+    results = {}
+    with console.status(f"Loading {url} in both browser modes..."):
+        for mode, lean in (("Default", False), ("Lean", True)):
+            measured = [measure_page_load(url, lean) for _ in range(rounds)]
+            results[mode] = {
+                key: None
+                if any(result[key] is None for result in measured)
+                else median(result[key] for result in measured)
+                for key in ("load_time", "rss", "blocked")
+            }
+
+    def megabytes(rss: float | None) -> str:
+        return "" if rss is None else f"{rss / 2**20:.0f}MiB"
+
+    table = Table(title=f"Browser cost of {url} over {rounds} rounds")
+    table.add_column("Mode")
+    table.add_column("Page load", justify="right")
+    table.add_column("Browser memory", justify="right")
+    table.add_column("Blocked requests", justify="right")
+    for mode, result in results.items():
+        table.add_row(
+            mode,
+            f"{result['load_time'] * 1000:.0f}ms",
+            megabytes(result["rss"]),
+            f"{result['blocked']:.0f}",
+        )
+    console.print(table)
+
+    default, lean = results["Default"], results["Lean"]
+    saved = f"Lean mode saved {(default['load_time'] - lean['load_time']) * 1000:.0f}ms"
+    if default["rss"] is not None and lean["rss"] is not None:
+        saved += f" and {megabytes(default['rss'] - lean['rss'])} of memory"
+    console.print(f"{saved} per page.", style=ConsoleStyle.SUCCESS.value)
+    console.print(
+        "Run eatlocal with --lean or EATLOCAL_LEAN=1 to use it.",
+        style=ConsoleStyle.SUGGESTION.value,
+    )
+
+
+def _exit_daemon_unsupported() -> None:
+    console.print(
+        ":warning: The daemon needs Unix sockets, which this platform lacks.",
+        style=ConsoleStyle.WARNING.value,
+    )
+    sys.exit()
+
+
+def start_daemon(config: dict, foreground: bool = False) -> None:
+    """Start the daemon that keeps a logged in browser warm.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+        foreground: Whether to run the daemon in this process.
+
+    Returns:
+        None
+
+    """
+    from .browser import lean_mode
+    from .daemon import (
+        DaemonError,
+        connect_daemon,
+        daemon_supported,
+        run_daemon,
+        spawn_daemon,
+        wait_for_daemon,
+    )
+
+    if not daemon_supported():
+        _exit_daemon_unsupported()
+    running = connect_daemon()
+    if running is not None:
+        try:
+            pid = running.status()["pid"]
+        except DaemonError:
+            pid = "unknown"
+        console.print(
+            f"The eatlocal daemon is already running, pid {pid}.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+    if foreground:
+        run_daemon(config)
+        return
+    with console.status("Starting the eatlocal daemon..."):
+        process = spawn_daemon(lean_mode())
+        client = wait_for_daemon(process)
+    if client is None:
+        console.print(
+            ":warning: The eatlocal daemon did not start.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            f"See {DAEMON_LOG} for what went wrong.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+    console.print(
+        f"Started the eatlocal daemon, pid {process.pid}.",
+        style=ConsoleStyle.SUCCESS.value,
+    )
+
+
+def stop_daemon() -> None:
+    """Stop the running daemon and its browser.
+
+    Returns:
+        None
+
+    """
+    from .daemon import DaemonError, connect_daemon
+
+    client = connect_daemon()
+    if client is None:
+        console.print(
+            "The eatlocal daemon is not running.", style=ConsoleStyle.SUGGESTION.value
+        )
+        return
+    try:
+        client.call("stop")
+    except DaemonError:
+        console.print(
+            ":warning: Unable to stop the eatlocal daemon.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        return
+    console.print("Stopped the eatlocal daemon.", style=ConsoleStyle.SUCCESS.value)
+
+
+def print_daemon_status() -> None:
+    """Print whether the daemon is running and what it has done.
+
+    Returns:
+        None
+
+    """
+    from .daemon import DaemonError, connect_daemon, daemon_supported
+
+    if not daemon_supported():
+        _exit_daemon_unsupported()
+    client = connect_daemon()
+    try:
+        status = None if client is None else client.status()
+    except DaemonError:
+        status = None
+    if status is None:
+        console.print(
+            "The eatlocal daemon is not running, commands start their own browser.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        console.print(
+            "Run [underline]eatlocal daemon start[/underline] to keep one warm.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+    uptime = int(time.time() - status["started"])
+    browser = "launched" if status["browser"] else "not launched yet"
+    mode = ", lean mode" if status["lean"] else ""
+    console.print(
+        f"The eatlocal daemon is running, pid {status['pid']}, "
+        f"logged in as {status['username']}.",
+        style=ConsoleStyle.SUCCESS.value,
+    )
+    console.print(
+        f"Up {uptime // 60}m{uptime % 60:02d}s, {status['jobs']} jobs run, "
+        f"browser {browser}{mode}."
+    )
+
+
+def search_bites(
+    config: dict, query: str, limit: int = SEARCH_RESULTS, rebuild: bool = False
+) -> None:
+    """Search the instructions, code and tests of the local bites.
+
+    The index is brought up to date first, only the files that changed
+    since the last search are read.
+
+    Args:
+        config: Dictionary containing the user's PyBites credentials.
+        query: Words that must all appear in a bite, a word ending with *
+            matches every word it starts.
+        limit: Maximum number of bites shown.
+        rebuild: Whether to index every file again.
+
+    Returns:
+        None
+
+    """
+    from rich.table import Table
+
+    from .search import SearchIndex
+
+    if rebuild:
+        SEARCH_INDEX.unlink(missing_ok=True)
+    with SearchIndex(SEARCH_INDEX) as index:
+        with span("search.update"), console.status("Indexing bites..."):
+            index.update(Path(config["PYBITES_REPO"]))
+        with span("search.query"):
+            results = index.search(query, limit)
+    if not results:
+        console.print(
+            f":warning: No local bite matches {query!r}.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        return
+    table = Table(title=f"Bites matching {query!r}")
+    table.add_column("Bite", no_wrap=True)
+    table.add_column("Where", no_wrap=True)
+    # the snippet gets what is left of the line after the borders and padding
+    used = max(len(result.slug) for result in results) + 10
+    used += max(len(result.kind) for result in results)
+    table.add_column(
+        "Match", overflow="ellipsis", no_wrap=True, max_width=console.width - used
+    )
+    for result in results:
+        table.add_row(result.slug, result.kind, result.snippet)
+    console.print(table)
+
+
+def display_bite(
+    bite: Bite,
+    config: dict,
+    theme: str,
+    pager: bool = False,
+) -> None:
+    """Display the instructions and source code for a bite.
+
+    The plain text of the instructions and the highlighted code are cached
+    until their files change.
+
+    Args:
+        bite: The name of the bite to display.
+        config: Dictionary containing the user's PyBites credentials.
+        theme: The color theme for the code.
+        pager: Whether to scroll through the whole bite instead of printing
+            one screen.
+
+    Returns:
+        None
+
+    """
+    from rich.layout import Layout
+    from rich.panel import Panel
+
+    from .render import BitePager, RenderCache, bite_files
+
+    path = bite.bite_slug_to_dir(config["PYBITES_REPO"])
+    html_file, python_file = bite_files(path) if path.is_dir() else (None, None)
+    if html_file is None or python_file is None:
+        console.print(
+            f":warning: Unable to display bite {bite.title}.",
+            style=ConsoleStyle.WARNING.value,
+        )
+        console.print(
+            "Please make sure that path is correct and the bite has been downloaded.",
+            style=ConsoleStyle.SUGGESTION.value,
+        )
+        return
+
+    cache = RenderCache(DISPLAY_CACHE)
+    with span("display.render", bite=bite.slug, theme=theme):
+        instructions = cache.instructions(html_file)
+        code = cache.code(python_file, theme)
+
+    if pager:
+        BitePager(f"{bite.title} at {html_file}", instructions, code).run(console)
+        return
 
     layout = Layout()
     layout.split(
@@ -0,0 +1,260 @@
+"""extraction of bite content from platform pages"""
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+from html.parser import HTMLParser
+from itertools import accumulate
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import HTMLTreeBuilder
+
+DESCRIPTION_ID = "bite-description"
+CODE_ID = "python-editor"
+TESTS_ID = "test-python-editor"
+FILENAME_ID = "filename"
+BITE_IDS = (DESCRIPTION_ID, CODE_ID, TESTS_ID, FILENAME_ID)
+
+DESCRIPTION_START_MARKER = "end author and learning paths"
+FILENAME_MARKER = 'id="filename"'
+
+# Run in the browser to read the bite's elements from the live page, so the
+# whole page does not have to be serialized and parsed again in Python.
+BITE_PAGE_SCRIPT = f"""() => {{
+    const html = (id) => document.getElementById(id)?.outerHTML ?? null;
+    const text = (id) => document.getElementById(id)?.textContent ?? null;
+    return {{
+        description: html("{DESCRIPTION_ID}"),
+        code: text("{CODE_ID}"),
+        tests: text("{TESTS_ID}"),
+        file_name: text("{FILENAME_ID}"),
+    }};
+}}"""
+
+VOID_ELEMENTS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+
+
+class ExtractError(Exception):
+    """The page does not contain the content of a bite."""
+
+
+@dataclass
+class BitePage:
+    """Content of a bite page that is written to the bite directory.
+
+    Attributes:
+        description: The bite description html.
+        code: The starter code of the bite.
+        tests: The tests of the bite.
+        file_name: The name of the bite's module, without extension.
+
+    """
+
+    description: str
+    code: str
+    tests: str
+    file_name: str
+
+
+class _AllFound(Exception):
+    """Every element has been located, the rest of the page can be skipped."""
+
+
+class _ElementLocator(HTMLParser):
+    """Find where elements start and end in a page without building a tree.
+
+    Tags are opened and closed the way BeautifulSoup's html.parser builder
+    does it, so a slice of the page parses to the same element BeautifulSoup
+    would find in the whole page. The tags still open around an element,
+    and the empty-element tags whose end tag would be ignored, are repeated
+    in front of the slice. They change how BeautifulSoup treats whitespace
+    and strings, and which end tags it honours.
+    """
+
+    def __init__(self, html: str, ids: tuple[str, ...]) -> None:
+        super().__init__(convert_charrefs=False)
+        self.html = html
+        self.wanted = set(ids)
+        self.spans: dict[str, list] = {}
+        self.open_tags: list[tuple[str, str | None]] = []
+        self.open_counts: Counter[str] = Counter()
+        self.already_closed: Counter[str] = Counter()
+
+    @cached_property
+    def line_offsets(self) -> list[int]:
+        return [0, *accumulate(len(line) + 1 for line in self.html.split("\n"))]
+
+    def position(self) -> int:
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def start_tag_end(self) -> int:
+        return self.position() + len(self.get_starttag_text())
+
+    def end_tag_end(self) -> int:
+        return self.html.index(">", self.position()) + 1
+
+    def start_element(self, attrs: list) -> str | None:
+        element_id = None
+        for name, value in attrs:
+            if name == "id":
+                element_id = value
+        if element_id not in self.wanted or element_id in self.spans:
+            return None
+        self.spans[element_id] = [
+            {tag: count for tag, count in self.already_closed.items() if count},
+            [name for name, _ in self.open_tags],
+            self.position(),
+            len(self.html),
+        ]
+        return element_id
+
+    def end_element(self, element_id: str, end: int) -> None:
+        self.spans[element_id][3] = end
+        self.wanted.discard(element_id)
+        if not self.wanted:
+            raise _AllFound
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        element_id = self.start_element(attrs)
+        if tag in VOID_ELEMENTS:
+            self.already_closed[tag] += 1
+            if element_id is not None:
+                self.end_element(element_id, self.start_tag_end())
+            return
+        self.open_tags.append((tag, element_id))
+        self.open_counts[tag] += 1
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        element_id = self.start_element(attrs)
+        if element_id is not None:
+            self.end_element(element_id, self.start_tag_end())
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.already_closed[tag]:
+            self.already_closed[tag] -= 1
+            return
+        if not self.open_counts[tag]:
+            return
+        while True:
+            name, element_id = self.open_tags.pop()
+            self.open_counts[name] -= 1
+            if element_id is not None:
+                self.end_element(element_id, self.end_tag_end())
+            if name == tag:
+                return
+
+
+def locate_elements(html: str, ids: tuple[str, ...] = BITE_IDS) -> dict[str, str]:
+    """Cut the markup of elements out of a page.
+
+    The page is only tokenized up to the end of the last element found,
+    no tree is built for it.
+
+    Args:
+        html: The platform page.
+        ids: Ids of the elements to find.
+
+    Returns:
+        Markup that parses to the first element with each id, for the ids
+        found.
+
+    """
+    locator = _ElementLocator(html, ids)
+    try:
+        locator.feed(html)
+        locator.close()
+    except _AllFound:
+        pass
+    elements = {}
+    for element_id, (closed, ancestors, start, end) in locator.spans.items():
+        markup = html[start:end]
+        context = [
+            f"<{tag}>" * count for tag, count in closed.items() if f"</{tag}" in markup
+        ]
+        context += [f"<{name}>" for name in ancestors]
+        elements[element_id] = "".join(context) + markup
+    return elements
+
+
+def _element(markup: str | None, element_id: str) -> Tag | None:
+    if markup is None:
+        return None
+    return BeautifulSoup(markup, "html.parser").find(id=element_id)
+
+
+def bite_description(markup: str) -> str:
+    """Keep the part of the description html that follows the author info.
+
+    Args:
+        markup: The serialized bite description element.
+
+    Returns:
+        The bite description html as a string.
+
+    """
+    lines = markup.splitlines()
+    for index, line in enumerate(lines):
+        if FILENAME_MARKER not in line and DESCRIPTION_START_MARKER in line:
+            break
+    else:
+        return ""
+    return "".join(
+        f"{line}\n" for line in lines[index + 1 :] if FILENAME_MARKER not in line
+    )
+
+
+def extract_bite_page(html: str) -> BitePage:
+    """Extract the content of a bite from its platform page.
+
+    Only the elements holding the description, code, tests and file name
+    are parsed.
+
+    Args:
+        html: The platform page of the bite.
+
+    Returns:
+        The content of the bite.
+
+    Raises:
+        ExtractError: If the code, tests or file name are missing.
+
+    """
+    markup = locate_elements(html)
+    description = _element(markup.get(DESCRIPTION_ID), DESCRIPTION_ID)
+    code = _element(markup.get(CODE_ID), CODE_ID)
+    tests = _element(markup.get(TESTS_ID), TESTS_ID)
+    file_name = _element(markup.get(FILENAME_ID), FILENAME_ID)
+    if code is None or tests is None or file_name is None:
+        raise ExtractError("The page does not contain the bite's code.")
+    return BitePage(
+        description=bite_description(str(description)),
+        code=code.text,
+        tests=tests.text,
+        file_name=file_name.text.strip(".py"),
+    )
+
+
+def bite_page_from_record(record: dict) -> BitePage:
+    """Build the content of a bite from the elements read in the browser.
+
+    Args:
+        record: The description html and the code, tests and file name text
+            returned by BITE_PAGE_SCRIPT.
+
+    Returns:
+        The content of the bite.
+
+    Raises:
+        ExtractError: If the code, tests or file name are missing.
+
+    """
+    if any(record.get(key) is None for key in ("code", "tests", "file_name")):
+        raise ExtractError("The page does not contain the bite's code.")
+    description = _element(record.get("description"), DESCRIPTION_ID)
+    return BitePage(
+        description=bite_description(str(description)),
+        code=record["code"],
+        tests=record["tests"],
+        file_name=record["file_name"].strip(".py"),
+    )
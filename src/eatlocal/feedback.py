@@ -0,0 +1,141 @@
+"""validation feedback read as it arrives"""
+
+import re
+from collections.abc import Callable
+from html.parser import HTMLParser
+
+from .constants import FEEDBACK_SETTLE, PASSED_MESSAGE, TIMEOUT_LENGTH
+
+# the last line of a pytest run, e.g. "==== 1 failed, 2 passed in 0.12s ===="
+PYTEST_SUMMARY = re.compile(
+    r"^=+ (?P<counts>[^=\n]*?) in \d+(?:\.\d+)?s\b[^=\n]*=+[ \t]*$", re.MULTILINE
+)
+FAILED_OUTCOMES = ("failed", "error")
+
+# Run in the browser, resolves with the feedback text once it differs from
+# the text already seen.
+FEEDBACK_CHANGED_SCRIPT = """seen => {
+    const text = document.querySelector('#feedback')?.textContent ?? '';
+    return text !== seen && text;
+}"""
+
+
+def pytest_summary(feedback: str) -> str | None:
+    """Find the counts of the final pytest summary line.
+
+    Args:
+        feedback: The validation feedback.
+
+    Returns:
+        The counts, e.g. "1 failed, 2 passed", or None if pytest has not
+        finished.
+
+    """
+    summary = None
+    for summary in PYTEST_SUMMARY.finditer(feedback):
+        pass
+    return None if summary is None else summary["counts"]
+
+
+class FeedbackStream:
+    """Validation feedback collected while it arrives.
+
+    Every complete line is handed to on_output as soon as it is seen, the
+    feedback is complete once pytest's summary line is in. When every test
+    passed, the platform's congratulation that follows the summary is
+    waited for as well.
+
+    Attributes:
+        text: The feedback received so far.
+        on_output: Called with each new line of feedback.
+
+    """
+
+    def __init__(self, on_output: Callable[[str], None] | None = None) -> None:
+        self.on_output = on_output
+        self._reset()
+
+    def _reset(self) -> None:
+        # the lines handed on so far, newlines included, and the incomplete
+        # line after them
+        self._lines: list[str] = []
+        self._tail = ""
+        self._summary: str | None = None
+        self._passed = False
+
+    @property
+    def text(self) -> str:
+        """The feedback received so far."""
+        return "".join(self._lines) + self._tail
+
+    def update(self, text: str) -> None:
+        """Replace the feedback with a longer version of it.
+
+        Args:
+            text: All the feedback received so far.
+
+        """
+        seen = self.text
+        if not text.startswith(seen):
+            # the feedback was replaced instead of extended, show it again
+            self._reset()
+            seen = ""
+        self.append(text[len(seen) :])
+
+    def append(self, chunk: str) -> None:
+        """Add the next piece of feedback.
+
+        Args:
+            chunk: Feedback that follows the text received so far.
+
+        """
+        self._tail += chunk
+        if "\n" in chunk:
+            end = self._tail.rfind("\n") + 1
+            self._emit(self._tail[:end])
+            self._tail = self._tail[end:]
+
+    def close(self) -> None:
+        """Hand on the last line, even if it is incomplete."""
+        if self._tail:
+            self._emit(self._tail)
+            self._tail = ""
+
+    def _emit(self, lines: str) -> None:
+        # only the new lines are searched, so long feedback is read once
+        self._lines.append(lines)
+        self._summary = pytest_summary(lines) or self._summary
+        self._passed = self._passed or PASSED_MESSAGE in lines
+        if self.on_output is not None:
+            for line in lines.splitlines():
+                self.on_output(line)
+
+    @property
+    def summary(self) -> str | None:
+        """The counts of pytest's summary line, once it has arrived."""
+        return pytest_summary(self._tail) or self._summary
+
+    @property
+    def complete(self) -> bool:
+        """Whether the feedback holds the final result."""
+        summary = self.summary
+        if summary is None:
+            return False
+        failed = any(outcome in summary for outcome in FAILED_OUTCOMES)
+        return failed or self._passed or PASSED_MESSAGE in self._tail
+
+    @property
+    def wait_timeout(self) -> float:
+        """Milliseconds to wait for the next piece of feedback."""
+        return TIMEOUT_LENGTH if self.summary is None else FEEDBACK_SETTLE
+
+
+class FeedbackTextParser(HTMLParser):
+    """Feed the text of a feedback html response to a stream, chunk by chunk."""
+
+    def __init__(self, stream: FeedbackStream) -> None:
+        super().__init__()
+        self.stream = stream
+
+    def handle_data(self, data: str) -> None:
+        self.stream.append(data)
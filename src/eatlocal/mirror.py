@@ -0,0 +1,192 @@
+"""compressed, content-addressed store of raw bite pages"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from .extract import BitePage, ExtractError, extract_bite_page
+
+# seconds a page is kept after it was stored or reused, even if no bite
+# refers to it yet
+PRUNE_GRACE = 3600
+
+
+class PageCache:
+    """Raw platform pages of bites, kept to rebuild bites without the network.
+
+    Each page is gzipped and stored under the SHA-256 digest of its content
+    in objects/, so storing the same page twice writes it once. A small JSON
+    ref per bite in refs/ points at the bite's latest page. Every file is
+    written atomically and pages are never removed while storing, so several
+    threads or processes can store pages at the same time. Pages no bite
+    refers to anymore are removed by prune.
+
+    Attributes:
+        root: Directory holding the cache.
+
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def object_path(self, digest: str) -> Path:
+        """Location of the page with the given digest."""
+        return self.root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+    def ref_path(self, slug: str) -> Path:
+        """Location of the ref of the bite with the given slug."""
+        return self.root / "refs" / f"{slug}.json"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+    def put(self, slug: str, title: str, level: str | None, html: str) -> str:
+        """Store the page of a bite.
+
+        Args:
+            slug: Slug of the bite.
+            title: Title of the bite.
+            level: Difficulty level of the bite.
+            html: The platform page of the bite.
+
+        Returns:
+            The digest the page is stored under.
+
+        """
+        content = html.encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        try:
+            # a reused page is as fresh as a new one for prune
+            os.utime(path)
+        except FileNotFoundError:
+            # mtime=0 keeps the compressed bytes the same for the same page
+            self._write(path, gzip.compress(content, mtime=0))
+        ref = {
+            "slug": slug,
+            "title": title,
+            "level": level,
+            "digest": digest,
+            "stored_at": time.time(),
+        }
+        self._write(self.ref_path(slug), json.dumps(ref).encode("utf-8"))
+        return digest
+
+    def prune(self, grace: float = PRUNE_GRACE) -> int:
+        """Remove the pages no bite refers to anymore.
+
+        Pages stored or reused in the last grace seconds are kept, a put
+        running at the same time may not have written their ref yet.
+
+        Args:
+            grace: Seconds a page is kept after it was stored or reused.
+
+        Returns:
+            Number of pages removed.
+
+        """
+        referenced = {ref["digest"] for ref in self.refs()}
+        cutoff = time.time() - grace
+        removed = 0
+        for path in (self.root / "objects").glob("*/*.html.gz"):
+            if path.name.removesuffix(".html.gz") in referenced:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def ref(self, slug: str) -> dict | None:
+        """Look up the stored page of a bite.
+
+        Args:
+            slug: Slug of the bite.
+
+        Returns:
+            The slug, title, level and digest of the bite's page, or None if
+            it has not been stored.
+
+        """
+        try:
+            with open(self.ref_path(slug), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def refs(self) -> list[dict]:
+        """List the stored pages.
+
+        Returns:
+            The refs of every stored bite, sorted by slug.
+
+        """
+        refs = []
+        for path in sorted((self.root / "refs").glob("*.json")):
+            ref = self.ref(path.stem)
+            if ref is not None:
+                refs.append(ref)
+        return refs
+
+    def get(self, slug: str) -> str | None:
+        """Read the stored page of a bite.
+
+        Args:
+            slug: Slug of the bite.
+
+        Returns:
+            The platform page, or None if it has not been stored.
+
+        """
+        ref = self.ref(slug)
+        if ref is None:
+            return None
+        try:
+            return read_page(self.object_path(ref["digest"]))
+        except OSError:
+            return None
+
+
+def read_page(path: Path) -> str:
+    """Decompress a stored page.
+
+    Args:
+        path: Location of the page in the cache.
+
+    Returns:
+        The platform page.
+
+    """
+    with gzip.open(path, "rb") as fh:
+        return fh.read().decode("utf-8")
+
+
+def extract_stored_page(path: Path) -> BitePage | None:
+    """Extract the content of a bite from a stored page.
+
+    This runs in worker processes, so it only takes and returns picklable
+    values.
+
+    Args:
+        path: Location of the page in the cache.
+
+    Returns:
+        The content of the bite, or None if the page cannot be read or does
+        not contain it.
+
+    """
+    try:
+        return extract_bite_page(read_page(path))
+    except (OSError, EOFError, zlib.error, UnicodeDecodeError, ExtractError):
+        return None
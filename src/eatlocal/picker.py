@@ -0,0 +1,226 @@
+"""pick bites with fzf, or a built-in fuzzy matcher when fzf is missing"""
+
+import re
+import shutil
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from iterfzf import BUNDLED_EXECUTABLE, EXECUTABLE_NAME, iterfzf
+
+from .console import console
+from .constants import ConsoleStyle
+
+# Every line given to fzf starts with the index of its entry. fzf only shows
+# and matches the fields after it, and prints the whole line back, so the
+# pick maps to its entry without parsing what was displayed.
+ID_SEPARATOR = "\t"
+FZF_INDEX_OPTIONS = ["--delimiter", ID_SEPARATOR, "--with-nth", "2.."]
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+PICKER_RESULTS = 10
+
+
+def fzf_executable() -> Path | None:
+    """Find the fzf binary bundled with iterfzf, or else one on the PATH."""
+    if BUNDLED_EXECUTABLE is not None and BUNDLED_EXECUTABLE.is_file():
+        return BUNDLED_EXECUTABLE
+    found = shutil.which(EXECUTABLE_NAME)
+    return None if found is None else Path(found)
+
+
+def index_lines(choices: Sequence[str]) -> Iterator[str]:
+    """Prefix each choice with its index for fzf.
+
+    Args:
+        choices: Text shown for each entry.
+
+    Yields:
+        One line per entry, with separators and line breaks in the text
+        replaced by spaces.
+
+    """
+    for index, choice in enumerate(choices):
+        if ID_SEPARATOR in choice or "\n" in choice:
+            choice = choice.replace(ID_SEPARATOR, " ").replace("\n", " ")
+        yield f"{index}{ID_SEPARATOR}{choice}"
+
+
+def selection_index(line: str) -> int:
+    """The index of the entry of a line printed by fzf."""
+    return int(line.partition(ID_SEPARATOR)[0])
+
+
+def pick(
+    choices: Sequence[str], *, multi: bool = False, ansi: bool = False
+) -> list[int]:
+    """Let the user pick entries.
+
+    Args:
+        choices: Text shown for each entry.
+        multi: Whether several entries can be picked.
+        ansi: Whether the text contains ANSI colors.
+
+    Returns:
+        The indices of the picked entries, empty if the user cancelled.
+
+    """
+    executable = fzf_executable()
+    if executable is None:
+        return pick_builtin(choices, multi=multi)
+    chosen = iterfzf(
+        index_lines(choices),
+        multi=multi,
+        ansi=ansi,
+        executable=executable,
+        __extra__=FZF_INDEX_OPTIONS,
+    )
+    if not chosen:
+        return []
+    if not multi:
+        chosen = [chosen]
+    return [selection_index(line) for line in chosen]
+
+
+def trigrams(text: str) -> set[str]:
+    """The three-character substrings of a text."""
+    return {text[start : start + 3] for start in range(len(text) - 2)}
+
+
+def subsequence_pattern(term: str) -> re.Pattern:
+    """A pattern finding the characters of term in order, with gaps."""
+    return re.compile(".*?".join(map(re.escape, term)))
+
+
+class TrigramIndex:
+    """Fuzzy search over entries, narrowed down by trigrams.
+
+    A query is split into terms that must all match, like fzf's extended
+    search. A term without whitespace can only occur inside a word, so the
+    trigrams index the distinct words, and each word lists its entries.
+    Entries containing every term are ranked by how early the terms match.
+    Only when no entry contains them are the entries scanned for the terms'
+    characters in order.
+
+    Attributes:
+        texts: Lowercased text of each entry, without ANSI colors.
+
+    """
+
+    def __init__(self, choices: Sequence[str]) -> None:
+        self.texts = [ANSI_ESCAPE.sub("", choice).lower() for choice in choices]
+        self.entries: dict[str, list[int]] = {}
+        for index, text in enumerate(self.texts):
+            for word in set(text.split()):
+                self.entries.setdefault(word, []).append(index)
+        self.words: dict[str, set[str]] = {}
+        for word in self.entries:
+            for trigram in trigrams(word):
+                self.words.setdefault(trigram, set()).add(word)
+
+    def containing(self, term: str) -> set[int]:
+        """The entries containing a term."""
+        if len(term) < 3:
+            words = self.entries.keys()
+        else:
+            postings = sorted(
+                (self.words.get(trigram, set()) for trigram in trigrams(term)),
+                key=len,
+            )
+            words = set.intersection(*postings)
+        matches = set()
+        for word in words:
+            if term in word:
+                matches.update(self.entries[word])
+        return matches
+
+    def search(self, query: str) -> list[int]:
+        """Find the entries matching a query.
+
+        Args:
+            query: Terms separated by whitespace, case is ignored.
+
+        Returns:
+            The indices of the matching entries, best match first.
+
+        """
+        terms = query.lower().split()
+        if not terms:
+            return list(range(len(self.texts)))
+        matches = set.intersection(*(self.containing(term) for term in terms))
+        if matches:
+
+            def rank(index: int) -> tuple:
+                text = self.texts[index]
+                positions = [text.find(term) for term in terms]
+                word_starts = sum(
+                    position == 0 or not text[position - 1].isalnum()
+                    for position in positions
+                )
+                return (-word_starts, sum(positions), len(text), index)
+
+        else:
+            patterns = [subsequence_pattern(term) for term in terms]
+            matches = {
+                index
+                for index, text in enumerate(self.texts)
+                if all(pattern.search(text) for pattern in patterns)
+            }
+
+            def rank(index: int) -> tuple:
+                return (len(self.texts[index]), index)
+
+        return sorted(matches, key=rank)
+
+
+def pick_builtin(choices: Sequence[str], *, multi: bool = False) -> list[int]:
+    """Let the user search and pick entries without fzf.
+
+    Args:
+        choices: Text shown for each entry.
+        multi: Whether several entries can be picked.
+
+    Returns:
+        The indices of the picked entries, empty if the user cancelled.
+
+    """
+    from rich.prompt import Prompt
+    from rich.text import Text
+
+    index = TrigramIndex(choices)
+    console.print(
+        "fzf is not available, type a search and pick by number.",
+        style=ConsoleStyle.SUGGESTION.value,
+    )
+    question = (
+        "Number(s) to pick, or a new search"
+        if multi
+        else "Number to pick, or a new search"
+    )
+    query = ""
+    while True:
+        matches = index.search(query)
+        shown = matches[:PICKER_RESULTS]
+        if not shown:
+            console.print(f"No match for {query!r}.", style=ConsoleStyle.WARNING.value)
+        for number, match in enumerate(shown, 1):
+            console.print(f"{number:>3}. ", Text.from_ansi(choices[match]), sep="")
+        if len(matches) > len(shown):
+            console.print(
+                f"     ... {len(matches) - len(shown)} more, narrow the search."
+            )
+        answer = Prompt.ask(
+            f"{question} (enter to cancel)", default="", show_default=False
+        )
+        if not answer.strip():
+            return []
+        numbers = answer.replace(",", " ").split()
+        if not all(number.isdigit() for number in numbers):
+            query = answer
+            continue
+        picked = [
+            shown[int(number) - 1]
+            for number in numbers
+            if 0 < int(number) <= len(shown)
+        ]
+        if picked:
+            return picked if multi else picked[:1]
+        console.print(":warning: No such number.", style=ConsoleStyle.WARNING.value)
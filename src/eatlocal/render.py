@@ -0,0 +1,276 @@
+"""cached rendering of bites for the terminal"""
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+from rich.console import Console, Group
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+# bump when the cached format changes
+CACHE_VERSION = 1
+PAGER_KEYS = {
+    "q": "quit",
+    "\x1b": "quit",
+    "j": "down",
+    "\r": "down",
+    "\x1b[B": "down",
+    "k": "up",
+    "\x1b[A": "up",
+    " ": "page down",
+    "f": "page down",
+    "\x1b[6~": "page down",
+    "b": "page up",
+    "\x1b[5~": "page up",
+    "g": "top",
+    "\x1b[H": "top",
+    "G": "bottom",
+    "\x1b[F": "bottom",
+}
+PAGER_HELP = "j/k scroll, space/b page, g/G top/bottom, q quit"
+
+
+def instructions_text(html: str) -> str:
+    """The plain text of the instructions of a bite."""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser").text
+
+
+def highlight_code(code: str, theme: str) -> Text:
+    """Highlight python code with a pygments theme."""
+    from rich.syntax import Syntax
+
+    text = Syntax(code, "python", theme=theme, background_color="default").highlight(
+        code
+    )
+    text.rstrip()
+    return text
+
+
+def dump_text(text: Text) -> dict:
+    """Serialize styled text to JSON compatible data."""
+    return {
+        "plain": text.plain,
+        "style": str(text.style),
+        "spans": [[span.start, span.end, str(span.style)] for span in text.spans],
+    }
+
+
+def load_text(data: dict) -> Text:
+    """Rebuild styled text serialized by dump_text."""
+    text = Text(data["plain"], style=data["style"])
+    for start, end, style in data["spans"]:
+        text.stylize(style, start, end)
+    return text
+
+
+def bite_files(bite_dir: Path) -> tuple[Path | None, Path | None]:
+    """Find the instructions and code of a bite directory.
+
+    Args:
+        bite_dir: The bite directory.
+
+    Returns:
+        The instructions html file and the code file, None where a file is
+        missing.
+
+    """
+    html_files = []
+    code_files = []
+    with os.scandir(bite_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".html"):
+                html_files.append(entry.name)
+            elif entry.name.endswith(".py") and not entry.name.startswith("test_"):
+                code_files.append(entry.name)
+    if "bite.html" in html_files:
+        html_files = ["bite.html"]
+    html_file = bite_dir / min(html_files) if html_files else None
+    code_file = bite_dir / min(code_files) if code_files else None
+    return html_file, code_file
+
+
+class RenderCache:
+    """Rendered bite files kept on disk between runs.
+
+    There is one entry per file and variant, like a theme, stamped with the
+    file's modification time and size. An entry whose stamp no longer
+    matches its file is rendered again and overwritten.
+
+    Attributes:
+        directory: Location of the cached entries.
+
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def entry_path(self, path: Path, variant: str) -> Path:
+        name = f"{CACHE_VERSION}\0{path.resolve()}\0{variant}"
+        return self.directory / f"{hashlib.sha1(name.encode()).hexdigest()}.json"
+
+    @staticmethod
+    def stamp(path: Path) -> list[int]:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load(self, path: Path, variant: str):
+        """The cached rendering of a file, None if missing or stale."""
+        try:
+            with open(self.entry_path(path, variant), encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if entry.get("stamp") != self.stamp(path):
+            return None
+        return entry.get("data")
+
+    def save(self, path: Path, variant: str, data) -> None:
+        """Cache the rendering of a file as it is now."""
+        entry_path = self.entry_path(path, variant)
+        temporary = entry_path.with_name(
+            f"{entry_path.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as fh:
+                json.dump({"stamp": self.stamp(path), "data": data}, fh)
+            os.replace(temporary, entry_path)
+        except OSError:
+            # the cache only saves time, displaying works without it
+            temporary.unlink(missing_ok=True)
+
+    def instructions(self, html_file: Path) -> str:
+        """The plain text of an instructions file."""
+        text = self.load(html_file, "text")
+        if text is None:
+            text = instructions_text(html_file.read_text(encoding="utf-8"))
+            self.save(html_file, "text", text)
+        return text
+
+    def code(self, code_file: Path, theme: str) -> Text:
+        """The highlighted contents of a code file."""
+        data = self.load(code_file, f"theme={theme}")
+        if data is not None:
+            return load_text(data)
+        text = highlight_code(code_file.read_text(encoding="utf-8"), theme)
+        self.save(code_file, f"theme={theme}", dump_text(text))
+        return text
+
+
+def scroll(action: str, offset: int, page: int, total: int) -> int:
+    """The first visible line after a pager action.
+
+    Args:
+        action: One of the PAGER_KEYS actions.
+        offset: The first visible line.
+        page: Number of visible lines.
+        total: Number of lines.
+
+    Returns:
+        The new first visible line, the last page stays full.
+
+    """
+    moves = {
+        "down": offset + 1,
+        "up": offset - 1,
+        "page down": offset + page,
+        "page up": offset - page,
+        "top": 0,
+        "bottom": total,
+    }
+    return max(0, min(moves.get(action, offset), total - page))
+
+
+class BitePager:
+    """Scrolls through the instructions and code of a bite side by side.
+
+    Only the visible lines are rendered. The instructions are wrapped once
+    per terminal width.
+
+    Attributes:
+        title: Shown above the bite.
+        instructions: Plain text of the instructions.
+        code: Highlighted code.
+
+    """
+
+    def __init__(self, title: str, instructions: str, code: Text) -> None:
+        self.title = title
+        self.instructions = instructions
+        self.code_lines = code.split("\n", allow_blank=True)
+        self.wrapped: dict[int, list[Text]] = {}
+        self.offset = 0
+
+    def instruction_lines(self, console: Console, width: int) -> list[Text]:
+        if width not in self.wrapped:
+            self.wrapped[width] = list(Text(self.instructions).wrap(console, width))
+        return self.wrapped[width]
+
+    def geometry(self, console: Console) -> tuple[int, int]:
+        """The width of a column and the number of visible lines."""
+        # borders and padding of the panels, then the header and help lines
+        return max(1, console.width // 2 - 4), max(1, console.height - 6)
+
+    def total(self, console: Console) -> int:
+        width, _ = self.geometry(console)
+        return max(len(self.instruction_lines(console, width)), len(self.code_lines))
+
+    def render(self, console: Console) -> Group:
+        """The visible part of the bite."""
+        width, height = self.geometry(console)
+        visible = slice(self.offset, self.offset + height)
+        directions = Text("\n").join(self.instruction_lines(console, width)[visible])
+        code = Text("\n").join(self.code_lines[visible])
+        code.no_wrap = True
+        code.overflow = "ellipsis"
+        columns = Table.grid(expand=True)
+        columns.add_column(ratio=1)
+        columns.add_column(ratio=1)
+        columns.add_row(
+            Panel(directions, title="Directions", height=height + 2),
+            Panel(code, title="Code", height=height + 2),
+        )
+        last = min(self.offset + height, self.total(console))
+        return Group(
+            Text(self.title, style="bold", no_wrap=True, overflow="ellipsis"),
+            columns,
+            Text(
+                f"lines {self.offset + 1}-{last} of {self.total(console)}  {PAGER_HELP}",
+                style="dim",
+                no_wrap=True,
+                overflow="ellipsis",
+            ),
+        )
+
+    def actions(self) -> Iterator[str]:
+        """Pager actions read from the keyboard until the user quits."""
+        from click import getchar
+
+        while True:
+            action = PAGER_KEYS.get(getchar())
+            if action == "quit":
+                return
+            if action is not None:
+                yield action
+
+    def run(self, console: Console, actions: Iterator[str] | None = None) -> None:
+        """Show the bite in the alternate screen until the user quits.
+
+        Args:
+            console: Console to draw on.
+            actions: Pager actions, read from the keyboard by default.
+
+        """
+        with console.screen(hide_cursor=True) as screen:
+            screen.update(self.render(console))
+            for action in actions if actions is not None else self.actions():
+                _, height = self.geometry(console)
+                self.offset = scroll(action, self.offset, height, self.total(console))
+                screen.update(self.render(console))
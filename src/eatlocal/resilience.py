@@ -0,0 +1,414 @@
+"""retries, backoff and a circuit breaker for traffic to the platform"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from time import sleep
+from typing import TYPE_CHECKING
+
+from .constants import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    NAVIGATION_TIMEOUT,
+    RETRY_AFTER_LIMIT,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_STATUSES,
+)
+from .tracing import span
+
+if TYPE_CHECKING:
+    import requests
+    from playwright.async_api import Page as AsyncPage
+    from playwright.async_api import Response as AsyncResponse
+    from playwright.sync_api import Page, Response
+
+
+class CircuitOpenError(Exception):
+    """The platform failed too often, nothing is sent to it for a while."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to wait before trying a request again.
+
+    Attributes:
+        attempts: Number of tries, including the first one.
+        base_delay: Seconds to wait at most after the first failure, doubled
+            after each following one.
+        max_delay: Upper bound of a backoff in seconds.
+        max_retry_after: Longest wait the platform may ask for, the call
+            gives up rather than wait longer.
+
+    """
+
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    max_retry_after: float = RETRY_AFTER_LIMIT
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after a failed attempt, counting from 1.
+
+        The wait is drawn between zero and the exponential bound, so the
+        workers of a batch that failed together do not retry together.
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+
+class CircuitBreaker:
+    """Stops sending requests to a platform that keeps failing.
+
+    After threshold calls in a row failed, every call fails right away
+    until the cooldown has passed. Then a single call is let through: the
+    breaker closes again if it succeeds and stays open if it fails.
+
+    Attributes:
+        threshold: Failed calls in a row that open the breaker.
+        cooldown: Seconds the breaker stays open.
+        failures: Failed calls in a row.
+
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """One of closed, open and half-open."""
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may be sent now."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self.trial:
+                self.trial = True
+                return
+            raise CircuitOpenError(
+                f"The platform failed {self.failures} times in a row, "
+                f"not retrying for {self.cooldown:.0f} seconds."
+            )
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+
+
+# one breaker per process, the HTTP session and the browser talk to the same
+# platform
+PLATFORM_BREAKER = CircuitBreaker()
+
+
+class Retrying:
+    """The attempts of one call, deciding after each whether to try again.
+
+    Attributes:
+        policy: How often and how long to wait.
+        breaker: Breaker the outcome of the call is recorded on.
+        name: Traced with each wait.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or PLATFORM_BREAKER
+        self.attempt = 0
+
+    def start(self) -> None:
+        """Count an attempt, raising CircuitOpenError if the breaker is open."""
+        self.breaker.check()
+        self.attempt += 1
+
+    def done(self) -> None:
+        """The platform answered, the call is not tried again."""
+        self.breaker.record_success()
+
+    def wait(self, at_least: float = 0) -> float | None:
+        """Seconds to wait before trying again, None to give up.
+
+        Args:
+            at_least: Seconds the platform asked to wait, if any.
+
+        """
+        if (
+            self.attempt >= self.policy.attempts
+            or at_least > self.policy.max_retry_after
+        ):
+            self.breaker.record_failure()
+            return None
+        return max(self.policy.delay(self.attempt), at_least)
+
+    def trace(self, reason: str) -> AbstractContextManager[None]:
+        """Time the wait before the next attempt when tracing is on."""
+        return span("retry.wait", call=self.name, attempt=self.attempt, reason=reason)
+
+
+def retry[T](
+    call: Callable[[], T],
+    name: str,
+    retry_error: Callable[[Exception], bool],
+    retry_result: Callable[[T], bool] = lambda result: False,
+    wait_hint: Callable[[T], float] = lambda result: 0,
+    policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    """Call a function until it succeeds, backing off between attempts.
+
+    Args:
+        call: Sends the request.
+        name: Name of the call in traces.
+        retry_error: Whether an exception of the call is worth retrying.
+        retry_result: Whether a result of the call is worth retrying.
+        wait_hint: Seconds a retried result asks to wait before retrying.
+        policy: How often and how long to wait, RetryPolicy() by default.
+        breaker: Breaker of the platform, PLATFORM_BREAKER by default.
+
+    Returns:
+        The result of the last attempt.
+
+    Raises:
+        CircuitOpenError: If the platform failed too often recently.
+
+    """
+    attempts = Retrying(name, policy, breaker)
+    while True:
+        attempts.start()
+        try:
+            result = call()
+        except Exception as error:
+            if not retry_error(error):
+                attempts.done()
+                raise
+            reason = type(error).__name__
+            delay = attempts.wait()
+            if delay is None:
+                raise
+        else:
+            if not retry_result(result):
+                attempts.done()
+                return result
+            reason = "result"
+            delay = attempts.wait(wait_hint(result))
+            if delay is None:
+                return result
+        with attempts.trace(reason):
+            sleep(delay)
+
+
+async def retry_async[T](
+    call: Callable[[], Awaitable[T]],
+    name: str,
+    retry_error: Callable[[Exception], bool],
+    retry_result: Callable[[T], bool] = lambda result: False,
+    policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> T:
+    """Await a coroutine function until it succeeds, see retry."""
+    import asyncio
+
+    attempts = Retrying(name, policy, breaker)
+    while True:
+        attempts.start()
+        try:
+            result = await call()
+        except Exception as error:
+            if not retry_error(error):
+                attempts.done()
+                raise
+            reason = type(error).__name__
+            delay = attempts.wait()
+            if delay is None:
+                raise
+        else:
+            if not retry_result(result):
+                attempts.done()
+                return result
+            reason = "result"
+            delay = attempts.wait()
+            if delay is None:
+                return result
+        with attempts.trace(reason):
+            await asyncio.sleep(delay)
+
+
+def request_not_sent(error: Exception) -> bool:
+    """Whether a request failed before reaching the platform."""
+    import requests
+    from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    # connection refused and failed DNS lookups are new connection errors
+    return isinstance(reason, MaxRetryError) and isinstance(
+        reason.reason, ConnectTimeoutError
+    )
+
+
+def retry_after(response: requests.Response) -> float:
+    """Seconds a response asks to wait before trying again, 0 if not said.
+
+    The Retry-After header holds either a number of seconds or an HTTP
+    date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return 0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+    return max(0.0, (date - datetime.now(UTC)).total_seconds())
+
+
+def http_request(
+    send: Callable[[], requests.Response], name: str, idempotent: bool = True
+) -> requests.Response:
+    """Send an HTTP request to the platform, retrying transient failures.
+
+    Connection errors, timeouts and the statuses in RETRY_STATUSES are
+    retried. A request that changes something on the platform is only
+    retried when it surely was not handled: it never left, or the platform
+    answered that it is busy or unavailable.
+
+    Args:
+        send: Sends the request, with its timeouts.
+        name: Name of the request in traces.
+        idempotent: Whether sending the request twice is harmless.
+
+    Returns:
+        The response, a retryable status once the attempts are exhausted.
+
+    Raises:
+        requests.ConnectionError: If the platform failed too often recently.
+
+    """
+    import requests
+
+    def retry_error(error: Exception) -> bool:
+        if idempotent:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return isinstance(error, requests.RequestException) and request_not_sent(error)
+
+    def retry_result(response: requests.Response) -> bool:
+        statuses = RETRY_STATUSES if idempotent else (429, 503)
+        if response.status_code not in statuses:
+            return False
+        # a streamed response holds its connection until closed
+        response.close()
+        return True
+
+    try:
+        return retry(send, name, retry_error, retry_result, retry_after)
+    except CircuitOpenError as error:
+        raise requests.ConnectionError(str(error)) from error
+
+
+def navigation_failed(error: Exception) -> bool:
+    """Whether a browser navigation failed on the way, not on the page."""
+    from playwright.sync_api import Error, TimeoutError
+
+    return isinstance(error, TimeoutError) or (
+        isinstance(error, Error) and "net::ERR_" in error.message
+    )
+
+
+def bad_status(response: Response | AsyncResponse | None) -> bool:
+    return response is not None and response.status in RETRY_STATUSES
+
+
+def _navigation_error(response: Response | AsyncResponse, url: str) -> Exception:
+    from playwright.sync_api import Error
+
+    return Error(f"HTTP {response.status} when loading {url}")
+
+
+def goto(page: Page, url: str) -> Response | None:
+    """Navigate a page, retrying timeouts, network errors and 5xx statuses.
+
+    Raises:
+        playwright.sync_api.Error: If the page could not be loaded, or the
+            platform failed too often recently.
+
+    """
+    from playwright.sync_api import Error
+
+    try:
+        response = retry(
+            lambda: page.goto(url, timeout=NAVIGATION_TIMEOUT),
+            "page.goto",
+            navigation_failed,
+            bad_status,
+        )
+    except CircuitOpenError as error:
+        raise Error(str(error)) from error
+    if bad_status(response):
+        raise _navigation_error(response, url)
+    return response
+
+
+async def goto_async(page: AsyncPage, url: str) -> AsyncResponse | None:
+    """Navigate an asynchronous page, see goto."""
+    from playwright.async_api import Error
+
+    try:
+        response = await retry_async(
+            lambda: page.goto(url, timeout=NAVIGATION_TIMEOUT),
+            "page.goto",
+            navigation_failed,
+            bad_status,
+        )
+    except CircuitOpenError as error:
+        raise Error(str(error)) from error
+    if bad_status(response):
+        raise _navigation_error(response, url)
+    return response
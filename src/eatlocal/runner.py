@@ -0,0 +1,145 @@
+"""running the tests of bites locally"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .tracing import span
+
+# pytest exit codes
+PYTEST_PASSED = 0
+PYTEST_FAILED = 1
+PYTEST_NO_TESTS = 5
+
+
+@dataclass
+class BiteTestResult:
+    """Outcome of running the tests of a bite.
+
+    Attributes:
+        slug: The slug of the bite.
+        outcome: One of "passed", "failed", "error", "timeout" or "no tests".
+        passed: Number of tests that passed.
+        failures: Names of the tests that failed or errored.
+        skipped: Number of tests that were skipped.
+        duration: Seconds the run took.
+        output: What pytest printed.
+
+    """
+
+    slug: str
+    outcome: str
+    passed: int = 0
+    failures: list[str] = field(default_factory=list)
+    skipped: int = 0
+    duration: float = 0.0
+    output: str = ""
+
+
+def read_junit_report(report: Path, result: BiteTestResult) -> None:
+    """Count the tests in a pytest JUnit XML report.
+
+    Args:
+        report: Location of the report.
+        result: The result to add the counts to.
+
+    Returns:
+        None
+
+    """
+    try:
+        tree = ET.parse(report)
+    except (OSError, ET.ParseError):
+        return
+    for case in tree.iter("testcase"):
+        if case.find("failure") is not None or case.find("error") is not None:
+            result.failures.append(case.get("name", ""))
+        elif case.find("skipped") is not None:
+            result.skipped += 1
+        else:
+            result.passed += 1
+
+
+def run_bite_tests(slug: str, bite_dir: Path, timeout: float) -> BiteTestResult:
+    """Run the tests of a bite with pytest in a separate process.
+
+    The bite directory is copied to a temporary directory first, so the
+    run cannot leave caches or other files behind in the user's bite, and
+    runs of different bites cannot see each other's modules. Third-party
+    pytest plugins are not loaded.
+
+    Args:
+        slug: The slug of the bite.
+        bite_dir: The bite's directory.
+        timeout: Seconds after which the run is stopped.
+
+    Returns:
+        The outcome of the run.
+
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix=f"eatlocal-{slug}-") as tmp:
+        work_dir = Path(tmp) / slug
+        shutil.copytree(
+            bite_dir,
+            work_dir,
+            ignore=shutil.ignore_patterns("__pycache__", ".pytest_cache"),
+        )
+        report = Path(tmp) / "report.xml"
+        command = [
+            sys.executable,
+            "-m",
+            "pytest",
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "--rootdir",
+            str(work_dir),
+            f"--junitxml={report}",
+        ]
+        env = {
+            **os.environ,
+            "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1",
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        try:
+            with span("test.run", bite=slug):
+                completed = subprocess.run(
+                    command,
+                    cwd=work_dir,
+                    env=env,
+                    capture_output=True,
+                    check=False,
+                    text=True,
+                    timeout=timeout,
+                )
+        except subprocess.TimeoutExpired as error:
+            output = error.stdout or ""
+            if isinstance(output, bytes):
+                output = output.decode("utf-8", "replace")
+            return BiteTestResult(
+                slug,
+                "timeout",
+                duration=time.perf_counter() - start,
+                output=output,
+            )
+        if completed.returncode == PYTEST_PASSED:
+            outcome = "passed"
+        elif completed.returncode == PYTEST_FAILED:
+            outcome = "failed"
+        elif completed.returncode == PYTEST_NO_TESTS:
+            outcome = "no tests"
+        else:
+            outcome = "error"
+        result = BiteTestResult(
+            slug, outcome, output=completed.stdout + completed.stderr
+        )
+        read_junit_report(report, result)
+    result.duration = time.perf_counter() - start
+    return result
@@ -0,0 +1,290 @@
+"""full-text search over the downloaded bites"""
+
+import math
+import os
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    slug TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    document INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (term, document)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_document ON postings (document);
+"""
+
+# snake_case names are split into their words, like the query
+TOKEN = re.compile(r"[a-z0-9]+")
+INSTRUCTIONS_FILE = "bite.html"
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase terms."""
+    return TOKEN.findall(text.lower())
+
+
+def document_kind(name: str) -> str | None:
+    """What a file of a bite directory holds, None if it is not indexed."""
+    if name == INSTRUCTIONS_FILE:
+        return "instructions"
+    if name.endswith(".py"):
+        return "tests" if name.startswith("test_") else "code"
+    return None
+
+
+def document_text(path: Path, kind: str) -> str:
+    """The searchable text of a file, the instructions without their markup."""
+    text = path.read_text(encoding="utf-8", errors="replace")
+    if kind != "instructions":
+        return text
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(text, "html.parser").get_text()
+
+
+def query_terms(query: str) -> list[str]:
+    """Split a query into terms, keeping the * of prefix searches."""
+    terms = []
+    for word in query.split():
+        words = tokenize(word)
+        if words and word.endswith("*"):
+            words[-1] += "*"
+        terms.extend(words)
+    return terms
+
+
+@dataclass
+class SearchResult:
+    """A bite matching a search.
+
+    Attributes:
+        slug: Slug of the bite.
+        score: BM25 relevance, higher is better.
+        kind: The file of the bite that matched best.
+        snippet: The first line of that file containing a term.
+
+    """
+
+    slug: str
+    score: float
+    kind: str
+    snippet: str
+
+
+class SearchIndex:
+    """Inverted index over the files of the bite directories, in SQLite.
+
+    Files are only read again when their modification time or size
+    changed since they were indexed.
+
+    Attributes:
+        path: Location of the SQLite database.
+        connection: Open connection to the database.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def update(self, repo: Path) -> tuple[int, int]:
+        """Bring the index up to date with the bite directories of a repo.
+
+        Args:
+            repo: The directory holding the bite directories.
+
+        Returns:
+            The number of files indexed and removed from the index.
+
+        """
+        known = {
+            path: (document, mtime_ns, size)
+            for document, path, mtime_ns, size in self.connection.execute(
+                "SELECT id, path, mtime_ns, size FROM documents"
+            )
+        }
+        changed = []
+        seen = set()
+        try:
+            bite_dirs = [entry for entry in os.scandir(repo) if entry.is_dir()]
+        except OSError:
+            bite_dirs = []
+        for bite_dir in bite_dirs:
+            try:
+                files = list(os.scandir(bite_dir.path))
+            except OSError:
+                continue
+            for entry in files:
+                kind = document_kind(entry.name)
+                if kind is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                seen.add(entry.path)
+                stored = known.get(entry.path)
+                if stored is None or stored[1:] != (stat.st_mtime_ns, stat.st_size):
+                    changed.append((entry, bite_dir.name, kind, stat))
+
+        removed = [known[path][0] for path in known.keys() - seen]
+        with self.connection:
+            for document in removed:
+                self._remove(document)
+            for entry, slug, kind, stat in changed:
+                try:
+                    text = document_text(Path(entry.path), kind)
+                except OSError:
+                    continue
+                stored = known.get(entry.path)
+                if stored is not None:
+                    self._remove(stored[0])
+                counts = Counter(tokenize(text))
+                document = self.connection.execute(
+                    "INSERT INTO documents (path, slug, kind, mtime_ns, size, length, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry.path,
+                        slug,
+                        kind,
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        sum(counts.values()),
+                        text,
+                    ),
+                ).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO postings (term, document, count) VALUES (?, ?, ?)",
+                    [(term, document, count) for term, count in counts.items()],
+                )
+        return len(changed), len(removed)
+
+    def _remove(self, document: int) -> None:
+        self.connection.execute("DELETE FROM postings WHERE document = ?", (document,))
+        self.connection.execute("DELETE FROM documents WHERE id = ?", (document,))
+
+    def _postings(self, term: str) -> list[tuple[int, int]]:
+        """Documents and counts of a term, or of every term it prefixes if it
+        ends with *."""
+        if term.endswith("*"):
+            prefix = term.rstrip("*")
+            return self.connection.execute(
+                "SELECT document, count FROM postings WHERE term >= ? AND term < ?",
+                (prefix, prefix + "\U0010ffff"),
+            ).fetchall()
+        return self.connection.execute(
+            "SELECT document, count FROM postings WHERE term = ?", (term,)
+        ).fetchall()
+
+    def search(self, query: str, limit: int = 10) -> list[SearchResult]:
+        """Find the bites containing every term of a query.
+
+        Args:
+            query: Words to look for, a word ending with * matches every
+                word it starts.
+            limit: Maximum number of results.
+
+        Returns:
+            The matching bites, most relevant first.
+
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        documents, total_length = self.connection.execute(
+            "SELECT count(*), coalesce(sum(length), 0) FROM documents"
+        ).fetchone()
+        if not documents:
+            return []
+        average_length = total_length / documents
+
+        term_postings = {term: self._postings(term) for term in dict.fromkeys(terms)}
+        if not all(term_postings.values()):
+            return []
+        ids = {
+            document for postings in term_postings.values() for document, _ in postings
+        }
+        placeholders = ", ".join("?" * len(ids))
+        info = {
+            document: (slug, kind, length)
+            for document, slug, kind, length in self.connection.execute(
+                f"SELECT id, slug, kind, length FROM documents WHERE id IN ({placeholders})",
+                list(ids),
+            )
+        }
+
+        # a bite matches when each term is in one of its files
+        bite_terms: dict[str, set[str]] = defaultdict(set)
+        scores: dict[int, float] = defaultdict(float)
+        for term, postings in term_postings.items():
+            idf = math.log(
+                1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for document, count in postings:
+                slug, _, length = info[document]
+                bite_terms[slug].add(term)
+                norm = K1 * (1 - B + B * length / average_length)
+                scores[document] += idf * count * (K1 + 1) / (count + norm)
+
+        best: dict[str, tuple[float, int]] = {}
+        bite_scores: dict[str, float] = defaultdict(float)
+        for document, score in scores.items():
+            slug = info[document][0]
+            if len(bite_terms[slug]) < len(term_postings):
+                continue
+            bite_scores[slug] += score
+            if slug not in best or score > best[slug][0]:
+                best[slug] = (score, document)
+
+        ranked = sorted(bite_scores, key=lambda slug: (-bite_scores[slug], slug))
+        return [
+            SearchResult(
+                slug,
+                bite_scores[slug],
+                info[best[slug][1]][1],
+                self.snippet(best[slug][1], terms),
+            )
+            for slug in ranked[:limit]
+        ]
+
+    def snippet(self, document: int, terms: list[str]) -> str:
+        """The first line of a document containing one of the terms."""
+        (text,) = self.connection.execute(
+            "SELECT text FROM documents WHERE id = ?", (document,)
+        ).fetchone()
+        words = [term.rstrip("*") for term in terms]
+        for line in text.splitlines():
+            lowered = line.lower()
+            if any(word in lowered for word in words):
+                return line.strip()
+        return ""
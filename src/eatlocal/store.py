@@ -0,0 +1,193 @@
+"""local bites database"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Self
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bites (
+    slug TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    level TEXT,
+    downloaded_at REAL,
+    code_file TEXT,
+    test_file TEXT,
+    downloaded_hash TEXT,
+    submitted_hash TEXT,
+    passed INTEGER
+);
+CREATE INDEX IF NOT EXISTS bites_title ON bites (title);
+"""
+
+COLUMNS = frozenset(
+    [
+        "title",
+        "level",
+        "downloaded_at",
+        "code_file",
+        "test_file",
+        "downloaded_hash",
+        "submitted_hash",
+        "passed",
+    ]
+)
+
+
+def code_digest(code: str) -> str:
+    """Hash the code of a bite.
+
+    Args:
+        code: Source code of the bite.
+
+    Returns:
+        The SHA-256 hex digest of the code.
+
+    """
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def read_json(path: Path) -> dict:
+    """Read a JSON file, an empty dict if it does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+class LocalBites:
+    """SQLite store of the bites that have been downloaded locally.
+
+    The database runs in WAL mode so several eatlocal processes can read
+    while one of them writes. Every change is one short transaction, and a
+    writer waits up to 30 seconds for another one to commit instead of
+    failing, so parallel runs never lose each other's rows.
+
+    Attributes:
+        path: Location of the SQLite database.
+        connection: Open connection to the database.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def track(self, slug: str, title: str, **columns) -> None:
+        """Add a bite or update its columns.
+
+        Columns that are not given keep their stored value.
+
+        Args:
+            slug: Slug of the bite.
+            title: Title of the bite.
+            **columns: Other columns of the bite to set.
+
+        """
+        self.update_many([(slug, title, columns)])
+
+    def update_many(self, rows: list[tuple[str, str | None, dict]]) -> None:
+        """Add or update several bites in one transaction.
+
+        Args:
+            rows: Tuples of slug, title and the other columns to set. A title
+                of None keeps the stored title.
+
+        """
+        with self.connection:
+            for slug, title, columns in rows:
+                unknown = set(columns) - COLUMNS
+                if unknown:
+                    raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+                if title is None:
+                    # bites only known by slug are titled by it until tracked
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO bites (slug, title) VALUES (?, ?)",
+                        (slug, slug),
+                    )
+                else:
+                    self.connection.execute(
+                        "INSERT INTO bites (slug, title) VALUES (?, ?) "
+                        "ON CONFLICT (slug) DO UPDATE SET title = excluded.title",
+                        (slug, title),
+                    )
+                if columns:
+                    assignments = ", ".join(f"{column} = ?" for column in columns)
+                    self.connection.execute(
+                        f"UPDATE bites SET {assignments} WHERE slug = ?",
+                        (*columns.values(), slug),
+                    )
+
+    def update(self, slug: str, **columns) -> None:
+        """Set columns of a tracked bite.
+
+        Args:
+            slug: Slug of the bite.
+            **columns: Columns of the bite to set.
+
+        """
+        self.update_many([(slug, None, columns)])
+
+    def get(self, slug: str) -> sqlite3.Row | None:
+        """Look up a bite by slug.
+
+        Args:
+            slug: Slug of the bite.
+
+        Returns:
+            The bite's row, or None if it is not tracked.
+
+        """
+        return self.connection.execute(
+            "SELECT * FROM bites WHERE slug = ?", (slug,)
+        ).fetchone()
+
+    def choices(self) -> list[tuple[str, str]]:
+        """List the slug and title of all tracked bites.
+
+        Returns:
+            The slugs and titles, sorted by title.
+
+        """
+        # plain tuples, building a Row per bite is slow for large databases
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        return cursor.execute("SELECT slug, title FROM bites ORDER BY title").fetchall()
+
+    def all(self) -> list[sqlite3.Row]:
+        """List all tracked bites.
+
+        Returns:
+            The rows of the bites, sorted by title.
+
+        """
+        return self.connection.execute("SELECT * FROM bites ORDER BY title").fetchall()
+
+    def import_json(self, bites_file: Path) -> None:
+        """Import and remove the JSON file used by earlier versions.
+
+        Args:
+            bites_file: JSON file mapping titles to slugs.
+
+        """
+        # another process may import and remove the file at the same time,
+        # importing twice stores the same rows
+        titles = read_json(bites_file)
+        self.update_many([(slug, title, {}) for title, slug in titles.items()])
+        bites_file.unlink(missing_ok=True)
@@ -0,0 +1,229 @@
+"""timing of the phases of eatlocal commands"""
+
+import json
+import math
+import threading
+import time
+import tracemalloc
+import uuid
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+
+from .constants import TRACE_FILE, TRUE_VALUES, env_flag
+
+TRACE_ENV = "EATLOCAL_TRACE"
+TRACE_MEMORY_ENV = "EATLOCAL_TRACE_MEMORY"
+FALSE_VALUES = ("", "0", "false", "no", "off")
+
+
+class Tracer:
+    """Writes the spans of one eatlocal run to a JSON lines file.
+
+    Attributes:
+        path: Location of the trace file.
+        command: The eatlocal command being run.
+        memory: Whether memory use is recorded with tracemalloc.
+        run: Identifier shared by the spans of the run.
+
+    """
+
+    def __init__(self, path: Path, command: str | None, memory: bool) -> None:
+        self.path = path
+        self.command = command
+        self.memory = memory
+        self.run = uuid.uuid4().hex[:12]
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def record(self, name: str, start: float, end: float, attrs: dict) -> None:
+        """Write a finished span.
+
+        Args:
+            name: Name of the phase.
+            start: perf_counter value when the phase started.
+            end: perf_counter value when the phase ended.
+            attrs: Details of the span, such as the bite it worked on.
+
+        """
+        entry = {
+            "run": self.run,
+            "command": self.command,
+            "span": name,
+            "parent": _parent.get(),
+            "at": time.time() - (time.perf_counter() - start),
+            "duration": end - start,
+            **attrs,
+        }
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            entry["memory"] = current
+            entry["memory_peak"] = peak
+        line = json.dumps(entry) + "\n"
+        # a single append per span, so runs of several processes can share
+        # the file
+        with self.lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+    def close(self) -> None:
+        """Write the span of the whole command."""
+        self.record("command", self.start, time.perf_counter(), {})
+        if self.memory:
+            tracemalloc.stop()
+
+
+_tracer: Tracer | None = None
+_parent: ContextVar[str | None] = ContextVar("eatlocal_span", default=None)
+_disabled = nullcontext()
+
+
+def trace_settings(environ: dict) -> tuple[Path | None, bool]:
+    """Read the tracing settings from the environment.
+
+    EATLOCAL_TRACE turns tracing on: 1 writes to the default trace file,
+    any other value is the path of the file to write to.
+    EATLOCAL_TRACE_MEMORY=1 also records memory use.
+
+    Args:
+        environ: The environment variables.
+
+    Returns:
+        The trace file, or None if tracing is off, and whether memory use
+        is recorded.
+
+    """
+    value = environ.get(TRACE_ENV, "").strip()
+    memory = env_flag(environ, TRACE_MEMORY_ENV)
+    if value.lower() in FALSE_VALUES:
+        return (TRACE_FILE if memory else None), memory
+    if value.lower() in TRUE_VALUES:
+        return TRACE_FILE, memory
+    return Path(value).expanduser(), memory
+
+
+def start_tracing(path: Path, command: str | None, memory: bool = False) -> Tracer:
+    """Record the spans of this run.
+
+    Args:
+        path: Location of the trace file.
+        command: The eatlocal command being run.
+        memory: Whether to record memory use with tracemalloc.
+
+    Returns:
+        The tracer recording the run.
+
+    """
+    global _tracer
+    if memory:
+        tracemalloc.start()
+    _tracer = Tracer(path, command, memory)
+    return _tracer
+
+
+def stop_tracing() -> None:
+    """Stop recording the spans of this run."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def span(name: str, **attrs) -> AbstractContextManager[None]:
+    """Time a phase of the command when tracing is on.
+
+    Args:
+        name: Name of the phase, e.g. "browser.launch".
+        **attrs: Details stored with the span, such as the bite's slug.
+
+    Returns:
+        A context manager timing the code it wraps.
+
+    """
+    if _tracer is None:
+        return _disabled
+    return _span(_tracer, name, attrs)
+
+
+@contextmanager
+def _span(tracer: Tracer, name: str, attrs: dict) -> Iterator[None]:
+    token = _parent.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as error:
+        attrs["error"] = type(error).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        _parent.reset(token)
+        tracer.record(name, start, end, attrs)
+
+
+def read_spans(path: Path) -> list[dict]:
+    """Read the spans recorded in a trace file.
+
+    Args:
+        path: Location of the trace file.
+
+    Returns:
+        The spans, lines that cannot be read are skipped.
+
+    """
+    spans = []
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and "span" in entry and "duration" in entry:
+                    spans.append(entry)
+    except OSError:
+        return []
+    return spans
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize_spans(spans: list[dict]) -> list[dict]:
+    """Compute latency percentiles for each phase across runs.
+
+    Args:
+        spans: Spans read from a trace file.
+
+    Returns:
+        One summary per command and phase, with the number of spans, the
+        p50, p90 and p99 and the maximum duration, and the highest memory
+        peak if memory was recorded.
+
+    """
+    durations: dict[tuple[str, str], list[float]] = {}
+    peaks: dict[tuple[str, str], int] = {}
+    for entry in spans:
+        key = (entry.get("command") or "", entry["span"])
+        durations.setdefault(key, []).append(entry["duration"])
+        if "memory_peak" in entry:
+            peaks[key] = max(peaks.get(key, 0), entry["memory_peak"])
+    summaries = []
+    for key, values in sorted(durations.items()):
+        values.sort()
+        summaries.append(
+            {
+                "command": key[0],
+                "span": key[1],
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": values[-1],
+                "memory_peak": peaks.get(key),
+            }
+        )
+    return summaries
@@ -0,0 +1,308 @@
+"""browser-free access to the PyBites platform"""
+
+import re
+from collections.abc import Callable
+from typing import Self
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.cookies import create_cookie
+
+from . import __version__
+from .constants import (
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    LOGIN_URL,
+    PROFILE_URL,
+)
+from .feedback import FeedbackStream, FeedbackTextParser
+from .resilience import http_request, request_not_sent
+from .tracing import span
+
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken"\s+value="([^"]+)"')
+LOGGED_IN_MARKER = 'href="/auth/logout/"'
+BITE_EDITOR_MARKER = 'id="python-editor"'
+PYTEST_OUTPUT_MARKER = "test session starts"
+
+
+class PlatformError(Exception):
+    """The platform could not be used without a browser."""
+
+
+class LoginError(PlatformError):
+    """The platform did not accept the credentials."""
+
+
+class SubmissionError(Exception):
+    """Code was sent to the platform, but its test results were not read.
+
+    The platform may have run the tests and counted the attempt, so the
+    code must not be submitted again another way.
+    """
+
+
+def new_session() -> requests.Session:
+    """Create an HTTP session with a pool of keep-alive connections.
+
+    Returns:
+        A requests session for the PyBites platform.
+
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = f"eatlocal/{__version__}"
+    return session
+
+
+def csrf_token(html: str) -> str:
+    """Find the Django CSRF token in a page.
+
+    Args:
+        html: Content of a platform page containing a form.
+
+    Returns:
+        The value of the csrfmiddlewaretoken field.
+
+    """
+    match = CSRF_TOKEN.search(html)
+    if match is None:
+        raise PlatformError("No CSRF token found on the page.")
+    return match.group(1)
+
+
+class PlatformSession:
+    """Authenticated HTTP session for the PyBites platform.
+
+    Cookies can be seeded from, and exported to, a Playwright storage state
+    so the browser and HTTP engines share one login.
+
+    Attributes:
+        username: PyBites username.
+        password: PyBites password.
+        session: The underlying requests session.
+        logged_in: Whether this session went through the login form.
+
+    """
+
+    def __init__(
+        self, username: str, password: str, storage_state: dict | None = None
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.session = new_session()
+        self.logged_in = False
+        for cookie in (storage_state or {}).get("cookies", []):
+            expires = cookie.get("expires", -1)
+            self.session.cookies.set_cookie(
+                create_cookie(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie["domain"],
+                    path=cookie.get("path", "/"),
+                    secure=cookie.get("secure", False),
+                    expires=None if expires == -1 else int(expires),
+                    rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+                )
+            )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.session.close()
+
+    def login(self) -> None:
+        """Login through the platform's login form.
+
+        Raises:
+            LoginError: If the credentials are not accepted.
+
+        """
+        with span("http.login"):
+            r = http_request(
+                lambda: self.session.get(LOGIN_URL, timeout=HTTP_TIMEOUT), "http.login"
+            )
+            r.raise_for_status()
+            data = {
+                "csrfmiddlewaretoken": csrf_token(r.text),
+                "login": self.username,
+                "password": self.password,
+            }
+            # logging in twice is harmless
+            r = http_request(
+                lambda: self.session.post(
+                    LOGIN_URL,
+                    data=data,
+                    headers={"Referer": LOGIN_URL},
+                    timeout=HTTP_TIMEOUT,
+                ),
+                "http.login",
+            )
+            r.raise_for_status()
+        if r.url != PROFILE_URL:
+            raise LoginError("Unable to login to PyBites.")
+        self.logged_in = True
+
+    def fetch(self, url: str) -> str:
+        """Fetch a page as a logged in user, logging in when needed.
+
+        Args:
+            url: URL of the platform page.
+
+        Returns:
+            The HTML of the page.
+
+        """
+        with span("http.fetch", url=url):
+            r = http_request(
+                lambda: self.session.get(url, timeout=HTTP_TIMEOUT), "http.fetch"
+            )
+            r.raise_for_status()
+        if LOGGED_IN_MARKER in r.text:
+            return r.text
+        self.login()
+        with span("http.fetch", url=url):
+            r = http_request(
+                lambda: self.session.get(url, timeout=HTTP_TIMEOUT), "http.fetch"
+            )
+            r.raise_for_status()
+        if LOGGED_IN_MARKER not in r.text:
+            raise PlatformError(f"Not logged in when fetching {url}.")
+        return r.text
+
+    def fetch_bite(self, url: str) -> str:
+        """Fetch a bite page that contains the bite's code.
+
+        Args:
+            url: URL of the bite.
+
+        Returns:
+            The HTML of the bite page.
+
+        Raises:
+            PlatformError: If the page does not contain the code editor.
+
+        """
+        html = self.fetch(url)
+        if BITE_EDITOR_MARKER not in html:
+            raise PlatformError(f"No bite code found at {url}.")
+        return html
+
+    def validate(
+        self, url: str, code: str, on_output: Callable[[str], None] | None = None
+    ) -> str:
+        """Run the platform tests against code, like the Run Tests button.
+
+        The form fields the button's htmx request would send are read from
+        the bite page, so no browser is needed to submit. The feedback is
+        read as it arrives and reading stops once it holds the final result.
+
+        Args:
+            url: URL of the bite.
+            code: Code to validate.
+            on_output: Called with each line of feedback as it arrives.
+
+        Returns:
+            The text of the validation feedback.
+
+        Raises:
+            PlatformError: If the page cannot be submitted.
+            requests.RequestException: If the platform cannot be reached,
+                the code was not sent.
+            SubmissionError: If the code was sent but the feedback could not
+                be read or does not contain the test results.
+
+        """
+        soup = BeautifulSoup(self.fetch_bite(url), "html.parser")
+        button = soup.find(id="validate-button")
+        editor = soup.find(id="python-editor")
+        if (
+            button is None
+            or editor is None
+            or not button.get("hx-post")
+            or not editor.get("name")
+        ):
+            raise PlatformError(f"No validation form found at {url}.")
+
+        data = {}
+        for selector in button.get("hx-include", "").split(","):
+            for element in soup.select(selector.strip()):
+                if element.get("name"):
+                    data[element["name"]] = element.get("value", element.text)
+        data[editor["name"]] = code
+
+        with span("validate.wait", url=url):
+            try:
+                # a submission is only sent again when the platform surely
+                # did not receive it, it counts as an attempt on the bite
+                r = http_request(
+                    lambda: self.session.post(
+                        urljoin(url, button["hx-post"]),
+                        data=data,
+                        headers={
+                            "Referer": url,
+                            "HX-Request": "true",
+                            "HX-Trigger": button["id"],
+                            "HX-Target": button.get("hx-target", "").lstrip("#"),
+                            "HX-Current-URL": url,
+                        },
+                        timeout=HTTP_TIMEOUT,
+                        stream=True,
+                    ),
+                    "validate.post",
+                    idempotent=False,
+                )
+            except requests.RequestException as error:
+                if request_not_sent(error):
+                    raise
+                raise SubmissionError(f"No feedback for {url}: {error}") from error
+            if r.status_code in (429, 503):
+                # the platform turned the submission away
+                r.close()
+                r.raise_for_status()
+            body = []
+            try:
+                with r:
+                    r.raise_for_status()
+                    r.encoding = r.encoding or "utf-8"
+                    stream = FeedbackStream(on_output)
+                    parser = FeedbackTextParser(stream)
+                    for chunk in r.iter_content(chunk_size=None, decode_unicode=True):
+                        body.append(chunk)
+                        parser.feed(chunk)
+                        if stream.complete:
+                            break
+                    stream.close()
+            except requests.RequestException as error:
+                raise SubmissionError(f"No feedback for {url}: {error}") from error
+        feedback = BeautifulSoup("".join(body), "html.parser").get_text()
+        if PYTEST_OUTPUT_MARKER not in feedback:
+            raise SubmissionError(f"No test results in the feedback for {url}.")
+        return feedback
+
+    def storage_state(self) -> dict:
+        """Export the session cookies as a Playwright storage state.
+
+        Returns:
+            A storage state dictionary.
+
+        """
+        return {
+            "cookies": [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                    "expires": -1 if cookie.expires is None else cookie.expires,
+                    "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+                    "secure": cookie.secure,
+                    "sameSite": "Lax",
+                }
+                for cookie in self.session.cookies
+            ],
+            "origins": [],
+        }
@@ -0,0 +1,206 @@
+"""status of the bite directories in the local workspace"""
+
+import json
+import os
+import threading
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .store import code_digest
+
+# bump when the cached entries change
+CACHE_VERSION = 1
+STATUSES = ("modified", "failed", "unreadable", "passed", "untouched", "missing")
+SCAN_WORKERS = 32
+
+
+def code_file_name(names: Iterable[str]) -> str | None:
+    """The code file among the file names of a bite directory.
+
+    Args:
+        names: File names in the bite directory.
+
+    Returns:
+        The first python file that is not a test, None if there is none.
+
+    """
+    return min(
+        (
+            name
+            for name in names
+            if name.endswith(".py") and not name.startswith("test_")
+        ),
+        default=None,
+    )
+
+
+def find_code_file(bite_dir: Path) -> Path | None:
+    """The code file of a bite directory, None if it has none."""
+    with os.scandir(bite_dir) as entries:
+        name = code_file_name(entry.name for entry in entries)
+    return None if name is None else bite_dir / name
+
+
+def scan_bite_dir(bite_dir: str, cached: dict | None) -> dict | None:
+    """Stat a bite directory and hash its code if it changed.
+
+    The directory is only listed again when its modification time changed,
+    which happens when files are added, removed or replaced. The code file
+    is still stat'ed every time, editors may write it in place.
+
+    Args:
+        bite_dir: The bite directory.
+        cached: The entry of the previous scan, if any.
+
+    Returns:
+        The entry of the directory, None if it does not exist.
+
+    """
+    try:
+        dir_mtime_ns = os.stat(bite_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    listed = cached is None or cached.get("dir_mtime_ns") != dir_mtime_ns
+    if listed:
+        with os.scandir(bite_dir) as entries:
+            names = {entry.name for entry in entries}
+        name = code_file_name(names)
+        # the code is hashed again only if the code file itself changed
+        previous = cached if cached and cached.get("code_file") == name else {}
+        cached = {**previous, "dir_mtime_ns": dir_mtime_ns, "code_file": name}
+    entry = dict(cached)
+    if entry["code_file"] is None:
+        return entry
+    try:
+        code_path = os.path.join(bite_dir, entry["code_file"])
+        stat = os.stat(code_path)
+    except FileNotFoundError:
+        if listed:
+            return {**entry, "code_file": None}
+        return scan_bite_dir(bite_dir, None)
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    if entry.get("code_stamp") != stamp:
+        try:
+            with open(code_path, encoding="utf-8") as code:
+                entry["digest"] = code_digest(code.read())
+            entry["unreadable"] = False
+        except (OSError, UnicodeDecodeError):
+            # one bad file must not stop the scan of the workspace
+            entry["digest"] = None
+            entry["unreadable"] = True
+        entry["code_stamp"] = stamp
+    return entry
+
+
+def bite_status(entry: dict | None, bite: Mapping, bite_dir: str) -> str:
+    """Tell how a bite's code compares with its download and submission.
+
+    Args:
+        entry: The scanned entry of the bite directory.
+        bite: The bite's row in the local bites database.
+        bite_dir: The bite directory.
+
+    Returns:
+        One of STATUSES.
+
+    """
+    if entry is not None and entry.get("unreadable"):
+        return "unreadable"
+    if entry is None or entry.get("digest") is None:
+        return "missing"
+    reference = bite["submitted_hash"] or bite["downloaded_hash"]
+    if reference is None:
+        # bites downloaded before hashes were stored, see local_code_changed
+        try:
+            downloaded = os.stat(os.path.join(bite_dir, "bite.html")).st_mtime_ns
+        except OSError:
+            return "untouched"
+        return "modified" if entry["code_stamp"][0] > downloaded else "untouched"
+    if entry["digest"] != reference:
+        return "modified"
+    if not bite["submitted_hash"]:
+        return "untouched"
+    return "passed" if bite["passed"] else "failed"
+
+
+class WorkspaceScanner:
+    """Scans the bite directories of a workspace, caching what it found.
+
+    Attributes:
+        cache_path: JSON file holding the entry of each bite directory.
+
+    """
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = cache_path
+
+    def load(self) -> dict[str, dict]:
+        try:
+            with open(self.cache_path, encoding="utf-8") as fh:
+                cache = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("dirs", {})
+
+    def save(self, dirs: dict[str, dict]) -> None:
+        temporary = self.cache_path.with_name(
+            f"{self.cache_path.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as fh:
+                json.dump({"version": CACHE_VERSION, "dirs": dirs}, fh)
+            os.replace(temporary, self.cache_path)
+        except OSError:
+            # the next scan reads the directories again
+            temporary.unlink(missing_ok=True)
+
+    def scan(
+        self,
+        repo: Path,
+        bites: list[Mapping],
+        workers: int = SCAN_WORKERS,
+    ) -> dict[str, str]:
+        """Find the status of tracked bites.
+
+        Args:
+            repo: The directory holding the bite directories.
+            bites: Rows of the local bites database.
+            workers: Number of directories scanned at the same time.
+
+        Returns:
+            The status of each bite by slug.
+
+        """
+        cached = self.load()
+        root = Path(repo).resolve()
+        bite_dirs = [os.path.join(root, bite["slug"]) for bite in bites]
+
+        def scan_chunk(chunk: list[str]) -> list[dict | None]:
+            return [scan_bite_dir(bite_dir, cached.get(bite_dir)) for bite_dir in chunk]
+
+        # the threads spend their time in stat calls, which release the GIL,
+        # each takes a share of the directories to keep the overhead low
+        size = max(1, -(-len(bite_dirs) // workers))
+        chunks = [
+            bite_dirs[start : start + size] for start in range(0, len(bite_dirs), size)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            entries = [
+                entry for chunk in pool.map(scan_chunk, chunks) for entry in chunk
+            ]
+        found = {
+            bite_dir: entry
+            for bite_dir, entry in zip(bite_dirs, entries)
+            if entry is not None
+        }
+        if found != cached:
+            # entries of other workspaces and removed directories are dropped
+            self.save(found)
+        return {
+            bite["slug"]: bite_status(entry, bite, bite_dir)
+            for bite, bite_dir, entry in zip(bites, bite_dirs, entries)
+        }
@@ -1,16 +1,107 @@
 """eatlocal specific pytest configuration"""
 
+import shutil
+from collections.abc import Iterator
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
+from bs4 import BeautifulSoup
 from dotenv import dotenv_values
 
 from eatlocal.constants import EATLOCAL_HOME
+from eatlocal.resilience import CircuitBreaker
 
 
 @pytest.fixture
-def testing_config() -> dict[str, str]:
+def testing_config(tmp_path) -> dict[str, str]:
+    """Configuration with a copy of the testing repo, tests may write to it."""
     config = {"PYBITES_USERNAME": "", "PYBITES_PASSWORD": "", "PYBITES_REPO": ""}
     config.update(dotenv_values(dotenv_path=Path(EATLOCAL_HOME / ".env")))
-    config["PYBITES_REPO"] = Path("./tests/testing_repo").resolve()
+    repo = tmp_path / "testing_repo"
+    shutil.copytree("./tests/testing_repo", repo)
+    config["PYBITES_REPO"] = repo.resolve()
     return config
+
+
+@pytest.fixture
+def local_bites_db(tmp_path) -> Iterator[Path]:
+    """Local bites database imported from the testing repo's JSON file."""
+    legacy_db = tmp_path / ".local_bites.json"
+    shutil.copy(Path("./tests/testing_repo/.local_bites.json"), legacy_db)
+    db = tmp_path / ".local_bites.sqlite"
+    with (
+        patch("eatlocal.eatlocal.LOCAL_BITES_DB", db),
+        patch("eatlocal.eatlocal.LEGACY_LOCAL_BITES_DB", legacy_db),
+    ):
+        yield db
+
+
+@pytest.fixture
+def bites_catalog(tmp_path) -> Iterator[Path]:
+    """Location of an empty bites catalog."""
+    catalog = tmp_path / ".bites_catalog.json"
+    with (
+        patch("eatlocal.eatlocal.BITES_CATALOG", catalog),
+        patch(
+            "eatlocal.eatlocal.LEGACY_BITES_CACHE",
+            tmp_path / ".bites_list_cache.sqlite",
+        ),
+    ):
+        yield catalog
+
+
+@pytest.fixture
+def page_cache(tmp_path) -> Iterator[Path]:
+    """Location of an empty page cache."""
+    cache = tmp_path / "pages"
+    with patch("eatlocal.eatlocal.PAGE_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture
+def summing_record() -> dict:
+    """The elements of the saved bite page, as the browser returns them."""
+    with open("./tests/testing_content/summing_content.txt") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    return {
+        "description": str(soup.find(id="bite-description")),
+        "code": soup.find(id="python-editor").text,
+        "tests": soup.find(id="test-python-editor").text,
+        "file_name": soup.find(id="filename").text,
+    }
+
+
+@pytest.fixture(autouse=True)
+def daemon_socket(tmp_path_factory) -> Iterator[Path]:
+    """Location of the daemon's socket, so a user's own daemon is never used."""
+    # Unix socket paths are limited to about a hundred characters
+    socket_path = tmp_path_factory.mktemp("daemon") / "daemon.sock"
+    with patch("eatlocal.daemon.DAEMON_SOCKET", socket_path):
+        yield socket_path
+
+
+@pytest.fixture(autouse=True)
+def display_cache(tmp_path_factory) -> Iterator[Path]:
+    """Location of the display cache, so tests never write to the user's."""
+    cache = tmp_path_factory.mktemp("display")
+    with patch("eatlocal.eatlocal.DISPLAY_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def retry_sleep() -> Iterator[MagicMock]:
+    """Skip the waits between retries, with a fresh platform breaker."""
+    with (
+        patch("eatlocal.resilience.sleep") as sleep,
+        patch("eatlocal.resilience.PLATFORM_BREAKER", CircuitBreaker()),
+    ):
+        yield sleep
+
+
+@pytest.fixture
+def workspace_cache(tmp_path) -> Iterator[Path]:
+    """Location of an empty workspace scan cache."""
+    cache = tmp_path / "workspace.json"
+    with patch("eatlocal.eatlocal.WORKSPACE_CACHE", cache):
+        yield cache
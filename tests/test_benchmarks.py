@@ -0,0 +1,34 @@
+"""eatlocal benchmark suite tests"""
+
+import json
+import subprocess
+import sys
+
+
+def test_benchmark_suite_runs(tmp_path) -> None:
+    """Every benchmark runs offline and the baseline is stored."""
+    baseline = tmp_path / "baseline.json"
+    args = ["--size", "50", "--repeat", "1", "--baseline", str(baseline)]
+    subprocess.run(
+        [sys.executable, "benchmarks/suite.py", *args, "--save"],
+        capture_output=True,
+        check=True,
+    )
+    stored = json.loads(baseline.read_text())
+    assert stored["size"] == 50
+    assert "choose_local_bite_db" in stored["results"]
+
+
+def test_benchmark_suite_fails_on_regression(tmp_path) -> None:
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"size": 50, "results": {"format_bite_keys": 1e-9}}))
+    result = subprocess.run(
+        [sys.executable, "benchmarks/suite.py", "--size", "50", "--repeat", "1"]
+        + ["--baseline", str(baseline), "-k", "format_bite_keys"],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+    assert result.returncode == 1
+    assert "format_bite_keys" in result.stdout
+    assert "REGRESSION" in result.stdout
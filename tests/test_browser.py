@@ -0,0 +1,99 @@
+"""eatlocal lean browser mode tests"""
+
+import subprocess
+import sys
+
+import pytest
+
+from eatlocal import browser, eatlocal
+from eatlocal.browser import (
+    LEAN_BROWSER_ARGS,
+    RequestBlocker,
+    launch_options,
+    lean_setting,
+    process_tree_rss,
+    should_block,
+)
+
+
+@pytest.mark.parametrize(
+    "resource_type, url, blocked",
+    [
+        ("document", "https://pybitesplatform.com/bites/sum-n-numbers/", False),
+        ("script", "https://pybitesplatform.com/static/app.js", False),
+        ("stylesheet", "https://cdn.example.com/codemirror.css", False),
+        ("script", "https://cdn.example.com/codemirror.js", False),
+        ("xhr", "https://pybitesplatform.com/bites/api/validate/", False),
+        ("image", "https://pybitesplatform.com/static/logo.png", True),
+        ("font", "https://fonts.gstatic.com/s/roboto.woff2", True),
+        ("xhr", "https://www.google-analytics.com/collect", True),
+        ("fetch", "https://plausible.io/api/event", True),
+    ],
+)
+def test_should_block(resource_type, url, blocked) -> None:
+    assert should_block(resource_type, url) is blocked
+
+
+@pytest.mark.parametrize(
+    "environ, lean",
+    [({}, False), ({"EATLOCAL_LEAN": "0"}, False), ({"EATLOCAL_LEAN": "yes"}, True)],
+)
+def test_lean_setting(environ, lean) -> None:
+    assert lean_setting(environ) is lean
+
+
+def test_launch_options(monkeypatch) -> None:
+    assert launch_options() == {}
+    assert launch_options(lean=True) == {"args": LEAN_BROWSER_ARGS}
+    monkeypatch.setattr(browser, "_lean", True)
+    assert launch_options() == {"args": LEAN_BROWSER_ARGS}
+
+
+class FakeRoute:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.request = type("Request", (), {"resource_type": resource_type, "url": url})
+        self.handled = None
+
+    def abort(self) -> None:
+        self.handled = "abort"
+
+    def continue_(self) -> None:
+        self.handled = "continue"
+
+
+def test_request_blocker_counts_blocked_requests() -> None:
+    blocker = RequestBlocker()
+    image = FakeRoute("image", "https://pybitesplatform.com/static/logo.png")
+    page = FakeRoute("document", "https://pybitesplatform.com/")
+
+    blocker.handle(image)
+    blocker.handle(page)
+
+    assert (image.handled, page.handled) == ("abort", "continue")
+    assert blocker.blocked == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_process_tree_rss_counts_child_processes() -> None:
+    before = process_tree_rss()
+    with subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(30)"]
+    ) as child:
+        try:
+            assert process_tree_rss() > before
+            assert process_tree_rss(child.pid) == 0
+        finally:
+            child.kill()
+
+
+def test_print_browser_report(monkeypatch, capsys) -> None:
+    def fake_measure(url: str, lean: bool) -> dict:
+        if lean:
+            return {"load_time": 0.4, "rss": 150 * 2**20, "blocked": 12}
+        return {"load_time": 1.0, "rss": 250 * 2**20, "blocked": 0}
+
+    monkeypatch.setattr(eatlocal, "measure_page_load", fake_measure)
+    eatlocal.print_browser_report("https://pybitesplatform.com/", rounds=2)
+
+    output = capsys.readouterr().out
+    assert "Lean mode saved 600ms and 100MiB of memory per page." in output
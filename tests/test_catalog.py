@@ -0,0 +1,117 @@
+"""eatlocal bites catalog tests"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eatlocal.catalog import (
+    CatalogError,
+    fetch_catalog,
+    load_catalog,
+    merge_bites,
+    refresh_catalog_in_background,
+    save_catalog,
+)
+from eatlocal.eatlocal import fetch_bites
+
+SUM = {"title": "Sum n numbers", "slug": "sum-n-numbers", "level": "Beginner"}
+REGEX = {"title": "Regex fun", "slug": "regex-fun", "level": "Advanced"}
+WORDS = {"title": "Word values", "slug": "word-values", "level": "Intermediate"}
+
+
+def _response(status_code: int, data=None, headers=None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.headers = headers or {}
+    return response
+
+
+def test_merge_bites() -> None:
+    renamed = {**SUM, "title": "Sum numbers"}
+    bites, added, removed = merge_bites([SUM, REGEX], [WORDS, renamed])
+    assert bites == [WORDS, renamed]
+    assert added == ["word-values"]
+    assert removed == ["regex-fun"]
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_fetch_catalog_keeps_only_picker_fields(mock_get) -> None:
+    with open("./tests/testing_content/bites_api.json") as f:
+        api_data = json.load(f)
+    mock_get.return_value = _response(200, api_data, {"ETag": '"v1"'})
+
+    catalog = fetch_catalog()
+
+    assert catalog["bites"] == [SUM, REGEX, WORDS]
+    assert catalog["etag"] == '"v1"'
+    assert catalog["added"] == ["sum-n-numbers", "regex-fun", "word-values"]
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_fetch_catalog_not_modified(mock_get) -> None:
+    stored = {"etag": '"v1"', "last_modified": None, "bites": [SUM]}
+    mock_get.return_value = _response(304)
+
+    catalog = fetch_catalog(stored)
+
+    assert catalog["bites"] == [SUM]
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_fetch_catalog_unavailable(mock_get) -> None:
+    mock_get.return_value = _response(502)
+    with pytest.raises(CatalogError):
+        fetch_catalog()
+
+
+def test_save_and_load_catalog(tmp_path) -> None:
+    path = tmp_path / "catalog.json"
+    assert load_catalog(path) is None
+    save_catalog(path, {"bites": [SUM]})
+    assert load_catalog(path) == {"bites": [SUM]}
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_refresh_catalog_in_background(mock_get, tmp_path) -> None:
+    path = tmp_path / "catalog.json"
+    save_catalog(path, {"etag": '"v1"', "bites": [SUM]})
+    mock_get.return_value = _response(200, [SUM, REGEX], {"ETag": '"v2"'})
+
+    refresh_catalog_in_background(path).join()
+
+    catalog = load_catalog(path)
+    assert catalog["bites"] == [SUM, REGEX]
+    assert catalog["added"] == ["regex-fun"]
+
+
+@patch("eatlocal.catalog.refresh_catalog_in_background")
+@patch("eatlocal.catalog.requests.get")
+def test_fetch_bites_uses_stored_catalog(mock_get, mock_refresh, bites_catalog):
+    """The stored catalog is used right away and refreshed in the background."""
+    save_catalog(bites_catalog, {"bites": [SUM]})
+    legacy_cache = bites_catalog.with_name(".bites_list_cache.sqlite")
+    legacy_cache.touch()
+
+    assert fetch_bites() == [SUM]
+    mock_get.assert_not_called()
+    mock_refresh.assert_called_once_with(bites_catalog)
+    assert legacy_cache.exists()
+
+
+@patch("eatlocal.catalog.refresh_catalog_in_background")
+@patch("eatlocal.catalog.requests.get")
+def test_fetch_bites_clear(mock_get, mock_refresh, bites_catalog):
+    """Clearing the catalog waits for a fresh bites list."""
+    save_catalog(bites_catalog, {"bites": [SUM]})
+    legacy_cache = bites_catalog.with_name(".bites_list_cache.sqlite")
+    legacy_cache.touch()
+    mock_get.return_value = _response(200, [REGEX])
+
+    assert fetch_bites(clear=True) == [REGEX]
+    mock_refresh.assert_not_called()
+    assert load_catalog(bites_catalog)["bites"] == [REGEX]
+    assert not legacy_cache.exists()
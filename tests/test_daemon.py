@@ -0,0 +1,159 @@
+"""eatlocal daemon tests"""
+
+import asyncio
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eatlocal.daemon import (
+    Daemon,
+    DaemonClient,
+    DaemonError,
+    DaemonJobError,
+    connect_daemon,
+)
+from eatlocal.eatlocal import Bite, download_bites_with_daemon, validate_bite
+from eatlocal.web import SubmissionError
+
+FEEDBACK = (
+    "============================= test session starts ==============================\n"
+    "============================== 2 passed in 0.01s ===============================\n"
+    "Congrats, you passed this Bite!\n"
+)
+
+
+@pytest.fixture
+def platform_http() -> MagicMock:
+    """HTTP session of the daemon, standing in for the platform."""
+    http = MagicMock()
+    http.logged_in = False
+    return http
+
+
+@pytest.fixture
+def running_daemon(daemon_socket, platform_http, testing_config):
+    daemon = Daemon(testing_config, http=platform_http)
+    thread = threading.Thread(target=asyncio.run, args=(daemon.serve(daemon_socket),))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not daemon_socket.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield daemon
+    try:
+        DaemonClient(daemon_socket).call("stop")
+    except DaemonError:
+        pass
+    thread.join(5)
+
+
+def test_connect_daemon_not_running(daemon_socket) -> None:
+    assert connect_daemon() is None
+    daemon_socket.touch()
+    assert connect_daemon() is None
+
+
+def test_connect_daemon_checks_the_user(running_daemon, testing_config) -> None:
+    assert connect_daemon(testing_config["PYBITES_USERNAME"]) is not None
+    assert connect_daemon("someone-else") is None
+
+
+def test_daemon_status_and_stop(running_daemon, daemon_socket, testing_config) -> None:
+    client = connect_daemon()
+
+    status = client.status()
+    assert status["username"] == testing_config["PYBITES_USERNAME"]
+    assert (status["jobs"], status["browser"]) == (0, False)
+    with pytest.raises(DaemonError, match="Unknown job"):
+        client.call("frobnicate")
+
+    assert client.call("stop") == {"stopping": True}
+    deadline = time.monotonic() + 5
+    while daemon_socket.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not daemon_socket.exists()
+    assert connect_daemon() is None
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bite_streams_from_daemon(
+    mock_platform_session, running_daemon, platform_http, testing_config
+) -> None:
+    """The daemon's warm session validates the bite, no new session is opened."""
+
+    def validate(url, code, on_output):
+        for line in FEEDBACK.splitlines():
+            on_output(line)
+        return FEEDBACK
+
+    platform_http.validate.side_effect = validate
+    bite = Bite("Sum n numbers", "sum-n-numbers")
+    bite.local_code = "def sum_numbers(numbers=None): ..."
+    lines = []
+
+    assert validate_bite(bite, testing_config, lines.append) == FEEDBACK
+
+    assert lines == FEEDBACK.splitlines()
+    platform_http.validate.assert_called_once()
+    assert platform_http.validate.call_args.args[:2] == (bite.url, bite.local_code)
+    mock_platform_session.assert_not_called()
+    assert running_daemon.jobs == 1
+
+
+def test_job_timeout_is_not_a_connection_failure(
+    running_daemon, platform_http, daemon_socket
+) -> None:
+    platform_http.validate.side_effect = lambda url, code, on_output: time.sleep(0.5)
+    with pytest.raises(DaemonJobError):
+        DaemonClient(daemon_socket).call(
+            "validate", timeout=0.1, slug="sum-n-numbers", code=""
+        )
+
+    with pytest.raises(DaemonError) as error:
+        DaemonClient(daemon_socket.with_name("missing.sock")).call("status")
+    assert not isinstance(error.value, DaemonJobError)
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bite_does_not_resubmit_a_failed_job(
+    mock_platform_session, running_daemon, platform_http, testing_config
+) -> None:
+    """Code the daemon took is not submitted again by the CLI."""
+    platform_http.validate.side_effect = SubmissionError("No test results")
+    bite = Bite("Sum n numbers", "sum-n-numbers")
+    bite.local_code = "def sum_numbers(numbers=None): ..."
+
+    with pytest.raises(SubmissionError, match="No test results"):
+        validate_bite(bite, testing_config)
+    mock_platform_session.assert_not_called()
+
+
+@patch("eatlocal.eatlocal.track_downloaded_code")
+@patch("eatlocal.eatlocal.track_local_bites")
+def test_download_bites_with_daemon(
+    mock_track_local_bites,
+    mock_track_downloaded_code,
+    running_daemon,
+    platform_http,
+    testing_config,
+    page_cache,
+) -> None:
+    with open(Path("./tests/testing_content/summing_content.txt"), "r") as f:
+        platform_http.fetch_bite.return_value = f.read()
+    bites = [Bite("Sum n numbers", "sum-n-numbers")]
+
+    assert download_bites_with_daemon(bites, testing_config) == []
+
+    bite_dir = Path(testing_config["PYBITES_REPO"]) / "sum-n-numbers"
+    assert (bite_dir / "summing.py").exists()
+    mock_track_local_bites.assert_called_once_with(bites[0], testing_config)
+    assert len(list(page_cache.glob("objects/*/*.html.gz"))) == 1
+    shutil.rmtree(bite_dir)
+
+
+def test_download_bites_without_daemon(testing_config) -> None:
+    bites = [Bite("Sum n numbers", "sum-n-numbers")]
+    assert download_bites_with_daemon(bites, testing_config) == bites
@@ -1,7 +1,7 @@
 """eatlocal End to End Tests"""
 
 from typer.testing import CliRunner
-from eatlocal.eatlocal import download_bite, Bite, _format_bite_key
+from eatlocal.eatlocal import download_bites, Bite
 from eatlocal.__main__ import cli, EATLOCAL_HOME
 from unittest.mock import patch, mock_open, MagicMock
 from pathlib import Path
@@ -27,7 +27,7 @@ def test_eatlocal_cannot_download_premium_bite_wo_auth(
 ) -> None:
     """Test that a premium bite cannot be downloaded without credentials."""
     with pytest.raises(SystemExit):
-        download_bite(SUMMING_TEST_BITE, BAD_CONFIG)
+        download_bites([SUMMING_TEST_BITE], BAD_CONFIG)
         output = capfd.readouterr()[0]
         assert "Unable to login to PyBites." in output
 
@@ -56,15 +56,19 @@ def test_init_command(
 
 
 @pytest.mark.slow
-@patch("eatlocal.__main__.load_config")
-@patch("eatlocal.eatlocal.iterfzf")
-def test_download_command(mock_iterfzf, mock_load_config, testing_config):
+@patch("eatlocal.eatlocal.load_config")
+@patch("eatlocal.eatlocal.pick")
+def test_download_command(mock_pick, mock_load_config, testing_config):
     """Test the download command."""
     mock_load_config.return_value = testing_config
-    formatted_title = _format_bite_key(
-        SUMMING_TEST_BITE.title, SUMMING_TEST_BITE_LEVEL, len(SUMMING_TEST_BITE.title)
-    )
-    mock_iterfzf.return_value = formatted_title
+    mock_pick.side_effect = lambda choices, **kwargs: [
+        next(
+            index
+            for index, choice in enumerate(choices)
+            if choice.startswith(f"{SUMMING_TEST_BITE.title} ")
+            and SUMMING_TEST_BITE_LEVEL in choice
+        )
+    ]
 
     runner.invoke(cli, ["download"])
 
@@ -78,16 +82,14 @@ def test_download_command(mock_iterfzf, mock_load_config, testing_config):
 
 
 @pytest.mark.slow
-@patch("eatlocal.__main__.load_config")
-@patch("eatlocal.eatlocal.iterfzf")
-def test_submit_command(mock_iterfzf, mock_load_config, testing_config):
+@patch("eatlocal.eatlocal.load_config")
+@patch("eatlocal.eatlocal.pick")
+def test_submit_command(mock_pick, mock_load_config, testing_config, local_bites_db):
     """Test the submit command."""
     mock_load_config.return_value = testing_config
-    mock_iterfzf.return_value = PARSE_TEST_BITE.title
-    with patch(
-        "eatlocal.eatlocal.LOCAL_BITES_DB",
-        Path.cwd() / "tests/testing_repo/.local_bites.json",
-    ):
-        result = runner.invoke(cli, ["submit"])
+    mock_pick.side_effect = lambda choices, **kwargs: [
+        choices.index(PARSE_TEST_BITE.title)
+    ]
+    result = runner.invoke(cli, ["submit"])
 
     assert "Congrats, you passed" in result.output
@@ -0,0 +1,102 @@
+"""eatlocal bite page extraction tests"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_extract import whole_page_extract
+from eatlocal.extract import (
+    ExtractError,
+    bite_description,
+    bite_page_from_record,
+    extract_bite_page,
+    locate_elements,
+)
+
+SUMMING_PAGE = Path("./tests/testing_content/summing_content.txt").read_text()
+
+
+def bite_page(description: str, code: str = "x = 1 &lt; 2\n") -> str:
+    return f"""<html><body><p>intro
+<div id="bite-description">
+<div>author</div><!-- end author and learning paths -->
+{description}
+<p class="hidden" id="filename">summing</p>
+</div>
+<textarea name="user_code" id="python-editor">{code}</textarea>
+<textarea id="test-python-editor">from summing import x</textarea>
+<textarea id="solution-python-editor">x = 2</textarea>
+</body></html>"""
+
+
+def test_extract_bite_page() -> None:
+    page = extract_bite_page(SUMMING_PAGE)
+    assert page.file_name == "summing"
+    assert page.code.startswith("def sum_numbers(numbers=None):")
+    assert page.tests.startswith("from summing import sum_numbers")
+    assert page == whole_page_extract(SUMMING_PAGE)
+
+
+@pytest.mark.parametrize(
+    "description",
+    [
+        "<p>Plain text&nbsp;with an entity.</p>",
+        "<p>Void tags<br>and <br/>and <img src='a.png'>.</p>",
+        "<p>A stray end tag</br> and <hr></hr> a closed void.</p>",
+        "<p>Unclosed <b>bold <i>italic</p>",
+        "<pre><code>if a<b: pass</code></pre>",
+        "<script>document.write('</div>')</script>",
+        "<ul>\n<li>one</li>\n<li>two</li>\n</ul>\n" * 50,
+    ],
+)
+def test_extract_bite_page_matches_whole_page_parse(description) -> None:
+    html = bite_page(description)
+    assert extract_bite_page(html) == whole_page_extract(html)
+
+
+def test_extract_bite_page_element_closed_by_ancestor() -> None:
+    """An end tag for an enclosing element closes the bite description."""
+    html = bite_page("<span>text</p>after the paragraph")
+    assert extract_bite_page(html) == whole_page_extract(html)
+
+
+@pytest.mark.parametrize("context", ["<pre>", "<template>", "<br><hr>"])
+def test_extract_bite_page_inside_context(context) -> None:
+    """Enclosing and earlier tags change how the elements are parsed."""
+    html = context + bite_page("<p>a</p>\n</br> \n </hr>\n<p>b</p>")
+    assert extract_bite_page(html) == whole_page_extract(html)
+
+
+def test_extract_bite_page_code_with_markup() -> None:
+    html = bite_page("", code="if a<b and c>d:\n    print('<div>')\n")
+    assert extract_bite_page(html) == whole_page_extract(html)
+
+
+def test_extract_bite_page_without_code() -> None:
+    with pytest.raises(ExtractError):
+        extract_bite_page("<html><body><p>Please login.</p></body></html>")
+
+
+def test_bite_page_from_record(summing_record) -> None:
+    """Elements read in the browser are written like the downloaded page."""
+    assert bite_page_from_record(summing_record) == extract_bite_page(SUMMING_PAGE)
+
+
+def test_bite_page_from_record_without_code(summing_record) -> None:
+    with pytest.raises(ExtractError):
+        bite_page_from_record({**summing_record, "code": None})
+
+
+def test_locate_elements_stops_after_last_element() -> None:
+    markup = locate_elements('<div id="a">x</div><p id="b">y</p><div', ("a", "b"))
+    assert markup == {"a": '<div id="a">x</div>', "b": '<p id="b">y</p>'}
+
+
+def test_bite_description_skips_author_and_filename() -> None:
+    markup = (
+        '<div id="bite-description">\n<h2>Title</h2>\n'
+        "</div><!-- end author and learning paths -->\n<p>Body</p>\n"
+        '<p id="filename">summing</p>\n</div>'
+    )
+    assert bite_description(markup) == "<p>Body</p>\n</div>\n"
+    assert bite_description("<div>no author</div>") == ""
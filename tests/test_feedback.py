@@ -0,0 +1,74 @@
+"""eatlocal validation feedback tests"""
+
+import pytest
+
+from eatlocal.feedback import FeedbackStream, pytest_summary
+
+HEADER = "===== test session starts =====\n"
+
+
+@pytest.mark.parametrize(
+    "feedback, summary",
+    [
+        (HEADER + "collected 2 items\n", None),
+        (HEADER + "===== 2 passed in 0.01s =====\n", "2 passed"),
+        (
+            HEADER + "== 1 failed, 1 passed, 1 warning in 61.50s (0:01:01) ==",
+            "1 failed, 1 passed, 1 warning",
+        ),
+        (HEADER + "===== no tests ran in 0.10s =====", "no tests ran"),
+        (HEADER + "assert 'x in 1s' == 'y'\n", None),
+    ],
+)
+def test_pytest_summary(feedback, summary) -> None:
+    assert pytest_summary(feedback) == summary
+
+
+def test_feedback_stream_hands_on_complete_lines() -> None:
+    lines = []
+    stream = FeedbackStream(lines.append)
+    stream.append(HEADER + "test_summing.py ..")
+    assert lines == ["===== test session starts ====="]
+    stream.update(stream.text + ".\n")
+    stream.append("trailing")
+    stream.close()
+    assert lines == [
+        "===== test session starts =====",
+        "test_summing.py ...",
+        "trailing",
+    ]
+
+
+def test_feedback_stream_replaced_text_is_shown_again() -> None:
+    lines = []
+    stream = FeedbackStream(lines.append)
+    stream.update("Running tests...\n")
+    stream.update(HEADER)
+    assert lines == ["Running tests...", "===== test session starts ====="]
+
+
+def test_feedback_stream_complete() -> None:
+    """A run without failures waits for the platform's congratulation."""
+    stream = FeedbackStream()
+    stream.update(HEADER)
+    assert not stream.complete
+    stream.append("===== 2 passed in 0.01s =====\n")
+    assert not stream.complete
+    assert stream.wait_timeout < 30000
+    stream.append("Congrats, you passed this Bite!")
+    assert stream.complete
+
+    failed = FeedbackStream()
+    failed.update(HEADER + "===== 1 failed in 0.01s =====\n")
+    assert failed.complete
+
+
+def test_feedback_stream_summary_split_across_chunks() -> None:
+    stream = FeedbackStream()
+    stream.append(HEADER + "test_summing.py .F\n" * 1000 + "===== 1 fai")
+    assert stream.summary is None
+    stream.append("led, 1 passed in 0.12s =====")
+    assert stream.summary == "1 failed, 1 passed"
+    stream.append("\n<p>Keep calm and code in Python!</p>\n")
+    assert stream.complete
+    assert stream.text.endswith("=====\n<p>Keep calm and code in Python!</p>\n")
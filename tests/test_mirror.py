@@ -0,0 +1,97 @@
+"""eatlocal page cache tests"""
+
+import gzip
+from pathlib import Path
+from unittest.mock import patch
+
+from eatlocal.eatlocal import Bite, reextract_bites, sync_bites
+from eatlocal.extract import extract_bite_page
+from eatlocal.mirror import PageCache, extract_stored_page
+
+SUMMING_PAGE = Path("./tests/testing_content/summing_content.txt").read_text()
+
+
+def test_put_and_get(tmp_path) -> None:
+    cache = PageCache(tmp_path)
+    digest = cache.put("sum-n-numbers", "Sum n numbers", "intro", SUMMING_PAGE)
+
+    assert cache.get("sum-n-numbers") == SUMMING_PAGE
+    assert cache.ref("sum-n-numbers")["digest"] == digest
+    stored = cache.object_path(digest).read_bytes()
+    assert gzip.decompress(stored) == SUMMING_PAGE.encode("utf-8")
+    assert len(stored) < len(SUMMING_PAGE) / 2
+    assert cache.get("regex-fun") is None
+
+
+def test_put_is_content_addressed(tmp_path) -> None:
+    """A page is stored once, and pruned when no bite refers to it."""
+    cache = PageCache(tmp_path)
+    first = cache.put("sum-n-numbers", "Sum n numbers", "intro", SUMMING_PAGE)
+    cache.put("copy", "Copy", "intro", SUMMING_PAGE)
+    assert len(list(tmp_path.glob("objects/*/*.html.gz"))) == 1
+
+    cache.put("sum-n-numbers", "Sum n numbers", "intro", SUMMING_PAGE + "\n")
+    assert cache.prune(grace=0) == 0
+    cache.put("copy", "Copy", "intro", SUMMING_PAGE + "\n")
+    # storing never removes pages, another process may be reusing them
+    assert cache.object_path(first).is_file()
+    # recently stored pages are kept, their ref may not be written yet
+    assert cache.prune() == 0
+    assert cache.prune(grace=0) == 1
+    assert not cache.object_path(first).is_file()
+    assert [ref["slug"] for ref in cache.refs()] == ["copy", "sum-n-numbers"]
+
+
+def test_extract_stored_page(tmp_path) -> None:
+    cache = PageCache(tmp_path)
+    digest = cache.put("sum-n-numbers", "Sum n numbers", "intro", SUMMING_PAGE)
+    assert extract_stored_page(cache.object_path(digest)) == extract_bite_page(
+        SUMMING_PAGE
+    )
+
+    corrupt = tmp_path / "corrupt.html.gz"
+    corrupt.write_bytes(b"not gzip")
+    assert extract_stored_page(corrupt) is None
+    assert extract_stored_page(tmp_path / "missing.html.gz") is None
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_sync_bites_skips_stored_pages(
+    mock_platform_session, testing_config, page_cache, capsys
+) -> None:
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.fetch_bite.return_value = SUMMING_PAGE
+    http.logged_in = False
+    bites = [Bite("Sum n numbers", "sum-n-numbers", level="intro")]
+
+    sync_bites(bites, testing_config)
+    sync_bites(bites, testing_config)
+
+    assert http.fetch_bite.call_count == 1
+    assert PageCache(page_cache).get("sum-n-numbers") == SUMMING_PAGE
+    output = capsys.readouterr().out
+    assert "Stored 1 of 1 bite pages" in output
+    assert "already stored" in output
+
+
+def test_reextract_bites(tmp_path, page_cache, local_bites_db, capsys) -> None:
+    """Missing bite directories are rebuilt in worker processes."""
+    cache = PageCache(page_cache)
+    cache.put("sum-n-numbers", "Sum n numbers", "intro", SUMMING_PAGE)
+    cache.put("sum-copy", "Sum copy", "intro", SUMMING_PAGE)
+    cache.put("no-code", "No code", "intro", "<html><body></body></html>")
+    config = {"PYBITES_REPO": tmp_path / "repo"}
+    (tmp_path / "repo" / "sum-copy").mkdir(parents=True)
+
+    reextract_bites(config, processes=2)
+
+    assert (tmp_path / "repo" / "sum-n-numbers" / "summing.py").is_file()
+    assert not (tmp_path / "repo" / "sum-copy" / "summing.py").exists()
+    assert not (tmp_path / "repo" / "no-code").exists()
+    output = capsys.readouterr().out
+    assert "Skipped 1 bites that already have a directory" in output
+    assert "Unable to extract No code" in output
+
+    reextract_bites(config, ["sum-copy", "unknown"], force=True)
+    assert (tmp_path / "repo" / "sum-copy" / "summing.py").is_file()
+    assert "The page of unknown has not been stored" in capsys.readouterr().out
@@ -0,0 +1,112 @@
+"""eatlocal bite picker tests"""
+
+import pytest
+from iterfzf import iterfzf
+
+from eatlocal import picker
+from eatlocal.picker import (
+    FZF_INDEX_OPTIONS,
+    TrigramIndex,
+    fzf_executable,
+    index_lines,
+    pick,
+    pick_builtin,
+    selection_index,
+)
+
+TITLES = [
+    "Sum n numbers",
+    "Parse a list of names",
+    "Number\tof tabs",
+    "Write a property",
+    "Sum of digits",
+]
+
+
+def test_index_lines_map_back_to_entries() -> None:
+    lines = list(index_lines(TITLES))
+    assert lines[2] == "2\tNumber of tabs"
+    assert [selection_index(line) for line in lines] == list(range(len(TITLES)))
+
+
+@pytest.mark.skipif(fzf_executable() is None, reason="needs the fzf binary")
+def test_fzf_matches_the_text_and_prints_the_id() -> None:
+    """The id column is hidden from the search but comes back with the pick.
+
+    fzf's filter mode stands in for the interactive picker, it only prints
+    whole lines when sorting.
+    """
+    lines = iterfzf(
+        index_lines(TITLES),
+        sort=True,
+        multi=True,
+        executable=fzf_executable(),
+        __extra__=[*FZF_INDEX_OPTIONS, "--filter", "sum"],
+    )
+    assert sorted(selection_index(line) for line in lines) == [0, 4]
+    # every line starts with an id, yet a digit only matches the text
+    assert iterfzf(
+        index_lines(TITLES),
+        sort=True,
+        multi=True,
+        executable=fzf_executable(),
+        __extra__=[*FZF_INDEX_OPTIONS, "--filter", "3"],
+    ) in (None, [])
+
+
+def test_pick_returns_indices(monkeypatch) -> None:
+    monkeypatch.setattr(picker, "iterfzf", lambda lines, **kwargs: list(lines)[3])
+    assert pick(TITLES) == [3]
+    monkeypatch.setattr(picker, "iterfzf", lambda lines, **kwargs: None)
+    assert pick(TITLES) == []
+    monkeypatch.setattr(
+        picker, "iterfzf", lambda lines, multi, **kwargs: list(lines)[:2]
+    )
+    assert pick(TITLES, multi=True) == [0, 1]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("", [0, 1, 2, 3, 4]),
+        ("sum", [0, 4]),
+        ("SUM DIG", [4]),
+        ("of", [4, 2, 1]),
+        ("names list", [1]),
+        ("wrt prop", [3]),
+        ("zzz", []),
+    ],
+)
+def test_trigram_index_search(query, expected) -> None:
+    assert TrigramIndex(TITLES).search(query) == expected
+
+
+def test_trigram_index_ranks_word_starts_first() -> None:
+    index = TrigramIndex(["Consume numbers", "Sum numbers"])
+    assert index.search("sum") == [1, 0]
+
+
+def test_trigram_index_ignores_ansi_colors() -> None:
+    index = TrigramIndex(["Sum n numbers\033[32m   Intro\033[0m"])
+    assert index.search("32m") == []
+    assert index.search("intro") == [0]
+
+
+def test_pick_builtin(monkeypatch, capsys) -> None:
+    answers = iter(["digits", "7", "1"])
+    monkeypatch.setattr("rich.prompt.Prompt.ask", lambda *args, **kwargs: next(answers))
+
+    assert pick_builtin(TITLES) == [4]
+    output = capsys.readouterr().out
+    assert "fzf is not available" in output
+    assert "No such number" in output
+
+
+def test_pick_falls_back_without_fzf(monkeypatch) -> None:
+    answers = iter(["sum", "2, 1"])
+    monkeypatch.setattr("rich.prompt.Prompt.ask", lambda *args, **kwargs: next(answers))
+    monkeypatch.setattr(picker, "fzf_executable", lambda: None)
+
+    assert pick(TITLES, multi=True) == [4, 0]
+    answers = iter([""])
+    assert pick(TITLES) == []
@@ -0,0 +1,101 @@
+"""eatlocal cached bite rendering tests"""
+
+import io
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from rich.console import Console
+
+from eatlocal.render import (
+    BitePager,
+    RenderCache,
+    bite_files,
+    dump_text,
+    highlight_code,
+    load_text,
+    scroll,
+)
+
+TESTING_BITE = Path("./tests/testing_repo/parse-a-list-of-names")
+
+
+def touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_bite_files() -> None:
+    assert bite_files(TESTING_BITE) == (
+        TESTING_BITE / "bite.html",
+        TESTING_BITE / "names.py",
+    )
+
+
+def test_highlighted_text_round_trips() -> None:
+    text = highlight_code((TESTING_BITE / "names.py").read_text(), "material")
+    loaded = load_text(dump_text(text))
+
+    def rendered(text) -> str:
+        console = Console(file=io.StringIO(), force_terminal=True)
+        console.print(text)
+        return console.file.getvalue()
+
+    assert rendered(loaded) == rendered(text)
+
+
+def test_cache_reuses_rendering_until_the_file_changes(tmp_path) -> None:
+    code_file = tmp_path / "names.py"
+    code_file.write_text("NAMES = ['arnold schwarzenegger']\n")
+    cache = RenderCache(tmp_path / "display")
+
+    first = cache.code(code_file, "material")
+    with patch("eatlocal.render.highlight_code", return_value=first) as highlight:
+        assert cache.code(code_file, "material").plain == first.plain
+        highlight.assert_not_called()
+
+        cache.code(code_file, "monokai")
+        code_file.write_text("NAMES = []\n")
+        touch_later(code_file)
+        cache.code(code_file, "material")
+    assert highlight.call_count == 2
+    # one entry per file and theme, stale entries are overwritten
+    assert len(list((tmp_path / "display").iterdir())) == 2
+
+
+def test_cached_instructions_skip_the_html_parser(tmp_path) -> None:
+    html_file = tmp_path / "bite.html"
+    html_file.write_text("<p>Parse a <b>list</b> of names.</p>")
+    cache = RenderCache(tmp_path / "display")
+    cache.save(html_file, "text", "Parse a list of names.")
+    with patch("eatlocal.render.instructions_text") as parse:
+        assert cache.instructions(html_file) == "Parse a list of names."
+    parse.assert_not_called()
+
+
+def test_scroll() -> None:
+    assert scroll("down", 0, 10, 25) == 1
+    assert scroll("up", 0, 10, 25) == 0
+    assert scroll("page down", 10, 10, 25) == 15
+    assert scroll("bottom", 0, 10, 25) == 15
+    assert scroll("top", 12, 10, 25) == 0
+    assert scroll("page down", 0, 10, 5) == 0
+
+
+def test_pager_renders_only_visible_lines() -> None:
+    code = highlight_code("\n".join(f"line_{n} = {n}" for n in range(100)), "material")
+    pager = BitePager("Parse a list of names", "Parse a list of names.", code)
+    pager.run(
+        Console(width=80, height=16, file=io.StringIO()),
+        iter(["page down", "down"]),
+    )
+    assert pager.offset == 11
+
+    console = Console(width=80, height=16, record=True, color_system=None)
+    console.print(pager.render(console))
+    output = console.export_text()
+    assert "line_11 = 11" in output
+    assert "line_20 = 20" in output
+    assert "line_10 = 10" not in output
+    assert "line_21 = 21" not in output
+    assert "lines 12-21 of 100" in output
@@ -0,0 +1,169 @@
+"""eatlocal retry and circuit breaker tests"""
+
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from eatlocal.constants import RETRY_ATTEMPTS
+from eatlocal.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    goto,
+    http_request,
+    retry,
+    retry_after,
+)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(status_code: int, headers=None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def test_backoff_is_jittered_and_bounded() -> None:
+    policy = RetryPolicy(attempts=10, base_delay=0.5, max_delay=8)
+    for attempt, bound in ((1, 0.5), (2, 1), (3, 2), (8, 8)):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_breaker_opens_and_lets_a_trial_through() -> None:
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=2, cooldown=30, clock=clock)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    clock.now = 30
+    breaker.check()
+    # only one call tries the platform while the trial runs
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 60
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.check()
+
+
+def test_retry_until_success(retry_sleep) -> None:
+    call = MagicMock(side_effect=[requests.ConnectionError(), _response(503), "ok"])
+    assert (
+        retry(
+            call,
+            "test",
+            lambda error: isinstance(error, requests.ConnectionError),
+            lambda result: result != "ok",
+        )
+        == "ok"
+    )
+    assert call.call_count == 3
+    assert retry_sleep.call_count == 2
+
+
+def test_retry_gives_up_and_opens_the_breaker(retry_sleep) -> None:
+    breaker = CircuitBreaker(threshold=1)
+    call = MagicMock(side_effect=requests.Timeout())
+    with pytest.raises(requests.Timeout):
+        retry(call, "test", lambda error: True, breaker=breaker)
+    assert call.call_count == RETRY_ATTEMPTS
+    with pytest.raises(CircuitOpenError):
+        retry(call, "test", lambda error: True, breaker=breaker)
+    assert call.call_count == RETRY_ATTEMPTS
+
+
+def test_http_request_honors_retry_after(retry_sleep) -> None:
+    send = MagicMock(side_effect=[_response(429, {"Retry-After": "3"}), _response(200)])
+    assert http_request(send, "test").status_code == 200
+    retry_sleep.assert_called_once_with(3)
+
+
+def test_http_request_waits_as_long_as_asked(retry_sleep) -> None:
+    send = MagicMock(
+        side_effect=[_response(503, {"Retry-After": "30"}), _response(200)]
+    )
+    assert http_request(send, "test").status_code == 200
+    retry_sleep.assert_called_once_with(30)
+
+    # waiting longer than the limit is not worth it
+    send = MagicMock(return_value=_response(503, {"Retry-After": "3600"}))
+    assert http_request(send, "test").status_code == 503
+    send.assert_called_once()
+
+
+def test_retry_after_date() -> None:
+    later = datetime.now(UTC) + timedelta(seconds=20)
+    seconds = retry_after(
+        _response(503, {"Retry-After": format_datetime(later, usegmt=True)})
+    )
+    assert 18 < seconds <= 20
+    assert retry_after(_response(503, {"Retry-After": "soon"})) == 0
+    assert retry_after(_response(503)) == 0
+
+
+def test_http_request_returns_the_last_error_status() -> None:
+    send = MagicMock(return_value=_response(502))
+    assert http_request(send, "test").status_code == 502
+    assert send.call_count == RETRY_ATTEMPTS
+
+
+def test_submission_is_only_retried_when_not_sent() -> None:
+    send = MagicMock(side_effect=requests.ReadTimeout())
+    with pytest.raises(requests.ReadTimeout):
+        http_request(send, "test", idempotent=False)
+    assert send.call_count == 1
+
+    refused = requests.ConnectionError(
+        MaxRetryError(None, "/", NewConnectionError(None, "refused"))
+    )
+    send = MagicMock(side_effect=[refused, _response(200)])
+    assert http_request(send, "test", idempotent=False).status_code == 200
+
+    send = MagicMock(return_value=_response(502))
+    assert http_request(send, "test", idempotent=False).status_code == 502
+    assert send.call_count == 1
+
+
+def test_goto_retries_navigation_failures() -> None:
+    page = MagicMock()
+    page.goto.side_effect = [
+        PlaywrightTimeoutError("Timeout 20000ms exceeded."),
+        PlaywrightError("net::ERR_CONNECTION_RESET at https://pybitesplatform.com"),
+        MagicMock(status=200),
+    ]
+    assert goto(page, "https://pybitesplatform.com").status == 200
+    assert page.goto.call_count == 3
+
+    page.goto.side_effect = PlaywrightError("Target page has been closed")
+    with pytest.raises(PlaywrightError):
+        goto(page, "https://pybitesplatform.com")
+    assert page.goto.call_count == 4
+
+    page.goto.side_effect = None
+    page.goto.return_value = MagicMock(status=503)
+    with pytest.raises(PlaywrightError, match="HTTP 503"):
+        goto(page, "https://pybitesplatform.com")
@@ -0,0 +1,87 @@
+"""eatlocal local test runner tests"""
+
+from pathlib import Path
+
+import pytest
+
+from eatlocal.eatlocal import Bite, run_local_tests
+from eatlocal.runner import run_bite_tests
+
+CODE = "def add(a, b):\n    return a + b\n"
+PASSING_TESTS = """from adding import add
+
+
+def test_add():
+    assert add(1, 2) == 3
+
+
+def test_add_negative():
+    assert add(-1, 1) == 0
+"""
+FAILING_TESTS = PASSING_TESTS.replace("== 0", "== 1")
+
+
+def write_bite(repo: Path, slug: str, tests: str) -> Path:
+    bite_dir = repo / slug
+    bite_dir.mkdir(parents=True)
+    (bite_dir / "adding.py").write_text(CODE)
+    (bite_dir / "test_adding.py").write_text(tests)
+    return bite_dir
+
+
+def test_run_bite_tests_passing(tmp_path) -> None:
+    """The tests run in a copy, nothing is left in the bite directory."""
+    bite_dir = write_bite(tmp_path, "adding", PASSING_TESTS)
+
+    result = run_bite_tests("adding", bite_dir, timeout=60)
+
+    assert result.outcome == "passed"
+    assert result.passed == 2
+    assert result.failures == []
+    assert sorted(path.name for path in bite_dir.iterdir()) == [
+        "adding.py",
+        "test_adding.py",
+    ]
+
+
+def test_run_bite_tests_failing(tmp_path) -> None:
+    bite_dir = write_bite(tmp_path, "adding", FAILING_TESTS)
+
+    result = run_bite_tests("adding", bite_dir, timeout=60)
+
+    assert result.outcome == "failed"
+    assert result.passed == 1
+    assert result.failures == ["test_add_negative"]
+    assert "assert 0 == 1" in result.output
+
+
+@pytest.mark.parametrize(
+    "tests, outcome",
+    [
+        ("import time\n\ndef test_hangs():\n    time.sleep(60)\n", "timeout"),
+        ("def helper():\n    pass\n", "no tests"),
+        ("from adding import subtract\n", "error"),
+    ],
+)
+def test_run_bite_tests_outcomes(tests, outcome, tmp_path) -> None:
+    bite_dir = write_bite(tmp_path, "adding", tests)
+    assert run_bite_tests("adding", bite_dir, timeout=5).outcome == outcome
+
+
+def test_run_local_tests(tmp_path, capsys) -> None:
+    write_bite(tmp_path, "adding", PASSING_TESTS)
+    write_bite(tmp_path, "adding-wrong", FAILING_TESTS)
+    bites = [
+        Bite("Adding", "adding"),
+        Bite("Adding wrong", "adding-wrong"),
+        Bite("Not downloaded", "not-downloaded"),
+    ]
+
+    results = run_local_tests(bites, {"PYBITES_REPO": tmp_path}, jobs=2)
+
+    assert results["adding"].outcome == "passed"
+    assert results["adding-wrong"].outcome == "failed"
+    output = capsys.readouterr().out
+    assert "Unable to find bite Not downloaded locally" in output
+    assert "test_add_negative" in output
+    assert "1 of 3 bites passed their tests." in output
@@ -0,0 +1,97 @@
+"""eatlocal full-text search tests"""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from eatlocal.eatlocal import search_bites
+from eatlocal.search import SearchIndex, query_terms
+
+
+def write_bite(repo: Path, slug: str, html: str, code: str, tests: str) -> Path:
+    bite_dir = repo / slug
+    bite_dir.mkdir(parents=True, exist_ok=True)
+    (bite_dir / "bite.html").write_text(html)
+    name = slug.replace("-", "_")
+    (bite_dir / f"{name}.py").write_text(code)
+    (bite_dir / f"test_{name}.py").write_text(tests)
+    return bite_dir
+
+
+@pytest.fixture
+def repo(tmp_path) -> Path:
+    repo = tmp_path / "bites"
+    write_bite(
+        repo,
+        "sum-n-numbers",
+        "<p>Write a function that <b>sums</b> the first n numbers.</p>",
+        "def sum_numbers(numbers=None):\n    pass\n",
+        "from sum_n_numbers import sum_numbers\n\ndef test_sum():\n    ...\n",
+    )
+    write_bite(
+        repo,
+        "word-values",
+        "<p>Calculate the scrabble value of each word in a dictionary.</p>",
+        "def load_words():\n    pass\n",
+        "from word_values import load_words\n\ndef test_load_words():\n    ...\n",
+    )
+    return repo
+
+
+def test_query_terms() -> None:
+    assert query_terms("Sum  first_n") == ["sum", "first", "n"]
+    assert query_terms("scrab* word-val*") == ["scrab*", "word", "val*"]
+    assert query_terms("* ?") == []
+
+
+def test_search_matches_every_term_across_files(tmp_path, repo) -> None:
+    with SearchIndex(tmp_path / "search.sqlite") as index:
+        assert index.update(repo) == (6, 0)
+        results = index.search("sums")
+        assert [result.slug for result in results] == ["sum-n-numbers"]
+        assert results[0].kind == "instructions"
+        assert "sums the first n numbers" in results[0].snippet
+        # "scrabble" is only in the instructions, "load" only in the code
+        assert [result.slug for result in index.search("scrabble load")] == [
+            "word-values"
+        ]
+        assert [result.slug for result in index.search("scrab*")] == ["word-values"]
+        assert index.search("scrabble sums") == []
+        assert index.search("nothing") == []
+
+
+def test_update_only_reads_changed_files(tmp_path, repo) -> None:
+    with SearchIndex(tmp_path / "search.sqlite") as index:
+        index.update(repo)
+        assert index.update(repo) == (0, 0)
+
+        code = repo / "word-values" / "word_values.py"
+        code.write_text("def load_words():\n    return anagrams\n")
+        stat = code.stat()
+        os.utime(code, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        (repo / "sum-n-numbers" / "test_sum_n_numbers.py").unlink()
+        with patch("eatlocal.search.document_text") as read:
+            read.return_value = code.read_text()
+            assert index.update(repo) == (1, 1)
+        read.assert_called_once()
+
+        assert [result.slug for result in index.search("anagrams")] == ["word-values"]
+        assert index.search("test_sum") == []
+        (postings,) = index.connection.execute(
+            "SELECT count(*) FROM postings WHERE document NOT IN "
+            "(SELECT id FROM documents)"
+        ).fetchone()
+        assert postings == 0
+
+
+def test_search_bites(tmp_path, repo, capsys) -> None:
+    config = {"PYBITES_REPO": repo}
+    with patch("eatlocal.eatlocal.SEARCH_INDEX", tmp_path / "search.sqlite"):
+        search_bites(config, "scrabble")
+        search_bites(config, "nonexistent", rebuild=True)
+    output = capsys.readouterr().out
+    assert "word-values" in output
+    assert "sum-n-numbers" not in output
+    assert "No local bite matches 'nonexistent'" in output
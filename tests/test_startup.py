@@ -0,0 +1,106 @@
+"""eatlocal CLI startup tests"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Time eatlocal may add to a command on top of an empty typer app.
+STARTUP_BUDGET = 0.1
+
+HEAVY_MODULES = [
+    "asyncio",
+    "bs4",
+    "install_playwright",
+    "playwright",
+    "requests",
+]
+
+EATLOCAL_CLI = """
+import json, sys
+from eatlocal.__main__ import cli
+
+try:
+    cli(sys.argv[1:])
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+EMPTY_CLI = """
+import sys, typer
+
+cli = typer.Typer(add_completion=False)
+
+@cli.command()
+def submit() -> None:
+    \"\"\"Submit.\"\"\"
+
+@cli.command()
+def display() -> None:
+    \"\"\"Display.\"\"\"
+
+try:
+    cli(sys.argv[1:])
+except SystemExit:
+    pass
+"""
+
+
+def run_python(code: str, *args: str, home, cwd=None) -> tuple[float, str]:
+    """Run code in a fresh interpreter, return its fastest time and output."""
+    elapsed = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code, *args],
+            capture_output=True,
+            check=True,
+            cwd=cwd,
+            env={**os.environ, "HOME": str(home)},
+            text=True,
+        )
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed), result.stdout
+
+
+def make_home(home: Path) -> Path:
+    """Set up eatlocal in a home directory, return the directory of a bite."""
+    repo = home / "bites"
+    shutil.copytree("./tests/testing_repo", repo)
+    eatlocal_home = home / ".eatlocal"
+    eatlocal_home.mkdir()
+    (eatlocal_home / ".env").write_text(
+        f"PYBITES_USERNAME=user\nPYBITES_PASSWORD=secret\nPYBITES_REPO={repo}\n"
+    )
+    # imported into the local bites database on first use
+    shutil.move(repo / ".local_bites.json", eatlocal_home / ".local_bites.json")
+    return repo / "parse-a-list-of-names"
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--version"],
+        ["display"],
+        ["submit", "--help"],
+    ],
+)
+def test_startup_is_fast(args, tmp_path) -> None:
+    """Commands start without loading the browser and HTTP stacks."""
+    bite_dir = make_home(tmp_path)
+    baseline, _ = run_python(EMPTY_CLI, "submit", "--help", home=tmp_path)
+    elapsed, output = run_python(EATLOCAL_CLI, *args, home=tmp_path, cwd=bite_dir)
+
+    if args == ["display"]:
+        # the bite of the current directory is shown
+        assert "Displaying Parse a list of names" in output
+        assert "Directions" in output
+    modules = set(json.loads(output.splitlines()[-1]))
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+    assert elapsed < baseline + STARTUP_BUDGET
@@ -0,0 +1,95 @@
+"""eatlocal local bites database tests"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from eatlocal.store import LocalBites
+
+
+def test_track_keeps_columns_not_given(tmp_path) -> None:
+    with LocalBites(tmp_path / "bites.sqlite") as db:
+        db.track("sum-n-numbers", "Sum n numbers", level="Beginner")
+        db.track("sum-n-numbers", "Sum n numbers", code_file="summing.py")
+        db.update("sum-n-numbers", passed=True)
+
+        row = db.get("sum-n-numbers")
+        assert row["level"] == "Beginner"
+        assert row["code_file"] == "summing.py"
+        assert row["passed"] == 1
+        assert db.choices() == [("sum-n-numbers", "Sum n numbers")]
+        assert db.get("regex-fun") is None
+
+
+def test_unknown_column(tmp_path) -> None:
+    with LocalBites(tmp_path / "bites.sqlite") as db, pytest.raises(ValueError):
+        db.track("sum-n-numbers", "Sum n numbers", colour="green")
+
+
+def test_wal_mode_and_indexes(tmp_path) -> None:
+    with LocalBites(tmp_path / "bites.sqlite") as db:
+        mode = db.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        plan = db.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT slug FROM bites WHERE title = ?", ("x",)
+        ).fetchall()
+    assert mode == "wal"
+    assert "bites_title" in str([tuple(step) for step in plan])
+
+
+def test_import_json(tmp_path) -> None:
+    bites_file = tmp_path / ".local_bites.json"
+    bites_file.write_text(
+        json.dumps(
+            {
+                "Parse a list of names": "parse-a-list-of-names",
+                "Rotate string characters": "rotate-string-characters",
+            }
+        )
+    )
+    with LocalBites(tmp_path / "bites.sqlite") as db:
+        db.import_json(bites_file)
+        assert db.choices() == [
+            ("parse-a-list-of-names", "Parse a list of names"),
+            ("rotate-string-characters", "Rotate string characters"),
+        ]
+    assert not bites_file.exists()
+
+
+def test_import_json_removed_by_another_process(tmp_path) -> None:
+    with LocalBites(tmp_path / "bites.sqlite") as db:
+        db.import_json(tmp_path / ".local_bites.json")
+        assert db.all() == []
+
+
+WRITER = """
+import sys
+from pathlib import Path
+from eatlocal.store import LocalBites
+
+path, worker = Path(sys.argv[1]), int(sys.argv[2])
+for number in range(50):
+    with LocalBites(path) as db:
+        db.track(f"bite-{worker}-{number}", f"Bite {worker} {number}", level="intro")
+        if worker % 2:
+            db.update("shared", passed=True)
+        else:
+            db.update("shared", code_file="shared.py")
+"""
+
+
+def test_parallel_processes_keep_every_row(tmp_path) -> None:
+    path = tmp_path / "bites.sqlite"
+    with LocalBites(path) as db:
+        db.track("shared", "Shared")
+    writers = [
+        subprocess.Popen([sys.executable, "-c", WRITER, str(path), str(worker)])
+        for worker in range(6)
+    ]
+    assert [writer.wait(timeout=60) for writer in writers] == [0] * 6
+    with LocalBites(path) as db:
+        assert len(db.all()) == 6 * 50 + 1
+        shared = db.get("shared")
+    assert shared["passed"] == 1
+    assert shared["code_file"] == "shared.py"
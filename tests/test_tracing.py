@@ -0,0 +1,102 @@
+"""eatlocal tracing tests"""
+
+import json
+
+import pytest
+
+from eatlocal.constants import TRACE_FILE
+from eatlocal.eatlocal import print_trace_report
+from eatlocal.tracing import (
+    read_spans,
+    span,
+    start_tracing,
+    stop_tracing,
+    summarize_spans,
+    trace_settings,
+)
+
+
+@pytest.mark.parametrize(
+    "environ, settings",
+    [
+        ({}, (None, False)),
+        ({"EATLOCAL_TRACE": "0"}, (None, False)),
+        ({"EATLOCAL_TRACE": "1"}, (TRACE_FILE, False)),
+        ({"EATLOCAL_TRACE_MEMORY": "yes"}, (TRACE_FILE, True)),
+        ({"EATLOCAL_TRACE": "/tmp/eatlocal.jsonl"}, ("/tmp/eatlocal.jsonl", False)),
+    ],
+)
+def test_trace_settings(environ, settings) -> None:
+    path, memory = trace_settings(environ)
+    assert (None if path is None else str(path), memory) == (
+        None if settings[0] is None else str(settings[0]),
+        settings[1],
+    )
+
+
+def test_spans_are_not_recorded_without_tracing(tmp_path) -> None:
+    with span("login"):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spans_are_written_as_json_lines(tmp_path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    tracer = start_tracing(trace_file, "download", memory=True)
+    try:
+        with span("browser.launch"), span("page.goto", bite="sum-n-numbers"):
+            pass
+        with pytest.raises(TimeoutError), span("validate.wait"):
+            raise TimeoutError
+    finally:
+        stop_tracing()
+
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert [entry["span"] for entry in spans] == [
+        "page.goto",
+        "browser.launch",
+        "validate.wait",
+        "command",
+    ]
+    assert {entry["run"] for entry in spans} == {tracer.run}
+    assert spans[0]["parent"] == "browser.launch"
+    assert spans[0]["bite"] == "sum-n-numbers"
+    assert spans[1]["parent"] is None
+    assert spans[2]["error"] == "TimeoutError"
+    assert all(entry["memory_peak"] > 0 for entry in spans)
+    with span("login"):
+        pass
+    assert len(read_spans(trace_file)) == 4
+
+
+def test_summarize_spans() -> None:
+    spans = [
+        {"command": "download", "span": "login", "duration": duration / 100}
+        for duration in range(1, 101)
+    ]
+    spans.append({"command": "submit", "span": "login", "duration": 2.0})
+
+    download, submit = summarize_spans(spans)
+
+    assert download["count"] == 100
+    assert (download["p50"], download["p90"], download["p99"]) == (0.5, 0.9, 0.99)
+    assert download["max"] == 1.0
+    assert download["memory_peak"] is None
+    assert submit["p50"] == submit["p99"] == 2.0
+
+
+def test_print_trace_report(tmp_path, capsys) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    print_trace_report(trace_file)
+    assert "No traced runs" in capsys.readouterr().out
+
+    trace_file.write_text(
+        '{"run": "a", "command": "download", "span": "login", "duration": 0.25}\n'
+        "not json\n"
+        '{"run": "b", "command": "download", "span": "login", "duration": 0.75}\n'
+    )
+    print_trace_report(trace_file)
+    output = capsys.readouterr().out
+    assert "over 2 runs" in output
+    assert "250ms" in output
+    assert "750ms" in output
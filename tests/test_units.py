@@ -1,24 +1,40 @@
 """eatlocal unit tests"""
 
+import asyncio
+import os
 import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 import json
+import time
 
 import pytest
 
 from eatlocal.eatlocal import (
     Bite,
     choose_bite,
+    choose_bites,
     choose_local_bite,
+    choose_local_bites,
     create_bite_dir,
     display_bite,
+    download_bites,
+    download_bites_over_http,
+    download_pages,
     get_credentials,
     load_config,
+    load_session_state,
+    local_code_changed,
+    save_session_state,
+    submit_bites,
+    track_downloaded_code,
+    track_submitted_code,
+    validate_bite,
+    validate_bites_over_http,
     set_local_dir,
-    _unformat_bite_key,
     _format_bite_key,
 )
+from eatlocal.web import LoginError, PlatformError, SubmissionError
 
 NOT_DOWNLOADED = (
     Bite(
@@ -64,32 +80,154 @@ def test_bite_fetch_local_code_no_file(capsys, testing_config) -> None:
     assert "Unable to find bite" in output.out
 
 
-@patch("eatlocal.eatlocal.iterfzf")
-def test_choose_local_bite(mock_iterfzf, testing_config) -> None:
+def fzf_picking(text: str):
+    """Stand in for iterfzf, the user picks the entry showing text."""
+
+    def iterfzf(lines, **kwargs):
+        return next(line for line in lines if line.partition("\t")[2] == text)
+
+    return iterfzf
+
+
+@patch("eatlocal.picker.iterfzf")
+def test_choose_local_bite(mock_iterfzf, testing_config, local_bites_db) -> None:
     """Test choosing a local bite."""
-    mock_iterfzf.return_value = LOCAL_TEST_BITE.title
-    with patch(
-        "eatlocal.eatlocal.LOCAL_BITES_DB",
-        Path.cwd() / "tests/testing_repo/.local_bites.json",
-    ):
-        bite = choose_local_bite(testing_config)
+    mock_iterfzf.side_effect = fzf_picking(LOCAL_TEST_BITE.title)
+    bite = choose_local_bite(testing_config)
     assert bite.title == LOCAL_TEST_BITE.title
     assert bite.slug == LOCAL_TEST_BITE.slug
 
 
 @pytest.fixture
-def test_choose_local_bite_from_dir(monkeypatch, testing_config) -> None:
+def test_choose_local_bite_from_dir(
+    monkeypatch, testing_config, local_bites_db
+) -> None:
     """Test choosing a local bite."""
-    with patch(
-        "eatlocal.eatlocal.LOCAL_BITES_DB",
-        Path.cwd() / "tests/testing_repo/.local_bites.json",
-    ):
-        monkeypatch.chdir("tests/testing_repo/parse-a-list-of-names/")
-        bite = choose_local_bite(testing_config)
+    monkeypatch.chdir("tests/testing_repo/parse-a-list-of-names/")
+    bite = choose_local_bite(testing_config)
     assert bite.title == LOCAL_TEST_BITE.title
     assert bite.slug == LOCAL_TEST_BITE.slug
 
 
+def test_choose_local_bites(testing_config, local_bites_db, capsys) -> None:
+    """Choose local bites by slug, skipping bites that are not downloaded."""
+    bites = choose_local_bites(testing_config, [LOCAL_TEST_BITE.slug, "made-up-bite"])
+    all_bites = choose_local_bites(testing_config)
+    assert bites == [LOCAL_TEST_BITE]
+    assert "made-up-bite has not been downloaded" in capsys.readouterr().out
+    assert len(all_bites) == 2
+
+
+def test_local_code_changed_without_hashes(tmp_path, local_bites_db) -> None:
+    """Without hashes, a bite changed when its code is newer than its directions."""
+    config = {"PYBITES_REPO": tmp_path}
+    bite_dir = tmp_path / LOCAL_TEST_BITE.slug
+    bite_dir.mkdir()
+    (bite_dir / "bite.html").write_text("<p>directions</p>")
+    (bite_dir / "names.py").write_text("pass")
+    (bite_dir / "test_names.py").write_text("pass")
+    os.utime(bite_dir / "names.py", (0, 0))
+    assert not local_code_changed(LOCAL_TEST_BITE, config)
+    os.utime(bite_dir / "names.py", (time.time() + 10, time.time() + 10))
+    assert local_code_changed(LOCAL_TEST_BITE, config)
+    assert not local_code_changed(NOT_DOWNLOADED[0], config)
+
+
+def test_local_code_changed_since_download_and_submission(
+    tmp_path, local_bites_db
+) -> None:
+    """Compare the code with the hash of its last download or submission."""
+    config = {"PYBITES_REPO": tmp_path}
+    bite = Bite(LOCAL_TEST_BITE.title, LOCAL_TEST_BITE.slug)
+    bite_dir = tmp_path / bite.slug
+    bite_dir.mkdir()
+    (bite_dir / "bite.html").write_text("<p>directions</p>")
+    (bite_dir / "names.py").write_text("starter code")
+    track_downloaded_code(bite, config)
+    assert not local_code_changed(bite, config)
+
+    (bite_dir / "names.py").write_text("solution")
+    assert local_code_changed(bite, config)
+
+    bite.fetch_local_code(config)
+    track_submitted_code(bite, "Congrats, you passed this Bite!")
+    assert not local_code_changed(bite, config)
+
+    track_downloaded_code(bite, config)
+    assert not local_code_changed(bite, config)
+
+
+@patch("eatlocal.eatlocal.validate_bites_in_browser_pool", new_callable=AsyncMock)
+@patch("eatlocal.eatlocal.validate_bites_over_http")
+@patch("eatlocal.eatlocal.track_submitted_code")
+def test_submit_bites_summary(
+    mock_track_submitted_code,
+    mock_validate_over_http,
+    mock_validate_in_browser,
+    testing_config,
+    capsys,
+) -> None:
+    """Submit several bites and report them in one table."""
+    rotate = Bite("Rotate string characters", "rotate-string-characters")
+    mock_validate_over_http.side_effect = lambda bites, *args: (
+        {LOCAL_TEST_BITE.slug: "Congrats, you passed this Bite!"},
+        [],
+    )
+
+    results = submit_bites([LOCAL_TEST_BITE, rotate], testing_config)
+
+    assert list(results) == [LOCAL_TEST_BITE.slug]
+    ready = mock_validate_over_http.call_args.args[0]
+    assert ready == [LOCAL_TEST_BITE]
+    mock_validate_in_browser.assert_not_awaited()
+    mock_track_submitted_code.assert_called_once_with(
+        LOCAL_TEST_BITE, "Congrats, you passed this Bite!"
+    )
+    output = capsys.readouterr().out
+    assert "Submission results" in output
+    assert "Passed" in output
+    assert "Not validated" in output
+    assert "1 of 2 bites passed." in output
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bites_over_http(mock_platform_session, testing_config) -> None:
+    """Bites that fail to validate over HTTP are returned for the browser."""
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.logged_in = False
+    names = Bite(LOCAL_TEST_BITE.title, LOCAL_TEST_BITE.slug)
+    rotate = Bite("Rotate string characters", "rotate-string-characters")
+    names.local_code = rotate.local_code = "pass"
+
+    def validate(url, code):
+        if url != names.url:
+            raise PlatformError("no validation form")
+        return "Congrats, you passed this Bite!"
+
+    http.validate.side_effect = validate
+
+    results, remaining = validate_bites_over_http(
+        [names, rotate], testing_config, workers=2
+    )
+
+    assert results == {names.slug: "Congrats, you passed this Bite!"}
+    assert remaining == [rotate]
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bites_over_http_keeps_sent_bites(
+    mock_platform_session, testing_config
+) -> None:
+    """Bites sent without feedback are not handed to the browser."""
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.logged_in = False
+    http.validate.side_effect = SubmissionError("No feedback")
+    bite = Bite(LOCAL_TEST_BITE.title, LOCAL_TEST_BITE.slug)
+    bite.local_code = "pass"
+
+    assert validate_bites_over_http([bite], testing_config) == ({}, [])
+
+
 @patch("eatlocal.eatlocal.Prompt.ask")
 @patch("eatlocal.eatlocal.Path.exists")
 def test_set_local_dir(mock_exists, mock_prompt):
@@ -99,12 +237,14 @@ def test_set_local_dir(mock_exists, mock_prompt):
     assert local_dir == Path("/some/path")
 
 
-@patch("eatlocal.eatlocal.requests.get")
-@patch("eatlocal.eatlocal.iterfzf")
-def test_choose_bite(mock_iterfzf, mock_requests):
+@patch("eatlocal.catalog.requests.get")
+@patch("eatlocal.picker.iterfzf")
+def test_choose_bite(mock_iterfzf, mock_requests, bites_catalog):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    api_data = json.load(open("./tests/testing_content/bites_api.json"))
+    mock_response.headers = {}
+    with open("./tests/testing_content/bites_api.json") as f:
+        api_data = json.load(f)
     mock_response.json.return_value = api_data
     mock_requests.return_value = mock_response
 
@@ -121,14 +261,191 @@ def test_choose_bite(mock_iterfzf, mock_requests):
         padding,
     )
 
-    # Mock iterfzf to return the formatted title
-    mock_iterfzf.return_value = formatted_title
+    # The user picks the line showing the formatted title
+    mock_iterfzf.side_effect = fzf_picking(formatted_title)
 
     bite = choose_bite()
     assert isinstance(bite, Bite)
-    # We need to unformat the title to match it with the original
-    assert _unformat_bite_key(bite.title) == SUMMING_TEST_BITE.title
+    assert bite.title == SUMMING_TEST_BITE.title
     assert bite.slug == SUMMING_TEST_BITE.slug
+    assert mock_iterfzf.call_args.kwargs["ansi"] is True
+
+
+@patch("eatlocal.catalog.requests.get")
+@patch("eatlocal.picker.iterfzf")
+def test_choose_bite_duplicate_titles(mock_iterfzf, mock_requests, bites_catalog):
+    """Bites sharing a title are told apart by their position, not their title."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.json.return_value = [
+        {"title": "Same   title  ", "slug": "first", "level": "intro"},
+        {"title": "Same   title  ", "slug": "second", "level": "intro"},
+    ]
+    mock_requests.return_value = mock_response
+    mock_iterfzf.side_effect = lambda lines, **kwargs: list(lines)[1]
+
+    bite = choose_bite(level="intro")
+
+    assert (bite.title, bite.slug) == ("Same   title  ", "second")
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_choose_bites_by_slug(mock_requests, capsys, bites_catalog):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    with open("./tests/testing_content/bites_api.json") as f:
+        mock_response.json.return_value = json.load(f)
+    mock_requests.return_value = mock_response
+
+    bites = choose_bites(["word-values", "not-a-bite", "sum-n-numbers"])
+    assert [bite.slug for bite in bites] == ["word-values", "sum-n-numbers"]
+    assert bites[1].title == SUMMING_TEST_BITE.title
+    assert "Unknown bite: not-a-bite" in capsys.readouterr().out
+
+
+@patch("eatlocal.catalog.requests.get")
+def test_choose_bites_all_of_level(mock_requests, bites_catalog):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    with open("./tests/testing_content/bites_api.json") as f:
+        mock_response.json.return_value = json.load(f)
+    mock_requests.return_value = mock_response
+
+    bites = choose_bites(level="advanced", all_bites=True)
+    assert bites == [Bite("Regex fun", "regex-fun", level="Advanced")]
+
+
+@patch("eatlocal.eatlocal.download_bites_in_browser", new_callable=AsyncMock)
+@patch("eatlocal.eatlocal.download_bites_over_http")
+def test_download_bites_browser_fallback(
+    mock_download_over_http, mock_download_in_browser, testing_config
+):
+    """Only bites that failed over HTTP are loaded in the browser."""
+    bites = [Bite("Sum n numbers", "sum-n-numbers"), Bite("Regex fun", "regex-fun")]
+    mock_download_over_http.return_value = bites[1:]
+
+    download_bites(bites, testing_config, pages=2)
+
+    args = mock_download_in_browser.await_args.args
+    assert args[:4] == (bites[1:], testing_config, False, 2)
+
+
+@patch("eatlocal.eatlocal.track_downloaded_code")
+@patch("eatlocal.eatlocal.track_local_bites")
+def test_download_pages_bounded_pool(
+    mock_track_local_bites, mock_track_downloaded_code, testing_config, summing_record
+):
+    """Download several bites with a limited number of concurrent pages."""
+    open_pages = 0
+    max_open_pages = 0
+
+    async def new_page():
+        nonlocal open_pages, max_open_pages
+        open_pages += 1
+        max_open_pages = max(max_open_pages, open_pages)
+        page = AsyncMock()
+        page.evaluate.return_value = summing_record
+        page.locator = MagicMock()
+        page.locator.return_value.count = AsyncMock(return_value=1)
+
+        async def close():
+            nonlocal open_pages
+            open_pages -= 1
+
+        page.close.side_effect = close
+        return page
+
+    context = MagicMock()
+    context.new_page = new_page
+    bites = [Bite(f"Sum {i}", f"sum-{i}") for i in range(5)]
+
+    asyncio.run(download_pages(context, bites, testing_config, pages=2))
+
+    assert max_open_pages == 2
+    assert mock_track_local_bites.call_count == len(bites)
+    assert all(bite.platform_content is None for bite in bites)
+    for bite in bites:
+        bite_dir = Path(testing_config["PYBITES_REPO"]) / bite.slug
+        assert (bite_dir / "summing.py").exists()
+
+
+@patch("eatlocal.eatlocal.save_session_state")
+@patch("eatlocal.eatlocal.track_downloaded_code")
+@patch("eatlocal.eatlocal.track_local_bites")
+@patch("eatlocal.web.PlatformSession")
+def test_download_bites_over_http(
+    mock_platform_session,
+    mock_track_local_bites,
+    mock_track_downloaded_code,
+    mock_save_session,
+    testing_config,
+    page_cache,
+):
+    """Bites that cannot be fetched over HTTP are left for the browser."""
+    with open(Path("./tests/testing_content/summing_content.txt"), "r") as f:
+        platform_content = f.read()
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.fetch_bite.side_effect = [platform_content, PlatformError("no code")]
+    http.logged_in = True
+    bites = [Bite("Sum n numbers", "sum-n-numbers"), Bite("Regex fun", "regex-fun")]
+
+    missing = download_bites_over_http(bites, testing_config)
+
+    assert missing == [bites[1]]
+    mock_track_local_bites.assert_called_once_with(bites[0], testing_config)
+    mock_track_downloaded_code.assert_called_once_with(bites[0], testing_config)
+    mock_save_session.assert_called_once()
+    assert len(list(page_cache.glob("objects/*/*.html.gz"))) == 1
+    assert (Path(testing_config["PYBITES_REPO"]) / "sum-n-numbers").is_dir()
+
+
+@patch("eatlocal.web.PlatformSession")
+def test_download_bites_over_http_login_failed(mock_platform_session, testing_config):
+    """A rejected login hands every remaining bite to the browser."""
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.fetch_bite.side_effect = LoginError("bad credentials")
+    http.logged_in = False
+    bites = [Bite("Sum n numbers", "sum-n-numbers"), Bite("Regex fun", "regex-fun")]
+
+    assert download_bites_over_http(bites, testing_config) == bites
+    assert http.fetch_bite.call_count == 1
+
+
+@patch("eatlocal.eatlocal.validate_bite_in_browser")
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bite_falls_back_to_browser(
+    mock_platform_session, mock_validate_in_browser, testing_config
+):
+    """The browser validates the bite when the HTTP submission fails."""
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.validate.side_effect = PlatformError("no validation form")
+    http.logged_in = False
+    mock_validate_in_browser.return_value = "Congrats, you passed this Bite!"
+
+    assert validate_bite(LOCAL_TEST_BITE, testing_config) == (
+        "Congrats, you passed this Bite!"
+    )
+    mock_validate_in_browser.assert_called_once_with(
+        LOCAL_TEST_BITE, testing_config, None
+    )
+
+
+@patch("eatlocal.eatlocal.validate_bite_in_browser")
+@patch("eatlocal.web.PlatformSession")
+def test_validate_bite_does_not_submit_twice(
+    mock_platform_session, mock_validate_in_browser, testing_config
+):
+    """Code that reached the platform is not submitted again in the browser."""
+    http = mock_platform_session.return_value.__enter__.return_value
+    http.validate.side_effect = SubmissionError("No feedback")
+    http.logged_in = False
+
+    with pytest.raises(SubmissionError):
+        validate_bite(LOCAL_TEST_BITE, testing_config)
+    mock_validate_in_browser.assert_not_called()
 
 
 def test_display_bite(
@@ -211,3 +528,43 @@ def test_get_credentials(mock_prompt) -> None:
     mock_prompt.side_effect = ["test_username", "test_password", "test_password"]
     actual = get_credentials()
     assert actual == expected
+
+
+def _session_state(expires: float) -> dict:
+    return {
+        "cookies": [{"name": "sessionid", "value": "abc", "expires": expires}],
+        "origins": [],
+    }
+
+
+def test_save_and_load_session_state(tmp_path) -> None:
+    """Persist a session with private permissions and load it back."""
+    state_file = tmp_path / ".session_state.json"
+    state = _session_state(time.time() + 3600)
+    with (
+        patch("eatlocal.eatlocal.EATLOCAL_HOME", tmp_path),
+        patch("eatlocal.eatlocal.SESSION_STATE", state_file),
+    ):
+        save_session_state(state, "test_username")
+        assert load_session_state("test_username") == state
+        assert load_session_state("other_username") is None
+    assert state_file.stat().st_mode & 0o777 == 0o600
+    # written beside the file and renamed over it, nothing is left behind
+    assert [path.name for path in tmp_path.iterdir()] == [state_file.name]
+
+
+def test_load_session_state_expired(tmp_path) -> None:
+    """An expired session cookie means logging in again."""
+    state_file = tmp_path / ".session_state.json"
+    state_file.write_text(
+        json.dumps(
+            {
+                "username": "test_username",
+                "storage_state": _session_state(time.time() - 1),
+            }
+        )
+    )
+    with patch("eatlocal.eatlocal.SESSION_STATE", state_file):
+        assert load_session_state("test_username") is None
+        state_file.unlink()
+        assert load_session_state("test_username") is None
@@ -0,0 +1,211 @@
+"""eatlocal browser-free platform access tests"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from eatlocal.constants import LOGIN_URL, PROFILE_URL
+from eatlocal.web import (
+    LoginError,
+    PlatformError,
+    PlatformSession,
+    SubmissionError,
+    csrf_token,
+)
+
+LOGIN_PAGE = (
+    '<form><input type="hidden" name="csrfmiddlewaretoken" value="t0k3n"></form>'
+)
+BITE_URL = "https://pybitesplatform.com/bites/sum-n-numbers/"
+
+
+def _response(text: str = "", url: str = "") -> MagicMock:
+    response = MagicMock()
+    response.text = text
+    response.url = url
+    response.iter_content.return_value = [text]
+    return response
+
+
+def test_csrf_token() -> None:
+    assert csrf_token(LOGIN_PAGE) == "t0k3n"
+    with pytest.raises(PlatformError):
+        csrf_token("<form></form>")
+
+
+def test_login_posts_credentials_with_csrf_token() -> None:
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(LOGIN_PAGE)
+    http.session.post.return_value = _response(url=PROFILE_URL)
+
+    http.login()
+
+    assert http.logged_in
+    args, kwargs = http.session.post.call_args
+    assert args == (LOGIN_URL,)
+    assert kwargs["data"] == {
+        "csrfmiddlewaretoken": "t0k3n",
+        "login": "user",
+        "password": "secret",
+    }
+
+
+def test_login_rejected() -> None:
+    http = PlatformSession("user", "wrong")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(LOGIN_PAGE)
+    http.session.post.return_value = _response(url=LOGIN_URL)
+
+    with pytest.raises(LoginError):
+        http.login()
+    assert not http.logged_in
+
+
+def test_fetch_bite_logs_in_when_session_expired() -> None:
+    with open("./tests/testing_content/summing_content.txt") as f:
+        bite_page = f.read()
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.side_effect = [
+        _response('<a id="login-link">Login</a>'),
+        _response(LOGIN_PAGE),
+        _response(bite_page),
+    ]
+    http.session.post.return_value = _response(url=PROFILE_URL)
+
+    assert http.fetch_bite(BITE_URL) == bite_page
+    assert http.logged_in
+
+
+def test_fetch_bite_without_code() -> None:
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response('<a href="/auth/logout/">Logout</a>')
+
+    with pytest.raises(PlatformError):
+        http.fetch_bite(BITE_URL)
+
+
+def test_storage_state_round_trip() -> None:
+    state = {
+        "cookies": [
+            {
+                "name": "sessionid",
+                "value": "abc",
+                "domain": "pybitesplatform.com",
+                "path": "/",
+                "expires": 4102444800,
+                "httpOnly": False,
+                "secure": True,
+                "sameSite": "Lax",
+            }
+        ],
+        "origins": [],
+    }
+    with PlatformSession("user", "secret", state) as http:
+        assert http.session.cookies.get("sessionid") == "abc"
+        assert http.storage_state() == state
+
+
+def test_validate_posts_code_like_the_run_tests_button() -> None:
+    with open("./tests/testing_content/summing_content.txt") as f:
+        bite_page = f.read()
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(bite_page)
+    http.session.post.return_value = _response(
+        "<pre>===== test session starts =====\n2 passed</pre>"
+        "<p>Congrats, you passed this Bite!</p>"
+    )
+
+    feedback = http.validate(BITE_URL, "def sum_numbers(): ...")
+
+    assert "Congrats, you passed this Bite" in feedback
+    args, kwargs = http.session.post.call_args
+    assert args == ("https://pybitesplatform.com/bites/validate/",)
+    assert kwargs["data"] == {
+        "user_code": "def sum_numbers(): ...",
+        "csrfmiddlewaretoken": csrf_token(bite_page),
+        "bite_id": "1",
+    }
+    assert kwargs["headers"]["HX-Trigger"] == "validate-button"
+
+
+def test_validate_without_editor() -> None:
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(
+        # the editor is only created by a script
+        "<script>editor('<textarea id=\"python-editor\"></textarea>')</script>"
+        '<button id="validate-button" hx-post="/bites/validate/"></button>'
+        '<a href="/auth/logout/">Logout</a>'
+    )
+
+    with pytest.raises(PlatformError, match="No validation form"):
+        http.validate(BITE_URL, "")
+    http.session.post.assert_not_called()
+
+
+def test_validate_without_test_results() -> None:
+    with open("./tests/testing_content/summing_content.txt") as f:
+        bite_page = f.read()
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(bite_page)
+    http.session.post.return_value = _response("<p>Something went wrong</p>")
+
+    with pytest.raises(SubmissionError):
+        http.validate(BITE_URL, "")
+
+
+def test_validate_tells_whether_the_code_was_sent() -> None:
+    with open("./tests/testing_content/summing_content.txt") as f:
+        bite_page = f.read()
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(bite_page)
+
+    http.session.post.side_effect = requests.ConnectTimeout()
+    with pytest.raises(requests.ConnectTimeout):
+        http.validate(BITE_URL, "")
+
+    # the platform may be running the tests, the attempt is not repeated
+    http.session.post.reset_mock()
+    http.session.post.side_effect = requests.ReadTimeout()
+    with pytest.raises(SubmissionError):
+        http.validate(BITE_URL, "")
+    http.session.post.assert_called_once()
+
+
+def test_validate_streams_feedback_and_stops_at_the_result() -> None:
+    with open("./tests/testing_content/summing_content.txt") as f:
+        bite_page = f.read()
+    http = PlatformSession("user", "secret")
+    http.session = MagicMock()
+    http.session.get.return_value = _response(bite_page)
+    chunks = [
+        "<pre>===== test session starts =====\ntest_summing.py .",
+        "F\n\n___ test_sum ___\nassert 1 == 2\n",
+        "===== 1 failed, 1 passed in 0.12s =====\n</pre>",
+        "<p>never read</p>",
+    ]
+    response = _response()
+    response.iter_content.return_value = iter(chunks)
+    http.session.post.return_value = response
+    lines = []
+
+    feedback = http.validate(BITE_URL, "def sum_numbers(): ...", lines.append)
+
+    assert lines == [
+        "===== test session starts =====",
+        "test_summing.py .F",
+        "",
+        "___ test_sum ___",
+        "assert 1 == 2",
+        "===== 1 failed, 1 passed in 0.12s =====",
+    ]
+    assert "assert 1 == 2" in feedback
+    assert "never read" not in feedback
+    assert next(response.iter_content.return_value) == "<p>never read</p>"
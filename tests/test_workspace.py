@@ -0,0 +1,120 @@
+"""eatlocal workspace status tests"""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from eatlocal.eatlocal import print_workspace_status
+from eatlocal.store import LocalBites, code_digest
+from eatlocal.workspace import WorkspaceScanner, code_file_name
+
+CODE = "def sum_numbers(numbers=None):\n    pass\n"
+
+
+def touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def row(slug: str, downloaded=None, submitted=None, passed=None) -> dict:
+    return {
+        "slug": slug,
+        "downloaded_hash": downloaded,
+        "submitted_hash": submitted,
+        "passed": passed,
+    }
+
+
+def make_bite(repo: Path, slug: str, code: str = CODE) -> Path:
+    bite_dir = repo / slug
+    bite_dir.mkdir(parents=True)
+    (bite_dir / "bite.html").write_text("<p>Sum n numbers</p>")
+    (bite_dir / "summing.py").write_text(code)
+    (bite_dir / "test_summing.py").write_text("def test_sum(): ...\n")
+    return bite_dir
+
+
+def test_code_file_name() -> None:
+    assert code_file_name(["test_names.py", "names.py", "bite.html"]) == "names.py"
+    assert code_file_name(["test_names.py", "bite.html"]) is None
+
+
+def test_scan_statuses(tmp_path) -> None:
+    repo = tmp_path / "bites"
+    digest = code_digest(CODE)
+    for slug in ("untouched", "modified", "passed", "failed"):
+        make_bite(repo, slug)
+    (repo / "modified" / "summing.py").write_text(CODE + "    return 1\n")
+    bites = [
+        row("untouched", downloaded=digest),
+        row("modified", downloaded=digest),
+        row("passed", downloaded="old", submitted=digest, passed=True),
+        row("failed", downloaded="old", submitted=digest, passed=False),
+        row("missing", downloaded=digest),
+    ]
+    statuses = WorkspaceScanner(tmp_path / "workspace.json").scan(repo, bites)
+    assert statuses == {slug: slug for slug in statuses}
+
+
+def test_scan_survives_unreadable_code(tmp_path) -> None:
+    repo = tmp_path / "bites"
+    make_bite(repo, "latin-1")
+    (repo / "latin-1" / "summing.py").write_bytes(b"# caf\xe9\n")
+    make_bite(repo, "sum-n-numbers")
+    bites = [
+        row("latin-1", downloaded=code_digest(CODE)),
+        row("sum-n-numbers", downloaded=code_digest(CODE)),
+    ]
+    statuses = WorkspaceScanner(tmp_path / "workspace.json").scan(repo, bites)
+    assert statuses == {"latin-1": "unreadable", "sum-n-numbers": "untouched"}
+
+
+def test_scan_only_lists_changed_directories(tmp_path) -> None:
+    repo = tmp_path / "bites"
+    bite_dir = make_bite(repo, "sum-n-numbers")
+    bites = [row("sum-n-numbers", downloaded=code_digest(CODE))]
+    scanner = WorkspaceScanner(tmp_path / "workspace.json")
+    assert scanner.scan(repo, bites) == {"sum-n-numbers": "untouched"}
+
+    with (
+        patch("eatlocal.workspace.os.scandir") as scandir,
+        patch("eatlocal.workspace.code_digest") as digest,
+    ):
+        assert scanner.scan(repo, bites) == {"sum-n-numbers": "untouched"}
+    scandir.assert_not_called()
+    digest.assert_not_called()
+
+    # editing in place leaves the directory alone but changes the code file
+    (bite_dir / "summing.py").write_text(CODE + "    return 1\n")
+    touch_later(bite_dir / "summing.py")
+    with patch("eatlocal.workspace.os.scandir") as scandir:
+        assert scanner.scan(repo, bites) == {"sum-n-numbers": "modified"}
+    scandir.assert_not_called()
+
+    (bite_dir / "summing.py").unlink()
+    (bite_dir / "another.py").write_text(CODE)
+    touch_later(bite_dir)
+    assert scanner.scan(repo, bites) == {"sum-n-numbers": "untouched"}
+
+
+def test_print_workspace_status(
+    tmp_path, testing_config, local_bites_db, workspace_cache, capsys
+) -> None:
+    code = (
+        testing_config["PYBITES_REPO"] / "parse-a-list-of-names" / "names.py"
+    ).read_text()
+    with LocalBites(local_bites_db) as db:
+        db.track(
+            "parse-a-list-of-names",
+            "Parse a list of names",
+            downloaded_hash="old",
+            submitted_hash=code_digest(code),
+            passed=True,
+        )
+        db.track("sum-n-numbers", "Sum n numbers", downloaded_hash="old")
+    print_workspace_status(testing_config, only=["passed"])
+    output = capsys.readouterr().out
+    assert "Parse a list of names" in output
+    assert "Sum n numbers" not in output
+    assert "1 passed" in output
+    assert workspace_cache.is_file()